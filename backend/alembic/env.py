@@ -0,0 +1,39 @@
+"""
+Alembic environment
+
+Fresh databases are created complete by init_db() (create_all) when the app
+starts. Revisions bring databases created by earlier releases up to the
+current models, which create_all cannot do for tables that already exist.
+Each revision inspects the live schema first, so upgrade head is also safe
+on a fresh or partly upgraded database; for the same reason only online
+migrations are supported.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import Base, engine
+from app.models import models  # noqa: F401  registers every table on Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite cannot ALTER constraints in place; batch mode rebuilds the table
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    raise SystemExit("Offline (--sql) migrations are not supported: revisions inspect the live schema")
+run_migrations_online()
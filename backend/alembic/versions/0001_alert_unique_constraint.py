@@ -0,0 +1,52 @@
+"""
+Deduplicate alerts and add uq_alert_user_approach_type
+
+Bulk alert inserts rely on this constraint to skip duplicates, and
+create_all never adds it to an existing alerts table. The earliest alert of
+each (user, approach, type) is kept; later duplicates are deleted along with
+their queued notifications.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+CONSTRAINT = "uq_alert_user_approach_type"
+
+_DUPLICATES = """
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY user_id, close_approach_id, alert_type
+            ORDER BY triggered_at, id
+        ) AS duplicate_rank
+        FROM alerts
+    ) ranked
+    WHERE duplicate_rank > 1
+"""
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    if "alerts" not in tables:
+        return
+    if any(constraint["name"] == CONSTRAINT for constraint in inspector.get_unique_constraints("alerts")):
+        return
+
+    if "notification_outbox" in tables:
+        op.execute(f"DELETE FROM notification_outbox WHERE alert_id IN ({_DUPLICATES})")
+    op.execute(f"DELETE FROM alerts WHERE id IN ({_DUPLICATES})")
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.create_unique_constraint(CONSTRAINT, ["user_id", "close_approach_id", "alert_type"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("alerts") as batch_op:
+        batch_op.drop_constraint(CONSTRAINT, type_="unique")
@@ -0,0 +1,53 @@
+"""
+Add users.alert_count and users.unread_alert_count and backfill them
+
+create_all adds neither column to an existing users table. Both are
+filled, together with alert_daily_counts, by the same rebuild that
+python -m app.commands.backfill_alert_counts runs.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+COLUMNS = ["alert_count", "unread_alert_count"]
+
+
+def upgrade() -> None:
+    from app.models.models import AlertDailyCount
+    from app.services.alert_service import AlertService
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "users" not in inspector.get_table_names():
+        return
+    existing = {column["name"] for column in inspector.get_columns("users")}
+    missing = [column for column in COLUMNS if column not in existing]
+    if not missing:
+        return
+
+    with op.batch_alter_table("users") as batch_op:
+        for column in missing:
+            batch_op.add_column(sa.Column(column, sa.Integer(), nullable=False, server_default="0"))
+    AlertDailyCount.__table__.create(bind, checkfirst=True)
+
+    db = Session(bind=bind)
+    try:
+        AlertService.backfill_daily_counts(db)
+        db.flush()
+    finally:
+        db.close()
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        for column in reversed(COLUMNS):
+            batch_op.drop_column(column)
@@ -0,0 +1,49 @@
+"""
+Add asteroids.watcher_count and fill it from the watchlists table
+
+create_all adds neither the column nor idx_asteroid_watcher_count to an
+existing asteroids table. Counts are filled by the same recount that
+python -m app.commands.reconcile_watcher_counts runs.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEX = "idx_asteroid_watcher_count"
+
+
+def upgrade() -> None:
+    from app.services.watchlist_service import WatchlistService
+
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "asteroids" not in inspector.get_table_names():
+        return
+    if "watcher_count" in {column["name"] for column in inspector.get_columns("asteroids")}:
+        return
+
+    with op.batch_alter_table("asteroids") as batch_op:
+        batch_op.add_column(sa.Column("watcher_count", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index(INDEX, "asteroids", ["watcher_count", "id"])
+
+    db = Session(bind=bind)
+    try:
+        WatchlistService.reconcile_watcher_counts(db)
+        db.flush()
+    finally:
+        db.close()
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX, table_name="asteroids")
+    with op.batch_alter_table("asteroids") as batch_op:
+        batch_op.drop_column("watcher_count")
@@ -0,0 +1,37 @@
+"""
+Add conversations.summary and conversations.summary_seq
+
+Databases whose conversations table predates rolling summaries lack both
+columns, and create_all does not add them. Existing conversations start
+unsummarized (summary_seq 0); the summarizer folds them in as they grow.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "conversations" not in inspector.get_table_names():
+        return
+    existing = {column["name"] for column in inspector.get_columns("conversations")}
+
+    with op.batch_alter_table("conversations") as batch_op:
+        if "summary" not in existing:
+            batch_op.add_column(sa.Column("summary", sa.Text(), nullable=True))
+        if "summary_seq" not in existing:
+            batch_op.add_column(sa.Column("summary_seq", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.drop_column("summary_seq")
+        batch_op.drop_column("summary")
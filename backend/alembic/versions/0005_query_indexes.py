@@ -0,0 +1,62 @@
+"""
+Add the query indexes introduced on tables that predate them
+
+create_all creates indexes only together with a new table, so databases
+whose tables already existed lack these. Each index is created only if it
+is missing; INCLUDE columns apply on PostgreSQL only.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# (table, index name, columns, PostgreSQL INCLUDE columns)
+INDEXES = [
+    # Keyset-ordered close approach window scans (/neo/approaches)
+    (
+        "close_approaches", "idx_approach_date_id", ["closest_approach_date", "id"],
+        ["calculated_cri", "miss_distance_km", "asteroid_id"]
+    ),
+    (
+        "close_approaches", "idx_approach_cri_id", ["calculated_cri", "id"],
+        ["closest_approach_date", "miss_distance_km", "asteroid_id"]
+    ),
+    (
+        "close_approaches", "idx_approach_distance_id", ["miss_distance_km", "id"],
+        ["closest_approach_date", "calculated_cri", "asteroid_id"]
+    ),
+    # Joined keyset listing of a user's alerts, newest first
+    ("alerts", "idx_alert_user_triggered_id", ["user_id", "triggered_at", "id"], None),
+    # Last NASA sync time quoted by activity summaries and chatbot stats
+    ("asteroids", "ix_asteroids_nasa_synced_at", ["nasa_synced_at"], None),
+    # Hazardous/diameter watch rule criteria
+    ("asteroids", "idx_asteroid_hazardous_diameter", ["is_hazardous", "diameter_km"], None),
+    # Latest risk log per approach for watchlist details
+    ("risk_scoring_logs", "idx_risk_log_approach_time", ["close_approach_id", "calculation_timestamp"], None),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, name, columns, include in INDEXES:
+        if table not in tables:
+            continue
+        if name in {index["name"] for index in inspector.get_indexes(table)}:
+            continue
+        op.create_index(name, table, columns, postgresql_include=include)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, name, _, _ in reversed(INDEXES):
+        if table in tables and name in {index["name"] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,35 @@
+"""
+Add users.activity_version
+
+Cached activity summaries are keyed on this per-user version, which every
+transaction that changes the user's watchlist or alerts increments, so a
+change committed on one worker is seen by the others. create_all does not
+add the column to an existing users table.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "users" not in inspector.get_table_names():
+        return
+    if "activity_version" in {column["name"] for column in inspector.get_columns("users")}:
+        return
+
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("activity_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("activity_version")
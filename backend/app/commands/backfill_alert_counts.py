@@ -0,0 +1,25 @@
+"""
+Rebuild the per-user daily alert counters from existing alerts
+
+Usage (from backend/): python -m app.commands.backfill_alert_counts
+"""
+from app.core.database import SessionLocal, init_db
+from app.services.alert_service import AlertService
+
+
+def main() -> None:
+    init_db()
+    db = SessionLocal()
+    try:
+        written = AlertService.backfill_daily_counts(db)
+        db.commit()
+        print(f"✓ Rebuilt {written} alert counter rows")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Delete read alerts older than the retention window in bounded chunks
+
+Usage (from backend/): python -m app.commands.purge_alerts [--days N] [--chunk-size N]
+"""
+import argparse
+
+from app.core.config import settings
+from app.core.database import SessionLocal, init_db
+from app.services.alert_service import AlertService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=settings.alert_retention_days)
+    parser.add_argument("--chunk-size", type=int, default=settings.alert_purge_chunk_size)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        purged = AlertService.purge_read_alerts(db, args.days, args.chunk_size)
+        print(f"✓ Purged {purged} read alerts older than {args.days} days")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Delete chat conversations idle longer than CHAT_CONVERSATION_TTL_DAYS
+
+Usage (from backend/): python -m app.commands.purge_conversations [--chunk-size N]
+"""
+import argparse
+
+from app.core.config import settings
+from app.core.database import SessionLocal, init_db
+from app.services.conversation_store import conversation_store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=settings.chat_purge_chunk_size)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        purged = conversation_store.purge_expired(db, chunk_size=args.chunk_size)
+        print(f"✓ Purged {purged} conversations idle for {settings.chat_conversation_ttl_days} days")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Recount asteroid watcher counts from the watchlists table
+
+Usage (from backend/): python -m app.commands.reconcile_watcher_counts
+"""
+from app.core.database import SessionLocal, init_db
+from app.services.watchlist_service import WatchlistService
+
+
+def main() -> None:
+    init_db()
+    db = SessionLocal()
+    try:
+        corrected = WatchlistService.reconcile_watcher_counts(db)
+        db.commit()
+        print(f"✓ Corrected watcher counts on {corrected} asteroids")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -41,10 +41,14 @@ class Settings(BaseSettings):
     nasa_api_key: str = "DEMO_KEY"
     nasa_base_url: str = "https://api.nasa.gov/neo/rest/v1"
     nasa_cache_ttl_hours: int = 6
+    nasa_max_concurrency: int = 5  # NASA requests in flight at once per worker; the rest queue
     
     # OpenAI API
     openai_api_key: str = ""
     openai_model: str = "gpt-3.5-turbo"
+    openai_base_url: str = "https://api.openai.com/v1"  # Any OpenAI-compatible endpoint
+    openai_timeout_seconds: float = 30.0
+    openai_max_concurrency: int = 8  # Completion requests in flight at once per worker; the rest queue
     
     # CORS
     cors_origins: list = ["http://localhost:3000", "http://localhost:5173", "http://localhost:3001", "http://localhost:3002"]
@@ -53,6 +57,64 @@ class Settings(BaseSettings):
     default_page_size: int = 20
     max_page_size: int = 100
     
+    # Bulk export
+    export_batch_size: int = 1000  # Rows fetched per server-side cursor round trip
+    
+    # Watchlist
+    watchlist_import_max_items: int = 1000  # Entries accepted per import request
+    watch_rule_max_per_user: int = 20
+    watch_rule_match_limit: int = 500  # Matches listed (and cached) per rule
+    watch_rule_cache_size: int = 1000  # Rules whose matches are kept in memory
+    watch_rule_cache_ttl_seconds: int = 300  # Backstop for the data generation check
+    
+    # Chat
+    chat_conversation_ttl_days: int = 30  # Idle conversations are deleted after this
+    chat_max_messages_per_conversation: int = 200  # Oldest messages are trimmed beyond this
+    chat_max_conversations_per_user: int = 50  # Least recently active conversation is evicted beyond this
+    chat_hot_cache_size: int = 1000  # Conversations kept in memory per worker
+    chat_hot_cache_ttl_seconds: int = 900
+    chat_purge_chunk_size: int = 500  # Conversations deleted per purge transaction
+    chat_stats_refresh_seconds: int = 300  # Stats quoted by the chatbot are rebuilt at least this often
+    chat_stats_top_threats: int = 5  # Top threats listed in the system prompt
+    chat_local_answer_limit: int = 5  # Rows listed in answers served from the catalog
+    chat_closest_default_days: int = 7  # Window for closest-approach questions that name none
+    chat_response_cache_size: int = 2000  # Completions kept per worker
+    chat_response_cache_ttl_seconds: int = 3600
+    chat_prompt_token_budget: int = 3000  # Estimated prompt tokens sent per completion
+    chat_recent_max_messages: int = 6  # Latest messages the summarizer leaves out of the summary
+    chat_summary_max_tokens: int = 300
+    chat_summary_min_messages: int = 4  # Messages gathered outside the recent window before summarizing
+    
+    # Analytics
+    top_threats_max_k: int = 100  # Leaderboard size kept in memory
+    analytics_rebuild_seconds: int = 600  # In-memory analytics are reloaded from the database at least this often
+    catalog_poll_seconds: int = 10  # How often each worker checks the shared data generation for other workers' syncs
+    user_activity_cache_size: int = 10000
+    user_activity_cache_ttl_seconds: int = 300
+    
+    # Alerts
+    approach_alert_max_sleep_seconds: int = 3600  # Scheduler re-checks its queue at least this often
+    alert_retention_days: int = 90  # Read alerts older than this are purged
+    alert_purge_chunk_size: int = 1000  # Alerts deleted per purge transaction
+    alert_stream_heartbeat_seconds: int = 15
+    alert_stream_queue_size: int = 100  # Undelivered events per connection before it is dropped
+    alert_stream_replay_limit: int = 500  # Alerts replayed after Last-Event-ID on reconnect
+    alert_stream_channel: str = "cosmic_watch:alerts"  # Redis pub/sub channel bridging workers
+    
+    # Notifications
+    smtp_host: str = ""  # Email delivery disabled when empty
+    smtp_port: int = 587
+    smtp_username: str = ""
+    smtp_password: str = ""
+    smtp_use_tls: bool = True
+    smtp_from: str = "alerts@cosmicwatch.io"
+    notification_batch_size: int = 500  # Outbox rows claimed per worker pass
+    notification_max_concurrency: int = 10  # Deliveries in flight at once
+    notification_max_attempts: int = 6
+    notification_retry_base_seconds: int = 30  # Doubles after each failed attempt
+    notification_lease_seconds: int = 300  # Claimed rows are retried if not settled by then
+    notification_max_sleep_seconds: int = 300
+    
     class Config:
         case_sensitive = False
 
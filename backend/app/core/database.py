@@ -6,10 +6,13 @@ All rights reserved.
 
 Repository: https://github.com/rohitb6/Cosmic_Watch
 """
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.core.config import settings
 
@@ -34,6 +37,34 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+
+def get_async_database_url(url: str) -> str:
+    """Map the configured sync driver URL onto its async driver"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+
+# Async engine for `async def` routes, so DB work never blocks the event loop
+if "sqlite" in settings.database_url:
+    async_engine = create_async_engine(get_async_database_url(settings.database_url))
+else:
+    async_engine = create_async_engine(
+        get_async_database_url(settings.database_url),
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+    )
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
@@ -46,6 +77,25 @@ def get_db() -> Generator:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an async DB session in `async def` routes"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def get_upsert_insert(db):
+    """
+    Dialect-specific insert() construct for the session's database
+    Supports on_conflict_do_nothing / on_conflict_do_update on PostgreSQL and SQLite
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql_insert
+    if dialect == "sqlite":
+        return sqlite_insert
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
+
+
 def init_db():
     """Create all tables"""
     Base.metadata.create_all(bind=engine)
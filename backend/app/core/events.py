@@ -0,0 +1,170 @@
+"""
+Cosmic Watch - Post-commit change events
+
+Copyright © 2026 Rohit. Made with love by Rohit.
+All rights reserved.
+
+Services queue change payloads on the session while they write; listeners
+(in-memory indexes, caches, analytics) receive them only once the
+transaction commits, and never if it rolls back.
+
+Repository: https://github.com/rohitb6/Cosmic_Watch
+"""
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_upsert_insert
+from app.models.models import CatalogState
+
+logger = logging.getLogger(__name__)
+
+# Event topics
+APPROACH_SCORED = "approach_scored"
+WATCHLIST_CHANGED = "watchlist_changed"
+ALERTS_CHANGED = "alerts_changed"  # payload: user_id
+ALERT_CREATED = "alert_created"
+NOTIFICATIONS_QUEUED = "notifications_queued"  # payload: earliest delivery datetime
+CONVERSATION_SAVED = "conversation_saved"  # payload: StoredConversation
+CONVERSATION_APPENDED = "conversation_appended"
+
+_PENDING_KEY = "cosmic_watch_pending_events"
+_GENERATION_KEY = "cosmic_watch_generation"
+
+
+@dataclass
+class ApproachScored:
+    """A close approach was created or re-scored"""
+    approach_id: str
+    asteroid_id: str
+    asteroid_name: str
+    closest_approach_date: datetime
+    miss_distance_km: Optional[float]
+    old_cri: Optional[float]
+    new_cri: Optional[float]
+
+
+@dataclass
+class WatchlistChanged:
+    """A watchlist item was added, updated or removed"""
+    action: str  # added, updated, removed
+    user_id: str
+    asteroid_id: str
+    watchlist_id: str
+    alert_threshold_distance_km: Optional[float] = None
+    alert_threshold_cri: Optional[float] = None
+
+
+@dataclass
+class AlertCreated:
+    """An alert was inserted"""
+    alert_id: str
+    user_id: str
+
+
+@dataclass
+class ConversationAppended:
+    """Messages were added to a conversation"""
+    conversation_id: str
+    user_id: str
+    last_seq: int
+
+
+_listeners: Dict[str, List[Callable[[List[Any]], None]]] = defaultdict(list)
+
+
+def subscribe(topic: str, listener: Callable[[List[Any]], None]) -> None:
+    """Register a listener called with the list of payloads committed for a topic"""
+    if listener not in _listeners[topic]:
+        _listeners[topic].append(listener)
+
+
+def emit_after_commit(db: Session, topic: str, payload: Any) -> None:
+    """Queue a payload to be dispatched when the session's transaction commits"""
+    db.info.setdefault(_PENDING_KEY, defaultdict(list))[topic].append(payload)
+
+
+def pending_payloads(db: Session, topic: str) -> List[Any]:
+    """Payloads queued for a topic in the session's open transaction"""
+    return list((db.info.get(_PENDING_KEY) or {}).get(topic, []))
+
+
+class DataGeneration:
+    """
+    Catalog data version shared by every worker
+    The counter lives in the catalog_state row: a transaction that scores approaches
+    increments it just before committing, and other workers adopt the new value when
+    they next poll the row. Caches derived from catalog data remember the generation
+    they were built at
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> int:
+        return self._value
+
+    def observe(self, value: int) -> bool:
+        """Adopt a generation read from or written to the database; returns True if it moved forward"""
+        with self._lock:
+            if value <= self._value:
+                return False
+            self._value = value
+            return True
+
+    def sync(self, db: Session) -> bool:
+        """Poll the shared generation; returns True if another worker moved it"""
+        value = db.scalar(select(CatalogState.generation).where(CatalogState.id == 1))
+        return self.observe(value or 0)
+
+    def bump(self, db: Session) -> int:
+        """Increment the shared generation inside the session's transaction"""
+        insert = get_upsert_insert(db)
+        stmt = insert(CatalogState).values(id=1, generation=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"generation": CatalogState.generation + 1}
+        ).returning(CatalogState.generation)
+        return db.execute(stmt).scalar_one()
+
+
+data_generation = DataGeneration()
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_generation(session: Session) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    if pending and pending.get(APPROACH_SCORED):
+        # Row lock held only from here to the commit
+        session.info[_GENERATION_KEY] = data_generation.bump(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending(session: Session) -> None:
+    generation = session.info.pop(_GENERATION_KEY, None)
+    if generation is not None:
+        data_generation.observe(generation)
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for topic, payloads in pending.items():
+        for listener in _listeners.get(topic, []):
+            try:
+                listener(payloads)
+            except Exception:
+                # A failing listener must never break the request that committed
+                logger.exception("Listener for %s failed", topic)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_GENERATION_KEY, None)
@@ -7,7 +7,7 @@ All rights reserved.
 Repository: https://github.com/rohitb6/Cosmic_Watch
 """
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean, DateTime, ForeignKey, 
+    Column, String, Integer, Float, Boolean, Date, DateTime, ForeignKey, 
     Text, JSON, Index, UniqueConstraint, func
 )
 from sqlalchemy.orm import relationship
@@ -30,6 +30,12 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # Alert counters, kept current by AlertService alongside alert_daily_counts
+    alert_count = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_alert_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every transaction that changes the user's watchlist or alerts; versions cached activity summaries
+    activity_version = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # JSON preferences storage
     preferences = Column(JSON, default={
         "theme": "dark",
@@ -66,8 +72,11 @@ class Asteroid(Base):
     is_hazardous = Column(Boolean, default=False, index=True)
     is_sentry_object = Column(Boolean, default=False)
     
+    # Denormalized watchlist size, maintained by WatchlistService
+    watcher_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Tracking
-    nasa_synced_at = Column(DateTime(timezone=True), nullable=True)
+    nasa_synced_at = Column(DateTime(timezone=True), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -79,6 +88,10 @@ class Asteroid(Base):
     __table_args__ = (
         Index('idx_asteroid_hazardous', 'is_hazardous'),
         Index('idx_asteroid_name', 'name'),
+        # Watch rule predicates filter on hazard class and size together
+        Index('idx_asteroid_hazardous_diameter', 'is_hazardous', 'diameter_km'),
+        # Most-watched leaderboard
+        Index('idx_asteroid_watcher_count', 'watcher_count', 'id'),
     )
 
 
@@ -120,6 +133,19 @@ class CloseApproach(Base):
     __table_args__ = (
         Index('idx_approach_date', 'closest_approach_date'),
         Index('idx_approach_asteroid_date', 'asteroid_id', 'closest_approach_date'),
+        # Keyset-ordered window scans; INCLUDE makes them index-only on PostgreSQL
+        Index(
+            'idx_approach_date_id', 'closest_approach_date', 'id',
+            postgresql_include=['calculated_cri', 'miss_distance_km', 'asteroid_id']
+        ),
+        Index(
+            'idx_approach_cri_id', 'calculated_cri', 'id',
+            postgresql_include=['closest_approach_date', 'miss_distance_km', 'asteroid_id']
+        ),
+        Index(
+            'idx_approach_distance_id', 'miss_distance_km', 'id',
+            postgresql_include=['closest_approach_date', 'calculated_cri', 'asteroid_id']
+        ),
     )
 
 
@@ -152,6 +178,34 @@ class Watchlist(Base):
     )
 
 
+class WatchRule(Base):
+    """Standing watch rule matching asteroids by criteria instead of by id"""
+    __tablename__ = "watch_rules"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    
+    # Criteria; None = not constrained
+    hazardous_only = Column(Boolean, nullable=False, default=False)
+    sentry_only = Column(Boolean, nullable=False, default=False)
+    min_diameter_km = Column(Float, nullable=True)
+    max_distance_km = Column(Float, nullable=True)
+    max_distance_au = Column(Float, nullable=True)
+    min_cri = Column(Float, nullable=True)
+    within_days = Column(Integer, nullable=True)  # Only approaches this many days ahead
+    
+    is_active = Column(Boolean, nullable=False, default=True)
+    
+    # Tracking
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index('idx_watch_rule_active', 'is_active'),
+    )
+
+
 class Alert(Base):
     """User alerts for asteroid approaches"""
     __tablename__ = "alerts"
@@ -181,9 +235,91 @@ class Alert(Base):
     user = relationship("User", back_populates="alerts")
     
     __table_args__ = (
+        # One alert of each type per user and approach; bulk inserts rely on it to skip duplicates
+        UniqueConstraint('user_id', 'close_approach_id', 'alert_type', name='uq_alert_user_approach_type'),
         Index('idx_alert_user_read', 'user_id', 'is_read'),
         Index('idx_alert_triggered', 'triggered_at'),
+        # Keyset scans of a user's alerts by (triggered_at, id)
+        Index('idx_alert_user_triggered_id', 'user_id', 'triggered_at', 'id'),
+    )
+
+
+class NotificationOutbox(Base):
+    """Alert notifications awaiting delivery, written in the same transaction as the alert"""
+    __tablename__ = "notification_outbox"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    alert_id = Column(UUID(as_uuid=True), ForeignKey("alerts.id", ondelete="CASCADE"), nullable=False, index=True)
+    channel = Column(String(20), nullable=False)  # email
+    
+    # Delivery state
+    status = Column(String(20), nullable=False, default="pending")  # pending, sent, failed, cancelled
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)  # Digest time, retry time or claim lease
+    last_error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index('idx_outbox_status_next', 'status', 'next_attempt_at'),
+    )
+
+
+class AlertDailyCount(Base):
+    """Per-user, per-day, per-type alert counters kept current by AlertService"""
+    __tablename__ = "alert_daily_counts"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC day of triggered_at
+    alert_type = Column(String(50), primary_key=True)
+    
+    total = Column(Integer, nullable=False, default=0)
+    unread = Column(Integer, nullable=False, default=0)
+    critical = Column(Integer, nullable=False, default=0)  # CRI >= 80
+    high = Column(Integer, nullable=False, default=0)  # 60 <= CRI < 80
+    medium = Column(Integer, nullable=False, default=0)  # 40 <= CRI < 60
+
+
+class Conversation(Base):
+    """Chatbot conversation; messages live in conversation_messages"""
+    __tablename__ = "conversations"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    preview = Column(String(100), nullable=True)  # Start of the first user message
+    
+    # last_seq only grows; message_count stops at the per-conversation cap as old messages are trimmed
+    last_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Rolling summary of messages up to summary_seq; later messages are sent verbatim
+    summary = Column(Text, nullable=True)
+    summary_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_message_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        # A user's conversations, most recent first
+        Index('idx_conversation_user_last', 'user_id', 'last_message_at'),
+        # TTL purge
+        Index('idx_conversation_last', 'last_message_at'),
+    )
+
+
+class ConversationMessage(Base):
+    """One chat message, numbered within its conversation"""
+    __tablename__ = "conversation_messages"
+    
+    conversation_id = Column(
+        UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True
     )
+    seq = Column(Integer, primary_key=True)
+    role = Column(String(20), nullable=False)  # user, assistant
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
 
 
 class RiskScoringLog(Base):
@@ -212,6 +348,7 @@ class RiskScoringLog(Base):
     
     __table_args__ = (
         Index('idx_risk_log_asteroid', 'asteroid_id'),
+        Index('idx_risk_log_approach_time', 'close_approach_id', 'calculation_timestamp'),
         Index('idx_risk_log_timestamp', 'calculation_timestamp'),
     )
 
@@ -233,3 +370,11 @@ class NASAAPICache(Base):
     __table_args__ = (
         Index('idx_cache_endpoint_expires', 'endpoint', 'expires_at'),
     )
+
+
+class CatalogState(Base):
+    """Single row holding the catalog data generation shared by every worker"""
+    __tablename__ = "catalog_state"
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    generation = Column(Integer, nullable=False, default=0)  # Bumped by each commit that scores approaches
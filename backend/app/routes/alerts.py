@@ -1,15 +1,18 @@
 """
 Alert routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.services.alert_service import AlertService
+from app.services.alert_stream import alert_stream_hub
+from app.utils.pagination import decode_cursor
 from app.schemas.schemas import (
-    AlertListResponse, AlertStatsResponse
+    AlertListResponse, AlertStatsResponse, AlertBulkRequest
 )
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
@@ -19,13 +22,13 @@ router = APIRouter(prefix="/alerts", tags=["alerts"])
 def get_alerts(
     unread_only: bool = Query(False),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get user alerts"""
     try:
-        return AlertService.get_user_alerts(db, user_id, unread_only, limit, offset)
+        return AlertService.get_user_alerts(db, user_id, unread_only, limit, cursor)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,6 +36,93 @@ def get_alerts(
         )
 
 
+@router.get("/stream")
+async def stream_alerts(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user)
+):
+    """Stream new alerts and unread-count changes as Server-Sent Events"""
+    try:
+        resume_after = decode_cursor(last_event_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Last-Event-ID"
+        )
+    
+    return StreamingResponse(
+        alert_stream_hub.stream(request, user_id, resume_after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/read-all")
+def mark_all_alerts_read(
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark every unread alert as read"""
+    try:
+        count = AlertService.mark_alerts_read(db, user_id)
+        return {"success": True, "updated": count, "message": f"Marked {count} alerts as read"}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/bulk/read")
+def mark_alerts_read(
+    request: AlertBulkRequest,
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark alerts selected by ID list and/or filter as read"""
+    try:
+        count = AlertService.mark_alerts_read(db, user_id, request)
+        return {"success": True, "updated": count, "message": f"Marked {count} alerts as read"}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post("/bulk/delete")
+def delete_alerts(
+    request: AlertBulkRequest,
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete alerts selected by ID list and/or filter"""
+    try:
+        count = AlertService.delete_alerts(db, user_id, request)
+        return {"success": True, "deleted": count, "message": f"Deleted {count} alerts"}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.patch("/{alert_id}/read")
 def mark_alert_read(
     alert_id: str,
@@ -41,7 +131,7 @@ def mark_alert_read(
 ):
     """Mark alert as read"""
     try:
-        AllertService.mark_alert_read(db, user_id, alert_id)
+        AlertService.mark_alert_read(db, user_id, alert_id)
         return {"success": True, "message": "Alert marked as read"}
     except ValueError as e:
         raise HTTPException(
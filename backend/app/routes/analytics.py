@@ -0,0 +1,89 @@
+"""
+Analytics routes
+"""
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.services.analytics_service import AnalyticsService
+from app.services.notification_service import notification_worker
+from app.schemas.schemas import (
+    MostWatchedResponse, RiskDistributionResponse, TopThreatsResponse, UserActivityResponse
+)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/risk-distribution", response_model=RiskDistributionResponse)
+def get_risk_distribution(
+    user_id: str = Depends(get_current_user)
+):
+    """Get CRI distribution across scored close approaches"""
+    try:
+        return AnalyticsService.get_risk_distribution()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/top-threats", response_model=TopThreatsResponse)
+def get_top_threats(
+    k: int = Query(10, ge=1, le=settings.top_threats_max_k),
+    user_id: str = Depends(get_current_user)
+):
+    """Get the k asteroids with the highest next-approach CRI"""
+    try:
+        return AnalyticsService.get_top_threats(k)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/most-watched", response_model=MostWatchedResponse)
+def get_most_watched(
+    k: int = Query(10, ge=1, le=100),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the k asteroids on the most watchlists"""
+    try:
+        return AnalyticsService.get_most_watched(db, k)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/me", response_model=UserActivityResponse)
+def get_user_activity(
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the current user's activity summary"""
+    try:
+        return AnalyticsService.get_user_activity(db, user_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/notifications")
+def get_notification_metrics(
+    user_id: str = Depends(get_current_user)
+):
+    """Get notification delivery counters and throughput for this worker"""
+    return notification_worker.metrics()
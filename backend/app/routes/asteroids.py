@@ -2,16 +2,19 @@
 Asteroid and NEO feed routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime, timedelta, timezone
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import get_current_user
 from app.services.asteroid_service import AsteroidService
+from app.services.export_service import ExportService
 from app.schemas.schemas import (
     AsteroidDetailResponse, AsteroidListResponse, SearchAsteroidsRequest,
-    Next72hThreatsResponse
+    Next72hThreatsResponse, ApproachWindowResponse
 )
 from app.models.models import Asteroid, CloseApproach
 
@@ -22,7 +25,7 @@ router = APIRouter(prefix="/neo", tags=["asteroids"])
 async def sync_nasa_data(
     days_ahead: int = Query(7, ge=1, le=30),
     user_id: str = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Sync real-time NASA asteroid feed to database
@@ -112,6 +115,89 @@ def get_next_72h_threats(
         )
 
 
+@router.get("/approaches", response_model=ApproachWindowResponse)
+def get_approaches(
+    start_date: Optional[datetime] = Query(None, description="Approaches on or after this date"),
+    end_date: Optional[datetime] = Query(None, description="Approaches before this date"),
+    min_cri: Optional[float] = Query(None, ge=0, le=100),
+    max_distance_km: Optional[float] = Query(None, ge=0),
+    hazardous_only: bool = Query(False),
+    sort: str = Query("date_asc", description="date_asc, date_desc, risk_desc, risk_asc, distance_asc, distance_desc"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Query close approaches in a time window with range filters
+    Keyset-paginated: pass next_cursor back to fetch the following page
+    """
+    try:
+        return AsteroidService.query_approaches(
+            db,
+            start_date=start_date,
+            end_date=end_date,
+            min_cri=min_cri,
+            max_distance_km=max_distance_km,
+            hazardous_only=hazardous_only,
+            sort=sort,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/export")
+def export_asteroids(
+    format: str = Query("ndjson", description="ndjson, csv, parquet"),
+    dataset: str = Query("approaches", description="approaches, asteroids"),
+    start_date: Optional[datetime] = Query(None, description="Approaches on or after this date"),
+    end_date: Optional[datetime] = Query(None, description="Approaches before this date"),
+    hazardous_only: bool = Query(False),
+    min_cri: Optional[float] = Query(None, ge=0, le=100),
+    max_distance_km: Optional[float] = Query(None, ge=0),
+    compress: bool = Query(False, description="gzip the stream (Parquet uses gzip column compression)"),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream a bulk export of asteroids or close approaches
+    Rows are read through a server-side cursor, so memory stays constant regardless of size
+    """
+    try:
+        ExportService.validate_request(format, dataset)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    stmt, columns = ExportService.build_export_query(
+        dataset,
+        start_date=start_date,
+        end_date=end_date,
+        hazardous_only=hazardous_only,
+        min_cri=min_cri,
+        max_distance_km=max_distance_km
+    )
+    filename = ExportService.get_filename(dataset, format, compress)
+    
+    return StreamingResponse(
+        ExportService.stream_export(db, stmt, columns, format, compress),
+        media_type=ExportService.get_media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/{asteroid_id}", response_model=AsteroidDetailResponse)
 def get_asteroid_detail(
     asteroid_id: str,
@@ -151,14 +237,14 @@ def search_asteroids(
 
 
 @router.post("/sync/{neo_id}")
-def sync_asteroid(
+async def sync_asteroid(
     neo_id: str,
     user_id: str = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Force sync specific asteroid from NASA API"""
     try:
-        asteroid = AsteroidService.sync_asteroid_from_nasa(db, neo_id)
+        asteroid = await AsteroidService.sync_asteroid_from_nasa(db, neo_id)
         return {
             "success": True,
             "asteroid_id": str(asteroid.id),
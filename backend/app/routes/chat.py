@@ -1,83 +1,81 @@
 """
 Chatbot routes for AI-powered asteroid assistance
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import get_current_user
 from app.services.chatbot_service import ChatbotService
+from app.services.conversation_store import conversation_store
 from app.schemas.schemas import ChatMessageRequest, ChatMessageResponse, ConversationResponse
-from app.models.models import User
 
 router = APIRouter(prefix="/chat", tags=["chatbot"])
 
 
-# In-memory storage for conversations (can be moved to database for persistence)
-conversations = {}
+async def _load_history(
+    db: AsyncSession,
+    conversation_id: Optional[str],
+    user_id: str
+) -> Tuple[Optional[str], List[dict]]:
+    """Rolling summary and the role/content messages it does not cover; empty for a new conversation"""
+    if not conversation_id:
+        return None, []
+    conversation = await db.run_sync(conversation_store.get, conversation_id, user_id)
+    if conversation is None:
+        return None, []
+    return conversation.summary, [
+        {"role": message["role"], "content": message["content"]}
+        for message in conversation.messages_after(conversation.summary_seq)
+    ]
 
 
 @router.post("/message", response_model=ChatMessageResponse)
 async def send_message(
     request: ChatMessageRequest,
     user_id: str = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a message to the AI chatbot
     Receives intelligent responses about asteroids and NEO monitoring
     """
     try:
-        # Get or create conversation
-        conversation_id = request.conversation_id or str(uuid4())
-        
-        if conversation_id not in conversations:
-            conversations[conversation_id] = {
-                "user_id": user_id,
-                "messages": [],
-                "created_at": datetime.now(timezone.utc),
-                "last_message_at": datetime.now(timezone.utc)
-            }
-        
-        # Verify user owns this conversation
-        if conversations[conversation_id]["user_id"] != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You don't have access to this conversation"
-            )
-        
-        # Add user message to history
-        conversation = conversations[conversation_id]
-        conversation["messages"].append({
-            "role": "user",
-            "content": request.message
-        })
+        summary, history = await _load_history(db, request.conversation_id, user_id)
         
         # Get AI response
-        response_text = await ChatbotService.get_ai_response(
-            db,
-            request.message,
-            conversation["messages"][:-1]  # Exclude the message we just added
-        )
-        
-        # Add assistant response to history
-        conversation["messages"].append({
-            "role": "assistant",
-            "content": response_text
-        })
+        response_text = await ChatbotService.get_ai_response(db, request.message, history, summary)
         
-        conversation["last_message_at"] = datetime.now(timezone.utc)
+        # Store the exchange; creates the conversation on its first message
+        conversation = await db.run_sync(
+            conversation_store.append,
+            request.conversation_id,
+            user_id,
+            [("user", request.message), ("assistant", response_text)]
+        )
+        await db.commit()
         
         return ChatMessageResponse(
             response=response_text,
-            conversation_id=conversation_id,
+            conversation_id=conversation.id,
             timestamp=datetime.now(timezone.utc)
         )
         
-    except HTTPException:
-        raise
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,6 +83,38 @@ async def send_message(
         )
 
 
+@router.post("/message/stream")
+async def stream_message(
+    request: ChatMessageRequest,
+    http_request: Request,
+    user_id: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Send a message and stream the reply as Server-Sent Events
+    Events: start, delta (one per token chunk), then done or error
+    """
+    try:
+        summary, history = await _load_history(db, request.conversation_id, user_id)
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    conversation_id = request.conversation_id or str(uuid4())
+    return StreamingResponse(
+        ChatbotService.stream_chat(http_request, user_id, conversation_id, request.message, history, summary),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/conversations/{conversation_id}", response_model=ConversationResponse)
 def get_conversation(
     conversation_id: str,
@@ -92,50 +122,47 @@ def get_conversation(
     db: Session = Depends(get_db)
 ):
     """Get full conversation history"""
-    
-    if conversation_id not in conversations:
+    try:
+        conv = conversation_store.get(db, conversation_id, user_id)
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
+            detail=str(e)
         )
     
-    conv = conversations[conversation_id]
-    
-    # Verify ownership
-    if conv["user_id"] != user_id:
+    if conv is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this conversation"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
         )
     
     return ConversationResponse(
-        conversation_id=conversation_id,
-        messages=conv["messages"],
-        created_at=conv["created_at"],
-        last_message_at=conv["last_message_at"]
+        conversation_id=conv.id,
+        messages=conv.messages,
+        created_at=conv.created_at,
+        last_message_at=conv.last_message_at
     )
 
 
 @router.get("/conversations", response_model=list)
 def list_conversations(
+    limit: int = Query(20, ge=1, le=100),
     user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all user's conversations"""
-    
-    user_conversations = [
-        {
-            "conversation_id": conv_id,
-            "created_at": conv["created_at"],
-            "last_message_at": conv["last_message_at"],
-            "message_count": len(conv["messages"]),
-            "preview": conv["messages"][0]["content"][:100] if conv["messages"] else ""
-        }
-        for conv_id, conv in conversations.items()
-        if conv["user_id"] == user_id
-    ]
-    
-    return sorted(user_conversations, key=lambda x: x["last_message_at"], reverse=True)
+    """List the user's conversations, most recent first"""
+    try:
+        return conversation_store.list_for_user(db, user_id, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.delete("/conversations/{conversation_id}")
@@ -145,22 +172,24 @@ def delete_conversation(
     db: Session = Depends(get_db)
 ):
     """Delete a conversation"""
-    
-    if conversation_id not in conversations:
+    try:
+        conversation_store.delete(db, conversation_id, user_id)
+        db.commit()
+    except PermissionError as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
         )
-    
-    conv = conversations[conversation_id]
-    
-    # Verify ownership
-    if conv["user_id"] != user_id:
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have access to this conversation"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
         )
     
-    del conversations[conversation_id]
-    
     return {"message": "Conversation deleted successfully"}
+
+
+@router.get("/cache-stats")
+def get_cache_stats(user_id: str = Depends(get_current_user)):
+    """Hit rates of this worker's chat caches"""
+    return ChatbotService.cache_stats()
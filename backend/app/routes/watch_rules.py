@@ -0,0 +1,115 @@
+"""
+Watch rule routes
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.services.watch_rule_service import WatchRuleService
+from app.schemas.schemas import WatchRuleRequest, WatchRuleResponse, WatchRuleMatchesResponse
+
+router = APIRouter(prefix="/watch-rules", tags=["watch-rules"])
+
+
+@router.get("", response_model=List[WatchRuleResponse])
+def list_watch_rules(
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List the user's watch rules"""
+    try:
+        return WatchRuleService.list_rules(db, user_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("", response_model=WatchRuleResponse)
+def create_watch_rule(
+    request: WatchRuleRequest,
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create a watch rule; matching approaches raise WATCH_RULE alerts after each sync"""
+    try:
+        return WatchRuleService.create_rule(db, user_id, request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.put("/{rule_id}", response_model=WatchRuleResponse)
+def update_watch_rule(
+    rule_id: str,
+    request: WatchRuleRequest,
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Replace a watch rule"""
+    try:
+        return WatchRuleService.update_rule(db, user_id, rule_id, request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.delete("/{rule_id}")
+def delete_watch_rule(
+    rule_id: str,
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a watch rule"""
+    try:
+        WatchRuleService.delete_rule(db, user_id, rule_id)
+        return {"success": True, "message": "Watch rule deleted"}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/{rule_id}/matches", response_model=WatchRuleMatchesResponse)
+def get_watch_rule_matches(
+    rule_id: str,
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upcoming close approaches currently matching a watch rule"""
+    try:
+        return WatchRuleService.get_rule_matches(db, user_id, rule_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
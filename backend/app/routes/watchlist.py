@@ -1,14 +1,20 @@
 """
 Watchlist routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.security import get_current_user
+from app.services.export_service import ExportService
 from app.services.watchlist_service import WatchlistService
 from app.schemas.schemas import (
-    WatchlistAddRequest, WatchlistUpdateRequest, WatchlistItemResponse, WatchlistResponse
+    WatchlistAddRequest, WatchlistUpdateRequest, WatchlistItemResponse, WatchlistResponse,
+    WatchlistImportResponse
 )
 
 router = APIRouter(prefix="/watchlist", tags=["watchlist"])
@@ -16,12 +22,15 @@ router = APIRouter(prefix="/watchlist", tags=["watchlist"])
 
 @router.get("", response_model=WatchlistResponse)
 def get_watchlist(
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    sort: str = Query("added_desc", description="added_desc, added_asc, risk_desc, risk_asc, date_asc, date_desc"),
     user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get user's watchlist"""
     try:
-        return WatchlistService.get_user_watchlist(db, user_id)
+        return WatchlistService.get_user_watchlist(db, user_id, page, limit, sort)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,6 +59,59 @@ def add_to_watchlist(
         )
 
 
+@router.post("/import", response_model=WatchlistImportResponse)
+async def import_watchlist(
+    request: Request,
+    user_id: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk add asteroids by NASA neo_id
+    Body is CSV (Content-Type: text/csv) with a neo_id column, or a JSON list of entries
+    """
+    try:
+        items = WatchlistService.parse_import(await request.body(), request.headers.get("content-type", ""))
+        return await WatchlistService.import_watchlist(db, user_id, items)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get("/export")
+def export_watchlist(
+    format: str = Query("csv", description="csv, ndjson, parquet"),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream the user's watchlist in the same columns the import accepts
+    """
+    try:
+        ExportService.validate_format(format)
+        user_uuid = UUID(user_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    stmt, columns = ExportService.build_watchlist_query(user_uuid)
+    filename = ExportService.get_filename("watchlist", format, False)
+    
+    return StreamingResponse(
+        ExportService.stream_export(db, stmt, columns, format),
+        media_type=ExportService.get_media_type(format, False),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.delete("/{asteroid_id}")
 def remove_from_watchlist(
     asteroid_id: str,
@@ -117,6 +117,9 @@ class AsteroidDetailResponse(BaseModel):
     # All approaches
     all_approaches: List[CloseApproachResponse] = []
     
+    # Users watching this asteroid
+    watcher_count: int = 0
+    
     # Timestamps
     created_at: datetime
     nasa_synced_at: Optional[datetime] = None
@@ -124,6 +127,28 @@ class AsteroidDetailResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ApproachWindowItem(BaseModel):
+    """Close approach row with its asteroid summary"""
+    id: str
+    asteroid_id: str
+    neo_id: str
+    asteroid_name: str
+    is_hazardous: bool = False
+    diameter_km: Optional[float] = None
+    closest_approach_date: datetime
+    miss_distance_km: Optional[float] = None
+    miss_distance_au: Optional[float] = None
+    approach_velocity_kmh: Optional[float] = None
+    calculated_cri: Optional[float] = None
+
+
+class ApproachWindowResponse(BaseModel):
+    """Keyset-paginated close approaches"""
+    items: List[ApproachWindowItem]
+    page_size: int
+    next_cursor: Optional[str] = None
+
+
 class AsteroidListResponse(BaseModel):
     """Paginated asteroids response"""
     items: List[AsteroidDetailResponse]
@@ -152,19 +177,89 @@ class WatchlistUpdateRequest(BaseModel):
 class WatchlistItemResponse(BaseModel):
     """Watchlist item response"""
     id: str
-    asteroid: AsteroidDetailResponse
+    asteroid: Optional[AsteroidDetailResponse] = None  # None when error is set
     alert_threshold_distance_km: Optional[float] = None
     alert_threshold_cri: Optional[float] = None
     custom_notes: Optional[str] = None
     created_at: datetime
+    error: Optional[str] = None  # Why the asteroid detail could not be loaded
     
     model_config = ConfigDict(from_attributes=True)
 
 
 class WatchlistResponse(BaseModel):
-    """User watchlist response"""
+    """Paginated user watchlist response"""
     items: List[WatchlistItemResponse]
     total_count: int
+    page: int = 1
+    page_size: int = 0
+    total_pages: int = 1
+
+
+class WatchlistImportItem(BaseModel):
+    """One watchlist import entry, keyed by NASA neo_id"""
+    neo_id: str = Field(..., min_length=1, max_length=20)
+    alert_threshold_distance_km: Optional[float] = Field(None, ge=0)
+    alert_threshold_cri: Optional[float] = Field(None, ge=0, le=100)
+    custom_notes: Optional[str] = None
+
+
+class WatchlistImportFailure(BaseModel):
+    """Import entry that could not be added"""
+    neo_id: str
+    error: str
+
+
+class WatchlistImportResponse(BaseModel):
+    """Bulk watchlist import result"""
+    imported: int
+    skipped: int  # Already in the watchlist
+    fetched_from_nasa: int
+    failed: List[WatchlistImportFailure] = []
+
+
+# ============ Watch Rule Schemas ============
+
+class WatchRuleRequest(BaseModel):
+    """Create or replace a watch rule"""
+    name: str = Field(..., min_length=1, max_length=100)
+    hazardous_only: bool = False
+    sentry_only: bool = False
+    min_diameter_km: Optional[float] = Field(None, ge=0)
+    max_distance_km: Optional[float] = Field(None, gt=0)
+    max_distance_au: Optional[float] = Field(None, gt=0)
+    min_cri: Optional[float] = Field(None, ge=0, le=100)
+    within_days: Optional[int] = Field(None, ge=1, le=365)
+    is_active: bool = True
+
+
+class WatchRuleResponse(WatchRuleRequest):
+    """Watch rule response"""
+    id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class WatchRuleMatch(BaseModel):
+    """Upcoming close approach matching a watch rule"""
+    asteroid_id: str
+    neo_id: str
+    name: str
+    is_hazardous: bool
+    diameter_km: Optional[float] = None
+    approach_id: str
+    closest_approach_date: datetime
+    miss_distance_km: Optional[float] = None
+    miss_distance_au: Optional[float] = None
+    cri_score: Optional[float] = None
+
+
+class WatchRuleMatchesResponse(BaseModel):
+    """Current matches of a watch rule"""
+    rule_id: str
+    matches: List[WatchRuleMatch]
+    total_count: int
+    data_generation: int  # Matches are cached until catalog data changes
 
 
 # ============ Alert Schemas ============
@@ -175,6 +270,7 @@ class AlertTypeEnum(str, Enum):
     RISK_SCORE = "RISK_SCORE"
     APPROACH_24H = "APPROACH_24H"
     APPROACH_72H = "APPROACH_72H"
+    WATCH_RULE = "WATCH_RULE"
 
 
 class AlertResponse(BaseModel):
@@ -193,10 +289,20 @@ class AlertResponse(BaseModel):
 
 
 class AlertListResponse(BaseModel):
-    """Paginated alerts response"""
+    """Keyset-paginated alerts response"""
     items: List[AlertResponse]
     total_count: int
     unread_count: int
+    next_cursor: Optional[str] = None
+
+
+class AlertBulkRequest(BaseModel):
+    """Select alerts by ID list and/or filter for a bulk action"""
+    alert_ids: Optional[List[str]] = Field(None, max_length=10000)
+    alert_type: Optional[AlertTypeEnum] = None
+    asteroid_id: Optional[str] = None
+    triggered_before: Optional[datetime] = None
+    is_read: Optional[bool] = None
 
 
 class AlertStatsResponse(BaseModel):
@@ -267,6 +373,21 @@ class TopThreatsResponse(BaseModel):
     calculation_timestamp: datetime
 
 
+class MostWatchedAsteroid(BaseModel):
+    """Asteroid on the most-watched leaderboard"""
+    asteroid_id: str
+    neo_id: str
+    name: str
+    is_hazardous: bool
+    watcher_count: int
+
+
+class MostWatchedResponse(BaseModel):
+    """Most watched asteroids"""
+    asteroids: List[MostWatchedAsteroid]
+    calculation_timestamp: datetime
+
+
 class UserActivityResponse(BaseModel):
     """User activity metrics"""
     total_watchlist_items: int
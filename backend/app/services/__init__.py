@@ -2,6 +2,13 @@
 from app.services.auth_service import AuthService
 from app.services.asteroid_service import AsteroidService
 from app.services.watchlist_service import WatchlistService
+from app.services.watch_rule_service import WatchRuleService
 from app.services.alert_service import AlertService
+from app.services.export_service import ExportService
+from app.services.analytics_service import AnalyticsService
+from app.services.alert_scheduler import AlertScheduler
 
-__all__ = ["AuthService", "AsteroidService", "WatchlistService", "AlertService"]
+__all__ = [
+    "AuthService", "AsteroidService", "WatchlistService", "WatchRuleService", "AlertService",
+    "ExportService", "AnalyticsService", "AlertScheduler"
+]
@@ -0,0 +1,170 @@
+"""
+Approach alert scheduler
+
+Fires APPROACH_72H and APPROACH_24H alerts the moment a watched close approach
+crosses its lead time. The schedule is rebuilt from the database at startup
+and kept current from post-commit events; the background task sleeps until
+the next alert is due instead of polling the approaches table.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import (
+    APPROACH_SCORED, WATCHLIST_CHANGED, ApproachScored, WatchlistChanged, subscribe
+)
+from app.models.models import CloseApproach, Watchlist
+from app.services.alert_service import AlertService
+from app.utils.approach_schedule import ApproachSchedule, crossed_lead
+
+logger = logging.getLogger(__name__)
+
+# Per-process queue of upcoming approaches of watched asteroids
+approach_schedule = ApproachSchedule()
+
+
+class AlertScheduler:
+    """Background task that emits time-based approach alerts"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # Asteroids that gained a watcher since the last pass
+        self._pending: Set[str] = set()
+        self._pending_lock = threading.Lock()
+
+    def rebuild(self, db: Session) -> None:
+        """Load every upcoming approach of watched asteroids with one indexed range query"""
+        watched = db.query(
+            Watchlist.asteroid_id,
+            func.count(Watchlist.id)
+        ).group_by(Watchlist.asteroid_id).all()
+
+        approaches = db.query(
+            CloseApproach.id,
+            CloseApproach.asteroid_id,
+            CloseApproach.closest_approach_date
+        ).filter(
+            CloseApproach.closest_approach_date > datetime.now(timezone.utc),
+            CloseApproach.asteroid_id.in_(select(Watchlist.asteroid_id).distinct())
+        ).yield_per(settings.export_batch_size)
+
+        approach_schedule.load(
+            ((str(asteroid_id), count) for asteroid_id, count in watched),
+            ((str(approach_id), str(asteroid_id), date) for approach_id, asteroid_id, date in approaches)
+        )
+
+    async def start(self) -> None:
+        """Start the scheduler on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self) -> None:
+        """Re-evaluate the queue now; safe to call from any thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def apply_approach_scores(self, changes: List[ApproachScored]) -> None:
+        """Schedule new or re-dated approaches of watched asteroids"""
+        earliest = approach_schedule.upsert_many(
+            (c.approach_id, c.asteroid_id, c.closest_approach_date) for c in changes
+        )
+        if earliest is not None:
+            self.wake()
+
+    def apply_watchlist_changes(self, changes: List[WatchlistChanged]) -> None:
+        """Track watched asteroids; new watchers get their approaches loaded on the next pass"""
+        added = False
+        for change in changes:
+            if change.action == "added":
+                approach_schedule.watch(change.asteroid_id)
+                with self._pending_lock:
+                    self._pending.add(change.asteroid_id)
+                added = True
+            elif change.action == "removed":
+                approach_schedule.unwatch(change.asteroid_id)
+        if added:
+            self.wake()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self._process()
+            except Exception:
+                logger.exception("Approach alert pass failed")
+
+            timeout = settings.approach_alert_max_sleep_seconds
+            next_fire_at = approach_schedule.next_fire_at()
+            if next_fire_at is not None:
+                delay = (next_fire_at - datetime.now(timezone.utc)).total_seconds()
+                timeout = min(timeout, max(delay, 0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self) -> None:
+        """Load newly watched asteroids and fire every alert that is due"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+
+        now = datetime.now(timezone.utc)
+        due = approach_schedule.pop_due(now)
+        if not pending and not due:
+            return
+
+        async with AsyncSessionLocal() as db:
+            if pending:
+                rows = await db.run_sync(AlertScheduler._upcoming_approaches, pending)
+                approach_schedule.upsert_many(rows)
+                # New watchers of approaches already inside a lead window are alerted right away
+                for approach_id, asteroid_id, date in rows:
+                    alert_type = crossed_lead(date, now)
+                    if alert_type is not None:
+                        due.append((approach_id, asteroid_id, alert_type, date))
+                due.extend(approach_schedule.pop_due(now))
+
+            if due:
+                created = await db.run_sync(AlertService.create_approach_alerts, due)
+                await db.commit()
+                if created:
+                    logger.info("Triggered %d approach alerts", created)
+
+    @staticmethod
+    def _upcoming_approaches(db: Session, asteroid_ids: Set[str]) -> List[Tuple[str, str, datetime]]:
+        rows = db.query(
+            CloseApproach.id,
+            CloseApproach.asteroid_id,
+            CloseApproach.closest_approach_date
+        ).filter(
+            CloseApproach.asteroid_id.in_([UUID(asteroid_id) for asteroid_id in asteroid_ids]),
+            CloseApproach.closest_approach_date > datetime.now(timezone.utc)
+        ).all()
+        return [(str(approach_id), str(asteroid_id), date) for approach_id, asteroid_id, date in rows]
+
+
+alert_scheduler = AlertScheduler()
+
+subscribe(APPROACH_SCORED, alert_scheduler.apply_approach_scores)
+subscribe(WATCHLIST_CHANGED, alert_scheduler.apply_watchlist_changes)
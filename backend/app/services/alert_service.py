@@ -2,15 +2,27 @@
 Alert system service
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from datetime import datetime, timezone
-from typing import List
-from uuid import UUID
+from sqlalchemy import and_, or_, bindparam, case, delete, func, select, tuple_, update
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
 
-from app.models.models import Alert, User, Asteroid, CloseApproach, Watchlist
+from app.core.config import settings
+from app.core.database import get_upsert_insert
+from app.core.events import ALERT_CREATED, ALERTS_CHANGED, AlertCreated, ApproachScored, emit_after_commit
+from app.models.models import (
+    Alert, AlertDailyCount, User, Asteroid, CloseApproach, NotificationOutbox, Watchlist
+)
+from app.services.notification_service import NotificationService
 from app.schemas.schemas import (
-    AlertResponse, AlertListResponse, AlertStatsResponse, AlertTypeEnum
+    AlertResponse, AlertListResponse, AlertStatsResponse, AlertTypeEnum, AlertBulkRequest
 )
+from app.utils.approach_schedule import APPROACH_LEADS
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# (counter column, lower CRI bound) for the severity bands reported by /alerts/stats
+SEVERITY_BANDS = [("critical", 80), ("high", 60), ("medium", 40)]
+COUNTER_COLUMNS = ["total", "unread"] + [column for column, _ in SEVERITY_BANDS]
 
 
 class AlertService:
@@ -37,35 +49,224 @@ class AlertService:
         except ValueError:
             raise ValueError("Invalid IDs")
         
-        # Check if alert already exists (prevent duplicates)
-        existing = db.query(Alert).filter(
+        # The unique constraint turns a duplicate into a no-op
+        AlertService.bulk_create_alerts(db, [
+            AlertService.build_alert_row(
+                user_uuid, asteroid_uuid, approach_uuid, alert_type,
+                triggered_reason, cri_score, distance_km
+            )
+        ])
+        db.commit()
+        
+        return db.query(Alert).filter(
             and_(
                 Alert.user_id == user_uuid,
                 Alert.close_approach_id == approach_uuid,
                 Alert.alert_type == alert_type.value
             )
         ).first()
+    
+    @staticmethod
+    def build_alert_row(
+        user_id: UUID,
+        asteroid_id: UUID,
+        close_approach_id: UUID,
+        alert_type: AlertTypeEnum,
+        triggered_reason: str,
+        cri_score: Optional[float],
+        distance_km: Optional[float],
+        triggered_at: Optional[datetime] = None
+    ) -> dict:
+        """Column values for one new alert, ready for bulk_create_alerts"""
+        triggered_at = triggered_at or datetime.now(timezone.utc)
+        return {
+            "id": uuid4(),
+            "user_id": user_id,
+            "asteroid_id": asteroid_id,
+            "close_approach_id": close_approach_id,
+            "alert_type": alert_type.value,
+            "triggered_reason": triggered_reason,
+            "cri_score_at_trigger": cri_score,
+            "distance_at_trigger_km": distance_km,
+            "is_read": False,
+            "is_notified": False,
+            "triggered_at": triggered_at,
+            "created_at": triggered_at,
+        }
+    
+    @staticmethod
+    def bulk_create_alerts(db: Session, rows: List[dict], chunk_size: int = 1000) -> List[dict]:
+        """
+        Insert alerts in bulk, skipping any that already exist
+        Returns the rows actually inserted; the caller commits
+        """
+        if not rows:
+            return []
         
-        if existing:
-            return existing
-        
-        alert = Alert(
-            user_id=user_uuid,
-            asteroid_id=asteroid_uuid,
-            close_approach_id=approach_uuid,
-            alert_type=alert_type.value,
-            triggered_reason=triggered_reason,
-            cri_score_at_trigger=cri_score,
-            distance_at_trigger_km=distance_km,
-            is_read=False,
-            is_notified=False
-        )
+        insert = get_upsert_insert(db)
+        inserted_ids = set()
+        for offset in range(0, len(rows), chunk_size):
+            chunk = rows[offset:offset + chunk_size]
+            stmt = insert(Alert).values(chunk).on_conflict_do_nothing().returning(Alert.id)
+            inserted_ids.update(db.execute(stmt).scalars().all())
         
-        db.add(alert)
-        db.commit()
-        db.refresh(alert)
+        inserted = [row for row in rows if row["id"] in inserted_ids]
+        AlertService.apply_counter_deltas(db, (
+            AlertService.alert_counter_delta(
+                row["user_id"], row["triggered_at"], row["alert_type"], row["cri_score_at_trigger"], row["is_read"]
+            )
+            for row in inserted
+        ))
+        NotificationService.enqueue_alerts(db, inserted)
+        for row in inserted:
+            emit_after_commit(db, ALERT_CREATED, AlertCreated(alert_id=str(row["id"]), user_id=str(row["user_id"])))
+        for user_id in {str(row["user_id"]) for row in inserted}:
+            emit_after_commit(db, ALERTS_CHANGED, user_id)
         
-        return alert
+        return inserted
+    
+    @staticmethod
+    def alert_counter_delta(
+        user_id: UUID,
+        triggered_at: datetime,
+        alert_type: str,
+        cri_score: Optional[float],
+        is_read: bool,
+        sign: int = 1
+    ) -> Tuple[Tuple[UUID, date, str], Dict[str, int]]:
+        """Daily counter key and change for inserting (sign=1) or deleting (sign=-1) one alert"""
+        if triggered_at.tzinfo is None:
+            triggered_at = triggered_at.replace(tzinfo=timezone.utc)
+        key = (user_id, triggered_at.astimezone(timezone.utc).date(), alert_type)
+        
+        values = {"total": sign, "unread": 0 if is_read else sign}
+        for column, lower in SEVERITY_BANDS:
+            if (cri_score or 0) >= lower:
+                values[column] = sign
+                break
+        return key, values
+    
+    @staticmethod
+    def apply_counter_deltas(
+        db: Session,
+        deltas: Iterable[Tuple[Tuple[UUID, date, str], Dict[str, int]]],
+        chunk_size: int = 1000
+    ) -> None:
+        """
+        Fold counter changes into alert_daily_counts with one upsert per chunk
+        and into the users' alert counters with one batched UPDATE; the caller commits
+        """
+        merged = {}
+        per_user = {}
+        for key, values in deltas:
+            counters = merged.setdefault(key, dict.fromkeys(COUNTER_COLUMNS, 0))
+            for column, value in values.items():
+                counters[column] += value
+            user_counters = per_user.setdefault(key[0], {"total": 0, "unread": 0})
+            user_counters["total"] += values.get("total", 0)
+            user_counters["unread"] += values.get("unread", 0)
+        
+        user_rows = [
+            {"user_uuid": user_id, "total_delta": counters["total"], "unread_delta": counters["unread"]}
+            for user_id, counters in per_user.items()
+            if counters["total"] or counters["unread"]
+        ]
+        if user_rows:
+            db.execute(
+                update(User.__table__).where(
+                    User.__table__.c.id == bindparam("user_uuid")
+                ).values(
+                    alert_count=User.__table__.c.alert_count + bindparam("total_delta"),
+                    unread_alert_count=User.__table__.c.unread_alert_count + bindparam("unread_delta")
+                ),
+                user_rows
+            )
+        
+        rows = [
+            {"user_id": user_id, "day": day, "alert_type": alert_type, **counters}
+            for (user_id, day, alert_type), counters in merged.items()
+            if any(counters.values())
+        ]
+        if not rows:
+            return
+        
+        insert = get_upsert_insert(db)
+        for offset in range(0, len(rows), chunk_size):
+            stmt = insert(AlertDailyCount).values(rows[offset:offset + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "day", "alert_type"],
+                set_={
+                    column: getattr(AlertDailyCount, column) + getattr(stmt.excluded, column)
+                    for column in COUNTER_COLUMNS
+                }
+            )
+            db.execute(stmt)
+    
+    @staticmethod
+    def backfill_daily_counts(db: Session) -> int:
+        """
+        Rebuild alert_daily_counts from the alerts table with one GROUP BY
+        Returns count of counter rows written; the caller commits
+        """
+        # UTC day, as alert_counter_delta buckets it, whatever the session time zone
+        if db.get_bind().dialect.name == "postgresql":
+            day = func.date(func.timezone("UTC", Alert.triggered_at))
+        else:
+            # SQLite stores the UTC wall time
+            day = func.date(Alert.triggered_at)
+        severity_columns = []
+        upper = None
+        for column, lower in SEVERITY_BANDS:
+            condition = Alert.cri_score_at_trigger >= lower
+            if upper is not None:
+                condition = condition & (Alert.cri_score_at_trigger < upper)
+            severity_columns.append(func.sum(case((condition, 1), else_=0)).label(column))
+            upper = lower
+        
+        grouped = db.execute(
+            select(
+                Alert.user_id,
+                day.label("day"),
+                Alert.alert_type,
+                func.count(Alert.id).label("total"),
+                func.sum(case((Alert.is_read == False, 1), else_=0)).label("unread"),
+                *severity_columns
+            ).group_by(Alert.user_id, day, Alert.alert_type)
+        ).all()
+        
+        db.query(AlertDailyCount).delete(synchronize_session=False)
+        rows = [
+            {
+                "user_id": row.user_id,
+                # SQLite's date() returns text
+                "day": date.fromisoformat(row.day) if isinstance(row.day, str) else row.day,
+                "alert_type": row.alert_type,
+                **{column: getattr(row, column) or 0 for column in COUNTER_COLUMNS}
+            }
+            for row in grouped
+        ]
+        for offset in range(0, len(rows), 1000):
+            db.execute(AlertDailyCount.__table__.insert(), rows[offset:offset + 1000])
+        
+        # Per-user totals are the sums of the daily rows
+        user_totals = {}
+        for row in rows:
+            totals = user_totals.setdefault(row["user_id"], [0, 0])
+            totals[0] += row["total"]
+            totals[1] += row["unread"]
+        db.query(User).update({User.alert_count: 0, User.unread_alert_count: 0}, synchronize_session=False)
+        if user_totals:
+            db.execute(
+                update(User.__table__).where(
+                    User.__table__.c.id == bindparam("user_uuid")
+                ).values(alert_count=bindparam("total"), unread_alert_count=bindparam("unread")),
+                [
+                    {"user_uuid": user_id, "total": total, "unread": unread}
+                    for user_id, (total, unread) in user_totals.items()
+                ]
+            )
+        
+        return len(rows)
     
     @staticmethod
     def get_user_alerts(
@@ -73,52 +274,77 @@ class AlertService:
         user_id: str,
         unread_only: bool = False,
         limit: int = 50,
-        offset: int = 0
+        cursor: Optional[str] = None
     ) -> AlertListResponse:
-        """Get user alerts"""
+        """
+        Get user alerts, newest first, keyset-paginated on (triggered_at, id)
+        One query per page: asteroid names and the user's maintained counters are joined in
+        """
         try:
             user_uuid = UUID(user_id)
         except ValueError:
             raise ValueError("Invalid user ID")
         
-        query = db.query(Alert).filter(Alert.user_id == user_uuid)
+        query = db.query(
+            Alert,
+            Asteroid.name,
+            User.alert_count,
+            User.unread_alert_count
+        ).join(
+            Asteroid, Asteroid.id == Alert.asteroid_id
+        ).join(
+            User, User.id == Alert.user_id
+        ).filter(Alert.user_id == user_uuid)
         
         if unread_only:
             query = query.filter(Alert.is_read == False)
         
-        total_count = query.count()
+        position = decode_cursor(cursor)
+        if position is not None:
+            last_triggered_at, last_id = position
+            try:
+                last_id = UUID(last_id)
+            except ValueError:
+                raise ValueError("Invalid pagination cursor")
+            query = query.filter(tuple_(Alert.triggered_at, Alert.id) < (last_triggered_at, last_id))
         
-        alerts = query.order_by(Alert.triggered_at.desc()).limit(limit).offset(offset).all()
+        rows = query.order_by(
+            Alert.triggered_at.desc(), Alert.id.desc()
+        ).limit(limit + 1).all()
         
-        # Get unread count
-        unread_count = db.query(Alert).filter(
-            and_(
-                Alert.user_id == user_uuid,
-                Alert.is_read == False
-            )
-        ).count()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1].Alert
+            next_cursor = encode_cursor(last.triggered_at, last.id)
+        
+        if rows:
+            total_count, unread_count = rows[0].alert_count, rows[0].unread_alert_count
+        else:
+            total_count, unread_count = db.query(
+                User.alert_count, User.unread_alert_count
+            ).filter(User.id == user_uuid).one_or_none() or (0, 0)
         
         response_items = [
             AlertResponse(
-                id=str(alert.id),
-                asteroid_id=str(alert.asteroid_id),
-                asteroid_name=db.query(Asteroid.name).filter(
-                    Asteroid.id == alert.asteroid_id
-                ).scalar(),
-                alert_type=alert.alert_type,
-                triggered_reason=alert.triggered_reason,
-                cri_score_at_trigger=alert.cri_score_at_trigger,
-                distance_at_trigger_km=alert.distance_at_trigger_km,
-                is_read=alert.is_read,
-                triggered_at=alert.triggered_at
+                id=str(row.Alert.id),
+                asteroid_id=str(row.Alert.asteroid_id),
+                asteroid_name=row.name,
+                alert_type=row.Alert.alert_type,
+                triggered_reason=row.Alert.triggered_reason,
+                cri_score_at_trigger=row.Alert.cri_score_at_trigger,
+                distance_at_trigger_km=row.Alert.distance_at_trigger_km,
+                is_read=row.Alert.is_read,
+                triggered_at=row.Alert.triggered_at
             )
-            for alert in alerts
+            for row in rows
         ]
         
         return AlertListResponse(
             items=response_items,
-            total_count=total_count,
-            unread_count=unread_count
+            total_count=unread_count if unread_only else total_count,
+            unread_count=unread_count,
+            next_cursor=next_cursor
         )
     
     @staticmethod
@@ -130,6 +356,30 @@ class AlertService:
         except ValueError:
             raise ValueError("Invalid IDs")
         
+        # Only the request that flips is_read decrements the unread counters
+        flipped = db.execute(
+            update(Alert).where(
+                and_(
+                    Alert.id == alert_uuid,
+                    Alert.user_id == user_uuid,
+                    Alert.is_read == False
+                )
+            ).values(
+                is_read=True,
+                read_at=datetime.now(timezone.utc)
+            ).returning(
+                Alert.user_id, Alert.triggered_at, Alert.alert_type, Alert.cri_score_at_trigger
+            ).execution_options(synchronize_session=False)
+        ).first()
+        
+        if flipped is not None:
+            key, _ = AlertService.alert_counter_delta(
+                flipped.user_id, flipped.triggered_at, flipped.alert_type, flipped.cri_score_at_trigger, False
+            )
+            AlertService.apply_counter_deltas(db, [(key, {"unread": -1})])
+            emit_after_commit(db, ALERTS_CHANGED, str(user_uuid))
+        db.commit()
+        
         alert = db.query(Alert).filter(
             and_(
                 Alert.id == alert_uuid,
@@ -140,12 +390,6 @@ class AlertService:
         if not alert:
             raise ValueError("Alert not found")
         
-        alert.is_read = True
-        alert.read_at = datetime.now(timezone.utc)
-        
-        db.commit()
-        db.refresh(alert)
-        
         return alert
     
     @staticmethod
@@ -157,75 +401,193 @@ class AlertService:
         except ValueError:
             raise ValueError("Invalid IDs")
         
-        alert = db.query(Alert).filter(
-            and_(
-                Alert.id == alert_uuid,
-                Alert.user_id == user_uuid
-            )
-        ).first()
-        
-        if not alert:
+        # DELETE ... RETURNING: a concurrent delete of the same alert finds nothing to decrement
+        deleted = AlertService._delete_where(db, [Alert.id == alert_uuid, Alert.user_id == user_uuid])
+        if not deleted:
             raise ValueError("Alert not found")
-        
-        db.delete(alert)
         db.commit()
         
         return True
     
     @staticmethod
-    def get_alert_stats(db: Session, user_id: str, days: int = 7) -> AlertStatsResponse:
-        """Get alert statistics"""
+    def _bulk_conditions(user_uuid: UUID, request: Optional[AlertBulkRequest]) -> list:
+        """WHERE clauses selecting a user's alerts by ID list and/or filter"""
+        conditions = [Alert.user_id == user_uuid]
+        if request is None:
+            return conditions
+        
+        if request.alert_ids is not None:
+            try:
+                conditions.append(Alert.id.in_([UUID(alert_id) for alert_id in request.alert_ids]))
+            except ValueError:
+                raise ValueError("Invalid alert ID")
+        if request.alert_type is not None:
+            conditions.append(Alert.alert_type == request.alert_type.value)
+        if request.asteroid_id is not None:
+            try:
+                conditions.append(Alert.asteroid_id == UUID(request.asteroid_id))
+            except ValueError:
+                raise ValueError("Invalid asteroid ID")
+        if request.triggered_before is not None:
+            conditions.append(Alert.triggered_at < request.triggered_before)
+        if request.is_read is not None:
+            conditions.append(Alert.is_read == request.is_read)
+        return conditions
+    
+    @staticmethod
+    def mark_alerts_read(db: Session, user_id: str, request: Optional[AlertBulkRequest] = None) -> int:
+        """
+        Mark the selected unread alerts read with one UPDATE; no request selects all
+        Returns count of alerts updated
+        """
         try:
             user_uuid = UUID(user_id)
         except ValueError:
             raise ValueError("Invalid user ID")
         
-        cutoff = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        cutoff -= __import__('datetime').timedelta(days=days)
+        conditions = AlertService._bulk_conditions(user_uuid, request)
+        conditions.append(Alert.is_read == False)
         
-        query = db.query(Alert).filter(
-            and_(
-                Alert.user_id == user_uuid,
-                Alert.triggered_at >= cutoff
-            )
-        )
+        updated = db.execute(
+            update(Alert).where(and_(*conditions)).values(
+                is_read=True,
+                read_at=datetime.now(timezone.utc)
+            ).returning(
+                Alert.user_id, Alert.triggered_at, Alert.alert_type, Alert.cri_score_at_trigger
+            ).execution_options(synchronize_session=False)
+        ).all()
         
-        total = query.count()
-        unread = query.filter(Alert.is_read == False).count()
-        critical = query.filter(Alert.cri_score_at_trigger >= 80).count()
-        high = query.filter(
-            and_(
-                Alert.cri_score_at_trigger >= 60,
-                Alert.cri_score_at_trigger < 80
+        AlertService.apply_counter_deltas(db, (
+            (AlertService.alert_counter_delta(
+                row.user_id, row.triggered_at, row.alert_type, row.cri_score_at_trigger, False
+            )[0], {"unread": -1})
+            for row in updated
+        ))
+        if updated:
+            emit_after_commit(db, ALERTS_CHANGED, str(user_uuid))
+        db.commit()
+        
+        return len(updated)
+    
+    @staticmethod
+    def delete_alerts(db: Session, user_id: str, request: AlertBulkRequest) -> int:
+        """
+        Delete the selected alerts with one DELETE
+        Returns count of alerts deleted
+        """
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            raise ValueError("Invalid user ID")
+        
+        if not request.model_dump(exclude_none=True):
+            raise ValueError("Select alerts by alert_ids or at least one filter")
+        
+        deleted = AlertService._delete_where(db, AlertService._bulk_conditions(user_uuid, request))
+        db.commit()
+        
+        return deleted
+    
+    @staticmethod
+    def purge_read_alerts(
+        db: Session,
+        older_than_days: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Delete read alerts older than the retention window, committing one bounded chunk at a time
+        Returns count of alerts deleted
+        """
+        older_than_days = older_than_days if older_than_days is not None else settings.alert_retention_days
+        chunk_size = chunk_size or settings.alert_purge_chunk_size
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        
+        purged = 0
+        while True:
+            alert_ids = db.execute(
+                select(Alert.id).where(
+                    and_(Alert.is_read == True, Alert.triggered_at < cutoff)
+                ).order_by(Alert.triggered_at).limit(chunk_size)
+            ).scalars().all()
+            if not alert_ids:
+                break
+            
+            purged += AlertService._delete_where(db, [Alert.id.in_(alert_ids)])
+            db.commit()
+            if len(alert_ids) < chunk_size:
+                break
+        
+        # Days whose alerts are all gone no longer need a counter row
+        db.query(AlertDailyCount).filter(AlertDailyCount.total <= 0).delete(synchronize_session=False)
+        db.commit()
+        
+        return purged
+    
+    @staticmethod
+    def _delete_where(db: Session, conditions: list) -> int:
+        """Delete matching alerts and their outbox rows, keeping counters in step; the caller commits"""
+        deleted = db.execute(
+            delete(Alert).where(and_(*conditions)).returning(
+                Alert.id, Alert.user_id, Alert.triggered_at, Alert.alert_type,
+                Alert.cri_score_at_trigger, Alert.is_read
+            ).execution_options(synchronize_session=False)
+        ).all()
+        if not deleted:
+            return 0
+        
+        alert_ids = [row.id for row in deleted]
+        for offset in range(0, len(alert_ids), 1000):
+            db.execute(
+                delete(NotificationOutbox).where(
+                    NotificationOutbox.alert_id.in_(alert_ids[offset:offset + 1000])
+                ).execution_options(synchronize_session=False)
             )
-        ).count()
-        medium = query.filter(
-            and_(
-                Alert.cri_score_at_trigger >= 40,
-                Alert.cri_score_at_trigger < 60
+        
+        AlertService.apply_counter_deltas(db, (
+            AlertService.alert_counter_delta(
+                row.user_id, row.triggered_at, row.alert_type, row.cri_score_at_trigger, row.is_read, sign=-1
             )
-        ).count()
+            for row in deleted
+        ))
+        for user_id in {str(row.user_id) for row in deleted}:
+            emit_after_commit(db, ALERTS_CHANGED, user_id)
+        
+        return len(deleted)
+    
+    @staticmethod
+    def get_alert_stats(db: Session, user_id: str, days: int = 7) -> AlertStatsResponse:
+        """Get alert statistics from the daily counters, at most one row per day and type"""
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            raise ValueError("Invalid user ID")
+        
+        cutoff = datetime.now(timezone.utc).date() - timedelta(days=days)
         
-        # Count by type
-        from sqlalchemy import func as sql_func
         type_counts = db.query(
-            Alert.alert_type,
-            sql_func.count(Alert.id).label('count')
+            AlertDailyCount.alert_type,
+            *[func.sum(getattr(AlertDailyCount, column)).label(column) for column in COUNTER_COLUMNS]
         ).filter(
             and_(
-                Alert.user_id == user_uuid,
-                Alert.triggered_at >= cutoff
+                AlertDailyCount.user_id == user_uuid,
+                AlertDailyCount.day >= cutoff
             )
-        ).group_by(Alert.alert_type).all()
+        ).group_by(AlertDailyCount.alert_type).all()
         
-        alerts_by_type = {t[0]: t[1] for t in type_counts}
+        totals = dict.fromkeys(COUNTER_COLUMNS, 0)
+        alerts_by_type = {}
+        for row in type_counts:
+            for column in COUNTER_COLUMNS:
+                totals[column] += getattr(row, column) or 0
+            if row.total:
+                alerts_by_type[row.alert_type] = row.total
         
         return AlertStatsResponse(
-            total_alerts=total,
-            unread_alerts=unread,
-            critical_alerts=critical,
-            high_alerts=high,
-            medium_alerts=medium,
+            total_alerts=totals["total"],
+            unread_alerts=totals["unread"],
+            critical_alerts=totals["critical"],
+            high_alerts=totals["high"],
+            medium_alerts=totals["medium"],
             alerts_by_type=alerts_by_type
         )
     
@@ -240,51 +602,186 @@ class AlertService:
         except ValueError:
             raise ValueError("Invalid user ID")
         
-        alerts_triggered = 0
+        result = AlertService.evaluate_thresholds(db, user_ids=[user_uuid])
+        db.commit()
         
-        # Get all watchlist items
-        watchlist_items = db.query(Watchlist).filter(Watchlist.user_id == user_uuid).all()
+        return result["triggered"]
+    
+    @staticmethod
+    def evaluate_thresholds(
+        db: Session,
+        user_ids: Optional[Iterable[UUID]] = None,
+        asteroid_ids: Optional[Iterable[UUID]] = None
+    ) -> Dict[str, int]:
+        """
+        Evaluate distance and CRI thresholds of every watchlist item against
+        its asteroid's next close approach with one join, then bulk insert alerts
+        Optionally scoped to some users or asteroids; the caller commits
+        """
+        now = datetime.now(timezone.utc)
+        next_dates = AlertService._next_approach_dates(now, asteroid_ids)
         
-        for item in watchlist_items:
-            # Get next close approach
-            next_approach = db.query(CloseApproach).filter(
-                and_(
-                    CloseApproach.asteroid_id == item.asteroid_id,
-                    CloseApproach.closest_approach_date > datetime.now(timezone.utc)
+        pairs = select(
+            Watchlist.user_id,
+            Watchlist.asteroid_id,
+            Watchlist.alert_threshold_distance_km,
+            Watchlist.alert_threshold_cri,
+            CloseApproach.id.label("approach_id"),
+            CloseApproach.miss_distance_km,
+            CloseApproach.calculated_cri
+        ).join(
+            next_dates, next_dates.c.asteroid_id == Watchlist.asteroid_id
+        ).join(
+            CloseApproach,
+            and_(
+                CloseApproach.asteroid_id == next_dates.c.asteroid_id,
+                CloseApproach.closest_approach_date == next_dates.c.next_date
+            )
+        )
+        if user_ids is not None:
+            pairs = pairs.where(Watchlist.user_id.in_(list(user_ids)))
+        
+        evaluated = db.execute(
+            select(func.count()).select_from(pairs.subquery())
+        ).scalar() or 0
+        
+        distance_hit = and_(
+            Watchlist.alert_threshold_distance_km.isnot(None),
+            CloseApproach.miss_distance_km <= Watchlist.alert_threshold_distance_km
+        )
+        cri_hit = and_(
+            Watchlist.alert_threshold_cri.isnot(None),
+            CloseApproach.calculated_cri >= Watchlist.alert_threshold_cri
+        )
+        
+        rows = []
+        for match in db.execute(pairs.where(or_(distance_hit, cri_hit))):
+            rows.extend(AlertService.threshold_alert_rows(
+                match.user_id, match.asteroid_id, match.approach_id,
+                match.miss_distance_km, match.calculated_cri,
+                match.alert_threshold_distance_km, match.alert_threshold_cri,
+                triggered_at=now
+            ))
+        
+        inserted = AlertService.bulk_create_alerts(db, rows)
+        
+        return {"evaluated": evaluated, "triggered": len(inserted)}
+    
+    @staticmethod
+    def _next_approach_dates(now: datetime, asteroid_ids: Optional[Iterable[UUID]] = None):
+        """Subquery of (asteroid_id, next_date) for each asteroid's next close approach"""
+        next_dates = select(
+            CloseApproach.asteroid_id,
+            func.min(CloseApproach.closest_approach_date).label("next_date")
+        ).where(
+            CloseApproach.closest_approach_date > now
+        ).group_by(CloseApproach.asteroid_id)
+        if asteroid_ids is not None:
+            next_dates = next_dates.where(CloseApproach.asteroid_id.in_(list(asteroid_ids)))
+        return next_dates.subquery()
+    
+    @staticmethod
+    def evaluate_scored_approaches(db: Session, changes: List[ApproachScored]) -> Dict[str, int]:
+        """
+        Evaluate the watchers of every asteroid whose approaches were created or synced
+        Thresholds are read from the watchlists table, so watchers added on other workers
+        are covered, and distance changes count as much as CRI changes; the caller commits
+        """
+        asteroid_ids = sorted({UUID(change.asteroid_id) for change in changes})
+        
+        evaluated = 0
+        triggered = 0
+        for offset in range(0, len(asteroid_ids), 500):
+            # The maintained watcher count skips unwatched asteroids, which are most of a sync
+            watched = [
+                asteroid_id for (asteroid_id,) in db.query(Asteroid.id).filter(
+                    Asteroid.id.in_(asteroid_ids[offset:offset + 500]),
+                    Asteroid.watcher_count > 0
                 )
-            ).order_by(CloseApproach.closest_approach_date).first()
-            
-            if not next_approach:
+            ]
+            if not watched:
                 continue
+            result = AlertService.evaluate_thresholds(db, asteroid_ids=watched)
+            evaluated += result["evaluated"]
+            triggered += result["triggered"]
+        
+        return {"evaluated": evaluated, "triggered": triggered}
+    
+    @staticmethod
+    def create_approach_alerts(db: Session, due: List[Tuple[str, str, str, datetime]]) -> int:
+        """
+        Alert every watcher of each (approach_id, asteroid_id, alert_type, date) that crossed its lead time
+        Returns count of new alerts; the caller commits
+        """
+        if not due:
+            return 0
+        
+        lead_hours = {alert_type: int(lead.total_seconds() // 3600) for alert_type, lead in APPROACH_LEADS}
+        now = datetime.now(timezone.utc)
+        rows = []
+        for offset in range(0, len(due), 500):
+            chunk = due[offset:offset + 500]
+            approaches = {
+                str(approach.id): approach
+                for approach in db.query(
+                    CloseApproach.id,
+                    CloseApproach.miss_distance_km,
+                    CloseApproach.calculated_cri
+                ).filter(
+                    CloseApproach.id.in_([UUID(approach_id) for approach_id, _, _, _ in chunk])
+                )
+            }
+            watchers = {}
+            for user_id, asteroid_id in db.query(Watchlist.user_id, Watchlist.asteroid_id).filter(
+                Watchlist.asteroid_id.in_({UUID(asteroid_id) for _, asteroid_id, _, _ in chunk})
+            ):
+                watchers.setdefault(str(asteroid_id), []).append(user_id)
             
-            # Check distance threshold
-            if item.alert_threshold_distance_km:
-                if next_approach.miss_distance_km and next_approach.miss_distance_km <= item.alert_threshold_distance_km:
-                    AlertService.trigger_alert(
-                        db=db,
-                        user_id=user_id,
-                        asteroid_id=str(item.asteroid_id),
-                        close_approach_id=str(next_approach.id),
-                        alert_type=AlertTypeEnum.DISTANCE,
-                        triggered_reason=f"Asteroid within {item.alert_threshold_distance_km} km threshold",
-                        cri_score=next_approach.calculated_cri or 0,
-                        distance_km=next_approach.miss_distance_km or 0
-                    )
-                    alerts_triggered += 1
-            
-            # Check CRI threshold
-            if item.alert_threshold_cri:
-                if next_approach.calculated_cri and next_approach.calculated_cri >= item.alert_threshold_cri:
-                    AlertService.trigger_alert(
-                        db=db,
-                        user_id=user_id,
-                        asteroid_id=str(item.asteroid_id),
-                        close_approach_id=str(next_approach.id),
-                        alert_type=AlertTypeEnum.RISK_SCORE,
-                        triggered_reason=f"Risk score {next_approach.calculated_cri} exceeds threshold {item.alert_threshold_cri}",
-                        cri_score=next_approach.calculated_cri,
-                        distance_km=next_approach.miss_distance_km or 0
-                    )
-                    alerts_triggered += 1
-        
-        return alerts_triggered
+            for approach_id, asteroid_id, alert_type, date in chunk:
+                approach = approaches.get(approach_id)
+                if approach is None:
+                    continue
+                reason = f"Close approach on {date:%Y-%m-%d %H:%M} UTC is less than {lead_hours[alert_type]} hours away"
+                for user_id in watchers.get(asteroid_id, []):
+                    rows.append(AlertService.build_alert_row(
+                        user_id, UUID(asteroid_id), approach.id, AlertTypeEnum(alert_type), reason,
+                        approach.calculated_cri or 0, approach.miss_distance_km or 0, now
+                    ))
+        
+        return len(AlertService.bulk_create_alerts(db, rows))
+    
+    @staticmethod
+    def threshold_alert_rows(
+        user_id: UUID,
+        asteroid_id: UUID,
+        approach_id: UUID,
+        miss_distance_km: Optional[float],
+        calculated_cri: Optional[float],
+        threshold_distance_km: Optional[float],
+        threshold_cri: Optional[float],
+        triggered_at: Optional[datetime] = None
+    ) -> List[dict]:
+        """Alert rows for the thresholds a next approach crosses"""
+        rows = []
+        if (
+            threshold_distance_km is not None
+            and miss_distance_km is not None
+            and miss_distance_km <= threshold_distance_km
+        ):
+            rows.append(AlertService.build_alert_row(
+                user_id, asteroid_id, approach_id, AlertTypeEnum.DISTANCE,
+                f"Asteroid within {threshold_distance_km} km threshold",
+                calculated_cri or 0, miss_distance_km, triggered_at
+            ))
+        if (
+            threshold_cri is not None
+            and calculated_cri is not None
+            and calculated_cri >= threshold_cri
+        ):
+            rows.append(AlertService.build_alert_row(
+                user_id, asteroid_id, approach_id, AlertTypeEnum.RISK_SCORE,
+                f"Risk score {calculated_cri} exceeds threshold {threshold_cri}",
+                calculated_cri, miss_distance_km or 0, triggered_at
+            ))
+        return rows
+
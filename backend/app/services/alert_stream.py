@@ -0,0 +1,288 @@
+"""
+Real-time alert stream
+
+Pushes new alerts and unread-count changes to connected clients over
+Server-Sent Events. Committed alert events are batched by a publisher task
+that builds the payloads with one query per batch, then either fans them
+out to local subscribers or, when REDIS_URL is set, publishes them on a
+pub/sub channel that every worker listens to. Event ids are keyset cursors
+over (triggered_at, id), so a reconnecting client resumes from the database.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy import and_, select, tuple_
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import ALERT_CREATED, ALERTS_CHANGED, AlertCreated, subscribe
+from app.models.models import Alert, Asteroid, User
+from app.schemas.schemas import AlertResponse
+from app.utils.pagination import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+
+class AlertSubscription:
+    """One connected client's bounded event queue"""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.alert_stream_queue_size)
+
+    def offer(self, message: dict) -> bool:
+        """Enqueue without blocking; a client that falls behind is disconnected to resume later"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+class AlertStreamHub:
+    """Per-process fan-out of alert events to SSE subscribers"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[AlertSubscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._redis = None
+        # Committed changes waiting for the publisher
+        self._pending_alerts: List[str] = []
+        self._pending_users: Set[str] = set()
+        self._pending_lock = threading.Lock()
+
+    async def start(self) -> None:
+        """Start the publisher and, if configured, the Redis bridge"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        if settings.redis_url:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(settings.redis_url, decode_responses=True)
+            self._tasks.append(asyncio.create_task(self._listen_redis()))
+        self._tasks.append(asyncio.create_task(self._publish_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    # ---- event intake (any thread) ----
+
+    def apply_alerts_created(self, changes: List[AlertCreated]) -> None:
+        with self._pending_lock:
+            self._pending_alerts.extend(change.alert_id for change in changes)
+        self._wake()
+
+    def apply_alerts_changed(self, user_ids: List[str]) -> None:
+        with self._pending_lock:
+            self._pending_users.update(user_ids)
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ---- publishing ----
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            with self._pending_lock:
+                alert_ids, self._pending_alerts = self._pending_alerts, []
+                user_ids, self._pending_users = self._pending_users, set()
+            try:
+                await self._publish(alert_ids, user_ids)
+            except Exception:
+                logger.exception("Alert stream publish failed")
+
+    async def _publish(self, alert_ids: List[str], user_ids: Set[str]) -> None:
+        if self._redis is None:
+            # Nobody else can be listening; skip users without a local connection
+            alert_ids = alert_ids if self._subscribers else []
+            user_ids = {user_id for user_id in user_ids if user_id in self._subscribers}
+        if not alert_ids and not user_ids:
+            return
+
+        messages = []
+        async with AsyncSessionLocal() as db:
+            if alert_ids:
+                result = await db.execute(
+                    AlertStreamHub._alert_query().where(Alert.id.in_([UUID(a) for a in alert_ids]))
+                )
+                for row in result.all():
+                    user_id = str(row.Alert.user_id)
+                    if self._redis is None and user_id not in self._subscribers:
+                        continue
+                    messages.append(AlertStreamHub._alert_message(row))
+
+            if user_ids:
+                result = await db.execute(
+                    select(User.id, User.unread_alert_count).where(
+                        User.id.in_([UUID(u) for u in user_ids])
+                    )
+                )
+                unread = {str(user_id): count for user_id, count in result.all()}
+                for user_id in user_ids:
+                    messages.append({
+                        "user_id": user_id,
+                        "event": "unread",
+                        "data": {"unread_count": unread.get(user_id, 0)},
+                    })
+
+        if self._redis is not None:
+            for message in messages:
+                await self._redis.publish(settings.alert_stream_channel, json.dumps(message))
+        else:
+            for message in messages:
+                self._dispatch(message)
+
+    async def _listen_redis(self) -> None:
+        """Relay messages published by any worker to this worker's subscribers"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(settings.alert_stream_channel)
+                async for item in pubsub.listen():
+                    if item.get("type") == "message":
+                        self._dispatch(json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Alert stream Redis listener failed; reconnecting")
+                await asyncio.sleep(1)
+
+    def _dispatch(self, message: dict) -> None:
+        for subscription in list(self._subscribers.get(message["user_id"], ())):
+            subscription.offer(message)
+
+    # ---- subscribers ----
+
+    def subscribe(self, user_id: str) -> AlertSubscription:
+        subscription = AlertSubscription(user_id)
+        self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AlertSubscription) -> None:
+        subscriptions = self._subscribers.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.user_id]
+
+    async def stream(
+        self,
+        request: Request,
+        user_id: str,
+        resume_after: Optional[Tuple[datetime, str]] = None
+    ) -> AsyncIterator[str]:
+        """SSE body: missed alerts since resume_after, the unread count, then live events"""
+        subscription = self.subscribe(user_id)
+        try:
+            yield f"retry: {settings.alert_stream_heartbeat_seconds * 1000}\n\n"
+
+            replayed = set()
+            async with AsyncSessionLocal() as db:
+                if resume_after is not None:
+                    triggered_at, alert_id = resume_after
+                    result = await db.execute(
+                        AlertStreamHub._alert_query().where(
+                            and_(
+                                Alert.user_id == UUID(user_id),
+                                tuple_(Alert.triggered_at, Alert.id) > (triggered_at, UUID(alert_id))
+                            )
+                        ).order_by(
+                            Alert.triggered_at, Alert.id
+                        ).limit(settings.alert_stream_replay_limit)
+                    )
+                    for row in result.all():
+                        replayed.add(str(row.Alert.id))
+                        yield AlertStreamHub._format(AlertStreamHub._alert_message(row))
+
+                unread_count = await db.scalar(
+                    select(User.unread_alert_count).where(User.id == UUID(user_id))
+                )
+            yield AlertStreamHub._format({"event": "unread", "data": {"unread_count": unread_count or 0}})
+
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), settings.alert_stream_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is None:
+                    # Fell behind; the client reconnects with Last-Event-ID
+                    break
+                if message.get("event") == "alert" and message["data"]["id"] in replayed:
+                    continue
+                yield AlertStreamHub._format(message)
+        finally:
+            self.unsubscribe(subscription)
+
+    # ---- formatting ----
+
+    @staticmethod
+    def _alert_query():
+        return select(Alert, Asteroid.name).join(Asteroid, Asteroid.id == Alert.asteroid_id)
+
+    @staticmethod
+    def _alert_message(row) -> dict:
+        alert = row.Alert
+        payload = AlertResponse(
+            id=str(alert.id),
+            asteroid_id=str(alert.asteroid_id),
+            asteroid_name=row.name,
+            alert_type=alert.alert_type,
+            triggered_reason=alert.triggered_reason,
+            cri_score_at_trigger=alert.cri_score_at_trigger,
+            distance_at_trigger_km=alert.distance_at_trigger_km,
+            is_read=alert.is_read,
+            triggered_at=alert.triggered_at
+        )
+        return {
+            "user_id": str(alert.user_id),
+            "event": "alert",
+            "id": encode_cursor(alert.triggered_at, alert.id),
+            "data": payload.model_dump(mode="json"),
+        }
+
+    @staticmethod
+    def _format(message: dict) -> str:
+        lines = []
+        if message.get("id"):
+            lines.append(f"id: {message['id']}")
+        lines.append(f"event: {message['event']}")
+        lines.append(f"data: {json.dumps(message['data'])}")
+        return "\n".join(lines) + "\n\n"
+
+
+alert_stream_hub = AlertStreamHub()
+
+subscribe(ALERT_CREATED, alert_stream_hub.apply_alerts_created)
+subscribe(ALERTS_CHANGED, alert_stream_hub.apply_alerts_changed)
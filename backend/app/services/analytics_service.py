@@ -0,0 +1,273 @@
+"""
+Analytics service
+
+Serves dashboard analytics from in-memory structures that are seeded at
+startup, kept current from post-commit change events, and reloaded by the
+catalog refresher so changes committed by other workers are picked up too.
+Requests never scan the approaches table.
+"""
+from datetime import datetime, timezone
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import Integer, case, cast, event, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import (
+    ALERTS_CHANGED, APPROACH_SCORED, WATCHLIST_CHANGED, ApproachScored, data_generation, pending_payloads,
+    subscribe
+)
+from app.models.models import Alert, Asteroid, CloseApproach, User, Watchlist
+from app.schemas.schemas import (
+    MostWatchedAsteroid, MostWatchedResponse, RiskDistributionBucket, RiskDistributionResponse,
+    TopThreatResponse, TopThreatsResponse, UserActivityResponse
+)
+from app.utils.cache import LRUCache
+from app.utils.risk_histogram import (
+    BUCKET_BOUNDS, MAX_EXAMPLES, SKETCH_RESOLUTION, RiskHistogram
+)
+from app.utils.top_threats import TopThreatsTracker
+
+# Per-process distribution of close approach CRI scores
+risk_histogram = RiskHistogram()
+
+# Per-process leaderboard of asteroids by next-approach CRI
+# Both are reloaded periodically by the catalog refresher
+top_threats = TopThreatsTracker(max_k=settings.top_threats_max_k)
+
+# Per-user ((data generation, user activity version), activity summary); both versions are
+# shared through the database, so a change committed by any worker misses the entry
+user_activity_cache = LRUCache(
+    maxsize=settings.user_activity_cache_size,
+    ttl_seconds=settings.user_activity_cache_ttl_seconds
+)
+
+# (risk level, lower CRI bound) from most to least severe, matching get_risk_level()
+THREAT_LEVELS = [("CRITICAL", 81), ("RED", 61), ("ORANGE", 41), ("YELLOW", 21), ("GREEN", 0)]
+
+
+class AnalyticsService:
+    """Handle analytics endpoints"""
+
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        """Seed the in-memory analytics from the database"""
+        AnalyticsService.rebuild_risk_distribution(db)
+        AnalyticsService.rebuild_top_threats(db)
+
+    @staticmethod
+    def rebuild_risk_distribution(db: Session) -> None:
+        """
+        Load the CRI histogram with one GROUP BY over sketch bins
+        plus a handful of example names per bucket
+        """
+        # Floor like sketch_bin(); a plain cast rounds on PostgreSQL and would
+        # put scores just under a band boundary into the band above
+        sketch_bin = cast(func.floor(CloseApproach.calculated_cri * SKETCH_RESOLUTION), Integer)
+        bins = db.query(
+            sketch_bin,
+            func.count(CloseApproach.id),
+            func.sum(CloseApproach.calculated_cri)
+        ).filter(
+            CloseApproach.calculated_cri.isnot(None)
+        ).group_by(sketch_bin).all()
+
+        examples = {}
+        for index, (range_min, range_max) in enumerate(BUCKET_BOUNDS):
+            upper = range_max + 1 if index < len(BUCKET_BOUNDS) - 1 else range_max + 0.001
+            rows = db.query(CloseApproach.id, Asteroid.name).join(
+                Asteroid, Asteroid.id == CloseApproach.asteroid_id
+            ).filter(
+                CloseApproach.calculated_cri >= range_min,
+                CloseApproach.calculated_cri < upper
+            ).order_by(CloseApproach.calculated_cri.desc()).limit(MAX_EXAMPLES).all()
+            examples[index] = [(str(row.id), row.name) for row in rows]
+
+        risk_histogram.load(bins, examples)
+
+    @staticmethod
+    def rebuild_top_threats(db: Session) -> None:
+        """Load every upcoming close approach into the leaderboard"""
+        rows = db.query(
+            CloseApproach.id,
+            CloseApproach.asteroid_id,
+            Asteroid.name,
+            CloseApproach.closest_approach_date,
+            CloseApproach.calculated_cri
+        ).join(
+            Asteroid, Asteroid.id == CloseApproach.asteroid_id
+        ).filter(
+            CloseApproach.closest_approach_date > datetime.now(timezone.utc)
+        ).yield_per(settings.export_batch_size)
+
+        top_threats.load(
+            (str(approach_id), str(asteroid_id), name, date, cri)
+            for approach_id, asteroid_id, name, date, cri in rows
+        )
+
+    @staticmethod
+    def apply_approach_scores(changes: List[ApproachScored]) -> None:
+        """
+        Fold committed CRI changes into the histogram and leaderboard
+        Cached activity summaries go stale through the data generation bump
+        """
+        for change in changes:
+            risk_histogram.update(change.approach_id, change.asteroid_name, change.old_cri, change.new_cri)
+        top_threats.update_many(
+            (c.approach_id, c.asteroid_id, c.asteroid_name, c.closest_approach_date, c.new_cri)
+            for c in changes
+        )
+
+    @staticmethod
+    def get_risk_distribution() -> RiskDistributionResponse:
+        """CRI distribution over scored close approaches, O(buckets)"""
+        snapshot = risk_histogram.snapshot()
+        total = snapshot["total"]
+
+        buckets = [
+            RiskDistributionBucket(
+                range_min=range_min,
+                range_max=range_max,
+                count=snapshot["bucket_counts"][index],
+                percentage=round(snapshot["bucket_counts"][index] / total * 100, 2) if total else 0.0,
+                examples=snapshot["examples"][index]
+            )
+            for index, (range_min, range_max) in enumerate(BUCKET_BOUNDS)
+        ]
+
+        return RiskDistributionResponse(
+            buckets=buckets,
+            total_asteroids=total,
+            average_cri=round(snapshot["average"], 2),
+            median_cri=round(risk_histogram.quantile(0.5), 2)
+        )
+
+    @staticmethod
+    def get_top_threats(k: int = 10) -> TopThreatsResponse:
+        """Top k asteroids by the CRI of their next close approach, O(k)"""
+        threats, calculated_at = top_threats.top(k)
+        now = datetime.now(timezone.utc)
+
+        return TopThreatsResponse(
+            threats=[
+                TopThreatResponse(
+                    asteroid_id=asteroid_id,
+                    name=name,
+                    cri_score=round(cri, 2),
+                    next_approach_date=date,
+                    days_until_approach=max(0, (date - now).days)
+                )
+                for cri, asteroid_id, name, date in threats
+            ],
+            calculation_timestamp=calculated_at
+        )
+
+    @staticmethod
+    def get_most_watched(db: Session, k: int = 10) -> MostWatchedResponse:
+        """Top k asteroids by watcher count, read from idx_asteroid_watcher_count"""
+        rows = db.query(
+            Asteroid.id,
+            Asteroid.neo_id,
+            Asteroid.name,
+            Asteroid.is_hazardous,
+            Asteroid.watcher_count
+        ).filter(
+            Asteroid.watcher_count > 0
+        ).order_by(
+            Asteroid.watcher_count.desc(), Asteroid.id.desc()
+        ).limit(k).all()
+
+        return MostWatchedResponse(
+            asteroids=[
+                MostWatchedAsteroid(
+                    asteroid_id=str(row.id),
+                    neo_id=row.neo_id,
+                    name=row.name,
+                    is_hazardous=bool(row.is_hazardous),
+                    watcher_count=row.watcher_count
+                )
+                for row in rows
+            ],
+            calculation_timestamp=datetime.now(timezone.utc)
+        )
+
+    @staticmethod
+    def get_user_activity(db: Session, user_id: str) -> UserActivityResponse:
+        """User activity summary, cached per user"""
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            raise ValueError("Invalid user ID")
+        
+        # Read before the query, so a change committing while it runs is never hidden behind the entry
+        version = (
+            data_generation.current,
+            db.scalar(select(User.activity_version).where(User.id == user_uuid))
+        )
+        cached = user_activity_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        activity = AnalyticsService._query_user_activity(db, user_uuid)
+        user_activity_cache.set(user_id, (version, activity))
+        return activity
+
+    @staticmethod
+    def _query_user_activity(db: Session, user_uuid: UUID) -> UserActivityResponse:
+        """Compute every activity metric in a single aggregate statement"""
+        level_columns = []
+        upper = None
+        for level, lower in THREAT_LEVELS:
+            condition = Alert.cri_score_at_trigger >= lower
+            if upper is not None:
+                condition = condition & (Alert.cri_score_at_trigger < upper)
+            level_columns.append(func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(level))
+            upper = lower
+        
+        watchlist_count = select(func.count(Watchlist.id)).where(
+            Watchlist.user_id == user_uuid
+        ).scalar_subquery()
+        last_sync = select(func.max(Asteroid.nasa_synced_at)).scalar_subquery()
+        
+        row = db.execute(
+            select(
+                watchlist_count.label("watchlist_count"),
+                func.count(Alert.id).label("total_alerts"),
+                func.coalesce(func.sum(case((Alert.is_read == False, 1), else_=0)), 0).label("unread_alerts"),
+                last_sync.label("last_sync"),
+                *level_columns
+            ).select_from(Alert).where(Alert.user_id == user_uuid)
+        ).one()
+        
+        # Most frequent level among the user's alerts; ties go to the more severe level
+        favorite_level = "NONE"
+        best_count = 0
+        for level, _ in THREAT_LEVELS:
+            count = getattr(row, level)
+            if count > best_count:
+                favorite_level, best_count = level, count
+        
+        return UserActivityResponse(
+            total_watchlist_items=row.watchlist_count or 0,
+            total_alerts_triggered=row.total_alerts or 0,
+            unread_alerts=row.unread_alerts or 0,
+            favorite_threat_level=favorite_level,
+            last_api_sync=row.last_sync
+        )
+
+
+subscribe(APPROACH_SCORED, AnalyticsService.apply_approach_scores)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_activity_versions(session: Session) -> None:
+    """Move the activity version of every user whose watchlist or alerts the transaction changed"""
+    user_ids = set(pending_payloads(session, ALERTS_CHANGED))
+    user_ids.update(change.user_id for change in pending_payloads(session, WATCHLIST_CHANGED))
+    if user_ids:
+        session.execute(
+            update(User.__table__).where(
+                User.__table__.c.id.in_([UUID(user_id) for user_id in user_ids])
+            ).values(activity_version=User.__table__.c.activity_version + 1)
+        )
@@ -8,27 +8,44 @@ NASA NeoWs API integration for real-time asteroid data.
 Repository: https://github.com/rohitb6/Cosmic_Watch
 """
 import httpx
-import asyncio
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import Optional, List, Tuple
-from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, Optional, List, Tuple
+from uuid import UUID, uuid4
 
 from app.models.models import Asteroid, CloseApproach, NASAAPICache, RiskScoringLog
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import APPROACH_SCORED, ApproachScored, emit_after_commit
+from app.services.alert_service import AlertService
+from app.services.upstream import nasa_upstream, request_key
+from app.services.watch_rule_service import WatchRuleService
 from app.utils.risk_calculator import calculate_cri, get_risk_level, is_next_72h_threat, calculate_days_until_approach
+from app.utils.pagination import encode_cursor, decode_cursor
 from app.schemas.schemas import (
     AsteroidDetailResponse, CloseApproachResponse, CRIComponentsResponse,
-    RiskLevelInfo, Next72hThreatsResponse
+    RiskLevelInfo, Next72hThreatsResponse, ApproachWindowItem, ApproachWindowResponse
 )
 
+# sort key -> (close_approaches column name, descending)
+APPROACH_SORTS = {
+    "date_asc": ("closest_approach_date", False),
+    "date_desc": ("closest_approach_date", True),
+    "risk_desc": ("calculated_cri", True),
+    "risk_asc": ("calculated_cri", False),
+    "distance_asc": ("miss_distance_km", False),
+    "distance_desc": ("miss_distance_km", True),
+}
+
 
 class AsteroidService:
     """Handle asteroid data and NASA API integration"""
     
     @staticmethod
-    async def fetch_nasa_asteroids(db: Session, limit: int = 20, page: int = 1, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
+    async def fetch_nasa_asteroids(db: AsyncSession, limit: int = 20, page: int = 1, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
         """
         Fetch asteroids from NASA NeoWs API feed
         Implements caching to respect rate limits
@@ -40,51 +57,61 @@ class AsteroidService:
         if not end_date:
             end_date = (datetime.now(timezone.utc) + timedelta(days=7)).strftime("%Y-%m-%d")
         
-        async with httpx.AsyncClient() as client:
-            params = {
-                "api_key": settings.nasa_api_key,
-                "start_date": start_date,
-                "end_date": end_date,
-            }
+        params = {
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        
+        try:
+            # Concurrent syncs of the same window share one NASA request
+            return await nasa_upstream.call(
+                request_key("/neo/feed", params),
+                lambda: AsteroidService._fetch_feed(params)
+            )
             
-            try:
-                # Call NASA feed endpoint (this returns asteroids for a date range)
-                response = await client.get(
-                    f"{settings.nasa_base_url}/feed",
-                    params=params,
-                    timeout=15.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                # Cache the response
-                cache_entry = NASAAPICache(
-                    endpoint="/neo/feed",
-                    query_params=params,
-                    response_data=data,
-                    expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.nasa_cache_ttl_hours)
-                )
-                db.add(cache_entry)
-                db.commit()
-                
-                return data
-                
-            except httpx.HTTPError as e:
-                # Try to return cached data
-                cached = db.query(NASAAPICache).filter(
+        except httpx.HTTPError as e:
+            # Try to return cached data
+            cached = (await db.execute(
+                select(NASAAPICache).where(
                     and_(
                         NASAAPICache.endpoint == "/neo/feed",
                         NASAAPICache.expires_at > datetime.now(timezone.utc)
                     )
-                ).order_by(NASAAPICache.cached_at.desc()).first()
-                
-                if cached:
-                    return cached.response_data
-                
-                raise ValueError(f"Failed to fetch NASA data: {str(e)}")
+                ).order_by(NASAAPICache.cached_at.desc()).limit(1)
+            )).scalars().first()
+            
+            if cached:
+                return cached.response_data
+            
+            raise ValueError(f"Failed to fetch NASA data: {str(e)}")
     
     @staticmethod
-    async def sync_nasa_feed_to_db(db: Session, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
+    async def _fetch_feed(params: dict) -> dict:
+        """Call the NASA feed endpoint once and cache the response for fallback"""
+        async with httpx.AsyncClient() as client:
+            # Call NASA feed endpoint (this returns asteroids for a date range)
+            response = await client.get(
+                f"{settings.nasa_base_url}/feed",
+                params={"api_key": settings.nasa_api_key, **params},
+                timeout=15.0
+            )
+            response.raise_for_status()
+            data = response.json()
+        
+        # Cache the response; written once per shared request, on a session of its own
+        async with AsyncSessionLocal() as db:
+            db.add(NASAAPICache(
+                endpoint="/neo/feed",
+                query_params={"api_key": settings.nasa_api_key, **params},
+                response_data=data,
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.nasa_cache_ttl_hours)
+            ))
+            await db.commit()
+        
+        return data
+    
+    @staticmethod
+    async def sync_nasa_feed_to_db(db: AsyncSession, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
         """
         Fetch real NASA asteroid feed and sync to database
         Returns stats about the sync
@@ -95,93 +122,142 @@ class AsteroidService:
             if not nasa_data or "near_earth_objects" not in nasa_data:
                 return {"status": "error", "message": "Invalid NASA API response"}
             
-            synced_count = 0
-            approach_synced = 0
-            
-            # Iterate through each date's asteroids
-            for date_str, asteroids_list in nasa_data["near_earth_objects"].items():
-                for nasa_asteroid in asteroids_list:
-                    neo_id = nasa_asteroid.get("neo_reference_id")
-                    if not neo_id:
-                        continue
-                    
-                    # Check if asteroid exists
-                    asteroid = db.query(Asteroid).filter(Asteroid.neo_id == neo_id).first()
-                    
-                    if not asteroid:
-                        asteroid = Asteroid(neo_id=neo_id)
-                        synced_count += 1
-                    
-                    # Update asteroid data from NASA
-                    asteroid.name = nasa_asteroid.get("name", "")
-                    asteroid.url = nasa_asteroid.get("nasa_jpl_url", "")
-                    asteroid.is_hazardous = nasa_asteroid.get("is_potentially_hazardous_asteroid", False)
-                    asteroid.is_sentry_object = nasa_asteroid.get("is_sentry_object", False)
-                    
-                    # Convert magnitude to float
-                    try:
-                        asteroid.absolute_magnitude = float(nasa_asteroid.get("absolute_magnitude_h") or 0) or None
-                    except (ValueError, TypeError):
-                        asteroid.absolute_magnitude = None
-                    
-                    # Extract diameter
-                    diameter_data = nasa_asteroid.get("estimated_diameter", {}).get("kilometers", {})
-                    diameter_min = diameter_data.get("estimated_diameter_min")
-                    diameter_max = diameter_data.get("estimated_diameter_max")
-                    
-                    # Convert to float if available
-                    try:
-                        diameter_min = float(diameter_min) if diameter_min else None
-                        diameter_max = float(diameter_max) if diameter_max else None
-                    except (ValueError, TypeError):
-                        diameter_min = None
-                        diameter_max = None
-                    
-                    asteroid.diameter_min_km = diameter_min
-                    asteroid.diameter_max_km = diameter_max
-                    if diameter_min and diameter_max:
-                        asteroid.diameter_km = (diameter_min + diameter_max) / 2
-                    
-                    asteroid.nasa_synced_at = datetime.now(timezone.utc)
-                    db.add(asteroid)
-                    db.flush()
-                    
-                    # Sync close approaches
-                    for approach_data in nasa_asteroid.get("close_approach_data", []):
-                        AsteroidService._sync_close_approach(db, asteroid.id, approach_data)
-                        approach_synced += 1
+            # ORM upserts share the sync code path with sync_asteroid_from_nasa;
+            # run_sync executes them on the async connection without blocking the loop
+            synced_count, approach_synced, changes = await db.run_sync(AsteroidService._ingest_feed, nasa_data)
+            await db.commit()
             
-            db.commit()
+            # Only watchers of re-scored asteroids need their thresholds checked
+            alert_result = await db.run_sync(AlertService.evaluate_scored_approaches, changes)
+            rule_result = await db.run_sync(WatchRuleService.evaluate_rules, changes)
+            await db.commit()
             
             return {
                 "status": "success",
                 "synced_asteroids": synced_count,
                 "synced_approaches": approach_synced,
+                "alerts_evaluated": alert_result["evaluated"],
+                "alerts_triggered": alert_result["triggered"],
+                "rule_alerts_triggered": rule_result["triggered"],
                 "total_asteroids": sum(len(v) for v in nasa_data["near_earth_objects"].values()),
                 "message": f"Synced {synced_count} asteroids and {approach_synced} approaches from NASA"
             }
             
         except Exception as e:
+            await db.rollback()
             return {"status": "error", "message": str(e)}
     
     @staticmethod
-    def sync_asteroid_from_nasa(db: Session, neo_id: str) -> Asteroid:
+    def _ingest_feed(db: Session, nasa_data: dict) -> Tuple[int, int, List[ApproachScored]]:
+        """
+        Upsert asteroids and close approaches from a NASA feed payload
+        Returns (new asteroids, approaches synced, scoring changes); the caller commits
+        """
+        synced_count = 0
+        approach_synced = 0
+        changes = []
+        
+        # Iterate through each date's asteroids
+        for date_str, asteroids_list in nasa_data["near_earth_objects"].items():
+            for nasa_asteroid in asteroids_list:
+                neo_id = nasa_asteroid.get("neo_reference_id")
+                if not neo_id:
+                    continue
+                
+                # Check if asteroid exists
+                asteroid = db.query(Asteroid).filter(Asteroid.neo_id == neo_id).first()
+                
+                if not asteroid:
+                    asteroid = Asteroid(neo_id=neo_id)
+                    synced_count += 1
+                
+                # Update asteroid data from NASA
+                asteroid.name = nasa_asteroid.get("name", "")
+                asteroid.url = nasa_asteroid.get("nasa_jpl_url", "")
+                asteroid.is_hazardous = nasa_asteroid.get("is_potentially_hazardous_asteroid", False)
+                asteroid.is_sentry_object = nasa_asteroid.get("is_sentry_object", False)
+                
+                # Convert magnitude to float
+                try:
+                    asteroid.absolute_magnitude = float(nasa_asteroid.get("absolute_magnitude_h") or 0) or None
+                except (ValueError, TypeError):
+                    asteroid.absolute_magnitude = None
+                
+                # Extract diameter
+                diameter_data = nasa_asteroid.get("estimated_diameter", {}).get("kilometers", {})
+                diameter_min = diameter_data.get("estimated_diameter_min")
+                diameter_max = diameter_data.get("estimated_diameter_max")
+                
+                # Convert to float if available
+                try:
+                    diameter_min = float(diameter_min) if diameter_min else None
+                    diameter_max = float(diameter_max) if diameter_max else None
+                except (ValueError, TypeError):
+                    diameter_min = None
+                    diameter_max = None
+                
+                asteroid.diameter_min_km = diameter_min
+                asteroid.diameter_max_km = diameter_max
+                if diameter_min and diameter_max:
+                    asteroid.diameter_km = (diameter_min + diameter_max) / 2
+                
+                asteroid.nasa_synced_at = datetime.now(timezone.utc)
+                db.add(asteroid)
+                db.flush()
+                
+                # Sync close approaches
+                for approach_data in nasa_asteroid.get("close_approach_data", []):
+                    changes.append(AsteroidService._sync_close_approach(db, asteroid.id, approach_data))
+                    approach_synced += 1
+        
+        return synced_count, approach_synced, changes
+    
+    @staticmethod
+    async def sync_asteroid_from_nasa(db: AsyncSession, neo_id: str) -> Asteroid:
         """
         Fetch and sync specific asteroid from NASA API
         """
-        async def _fetch():
+        data = await AsteroidService.fetch_asteroid_from_nasa(neo_id)
+        
+        try:
+            asteroid, changes = await db.run_sync(AsteroidService._upsert_asteroid, data)
+            await db.commit()
+        except IntegrityError:
+            # A concurrent sync that shared the lookup inserted the asteroid first; update its row
+            await db.rollback()
+            asteroid, changes = await db.run_sync(AsteroidService._upsert_asteroid, data)
+            await db.commit()
+        
+        await db.run_sync(AlertService.evaluate_scored_approaches, changes)
+        await db.run_sync(WatchRuleService.evaluate_rules, changes)
+        await db.commit()
+        await db.refresh(asteroid)
+        
+        return asteroid
+    
+    @staticmethod
+    async def fetch_asteroid_from_nasa(neo_id: str) -> dict:
+        """Fetch one asteroid's lookup payload from NASA; concurrent lookups of an id share one request"""
+        async def _get() -> dict:
+            # The shared request can outlive the caller that started it, so it owns its client
             async with httpx.AsyncClient() as client:
-                params = {"api_key": settings.nasa_api_key}
                 response = await client.get(
                     f"{settings.nasa_base_url}/neo/{neo_id}",
-                    params=params,
+                    params={"api_key": settings.nasa_api_key},
                     timeout=10.0
                 )
                 response.raise_for_status()
                 return response.json()
         
-        # Run async function
-        data = asyncio.run(_fetch())
+        return await nasa_upstream.call(request_key("/neo/lookup", neo_id), _get)
+    
+    @staticmethod
+    def _upsert_asteroid(db: Session, data: dict) -> Tuple[Asteroid, List[ApproachScored]]:
+        """
+        Upsert an asteroid and its close approaches from a NASA lookup payload
+        Returns the asteroid and the scoring changes; the caller commits
+        """
+        neo_id = str(data.get("neo_reference_id") or data.get("id"))
         
         # Check if asteroid already exists
         asteroid = db.query(Asteroid).filter(Asteroid.neo_id == neo_id).first()
@@ -209,19 +285,39 @@ class AsteroidService:
         asteroid.nasa_synced_at = datetime.now(timezone.utc)
         
         db.add(asteroid)
+        db.flush()
         
         # Sync close approaches
-        for approach_data in data.get("close_approach_data", []):
+        changes = [
             AsteroidService._sync_close_approach(db, asteroid.id, approach_data)
+            for approach_data in data.get("close_approach_data", [])
+        ]
         
-        db.commit()
-        db.refresh(asteroid)
-        
-        return asteroid
+        return asteroid, changes
+    
+    @staticmethod
+    def _parse_approach_date(date_full: str, date_only: Optional[str] = None) -> datetime:
+        """
+        Parse NASA approach timestamps ("2024-Feb-15 10:30") as UTC
+        Falls back to the date-only field, then to now
+        """
+        for value, fmt in ((date_full, "%Y-%b-%d %H:%M"), (date_only, "%Y-%m-%d")):
+            if not value:
+                continue
+            try:
+                return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+            except ValueError:
+                pass
+            try:
+                parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+            except ValueError:
+                pass
+        return datetime.now(timezone.utc)
     
     @staticmethod
-    def _sync_close_approach(db: Session, asteroid_id: UUID, approach_data: dict) -> CloseApproach:
-        """Sync a single close approach record"""
+    def _sync_close_approach(db: Session, asteroid_id: UUID, approach_data: dict) -> ApproachScored:
+        """Sync a single close approach record; returns its scoring change"""
         approach_date = approach_data.get("close_approach_date_full", "")
         
         # Check if already exists
@@ -234,16 +330,15 @@ class AsteroidService:
         
         if existing:
             approach = existing
+            previous_cri = existing.calculated_cri
         else:
-            approach = CloseApproach(asteroid_id=asteroid_id)
+            # Assign the id up front so the risk log below can reference it before flush
+            approach = CloseApproach(id=uuid4(), asteroid_id=asteroid_id)
+            previous_cri = None
         
-        # Parse date
-        try:
-            approach.closest_approach_date = datetime.fromisoformat(
-                approach_date.replace('Z', '+00:00')
-            )
-        except:
-            approach.closest_approach_date = datetime.now(timezone.utc)
+        approach.closest_approach_date = AsteroidService._parse_approach_date(
+            approach_date, approach_data.get("close_approach_date")
+        )
         
         approach.close_approach_date_full = approach_date
         
@@ -270,8 +365,9 @@ class AsteroidService:
         approach.nasa_synced_at = datetime.now(timezone.utc)
         
         # Calculate CRI immediately
-        diameter_km = db.query(Asteroid.diameter_km).filter(Asteroid.id == asteroid_id).scalar()
-        is_hazardous = db.query(Asteroid.is_hazardous).filter(Asteroid.id == asteroid_id).scalar()
+        diameter_km, is_hazardous, asteroid_name = db.query(
+            Asteroid.diameter_km, Asteroid.is_hazardous, Asteroid.name
+        ).filter(Asteroid.id == asteroid_id).one()
         
         cri_score, components = calculate_cri(
             diameter_km=diameter_km,
@@ -299,7 +395,18 @@ class AsteroidService:
         )
         db.add(risk_log)
         
-        return approach
+        change = ApproachScored(
+            approach_id=str(approach.id),
+            asteroid_id=str(asteroid_id),
+            asteroid_name=asteroid_name,
+            closest_approach_date=approach.closest_approach_date,
+            miss_distance_km=approach.miss_distance_km,
+            old_cri=previous_cri,
+            new_cri=cri_score
+        )
+        emit_after_commit(db, APPROACH_SCORED, change)
+        
+        return change
     
     @staticmethod
     def get_asteroid_detail(db: Session, asteroid_id: str) -> AsteroidDetailResponse:
@@ -321,73 +428,97 @@ class AsteroidService:
             )
         ).order_by(CloseApproach.closest_approach_date).first()
         
-        cri_score = next_approach.calculated_cri if next_approach else None
-        risk_level = get_risk_level(cri_score) if cri_score else None
-        
-        # Get CRI components from log
-        cri_components = None
-        if next_approach:
-            risk_log = db.query(RiskScoringLog).filter(
-                RiskScoringLog.close_approach_id == next_approach.id
-            ).order_by(RiskScoringLog.calculation_timestamp.desc()).first()
+        return AsteroidService.build_asteroid_details(db, [(asteroid, next_approach)])[asteroid.id]
+    
+    @staticmethod
+    def build_asteroid_details(
+        db: Session,
+        rows: List[Tuple[Asteroid, Optional[CloseApproach]]]
+    ) -> Dict[UUID, AsteroidDetailResponse]:
+        """
+        Detail responses for (asteroid, next approach) pairs, keyed by asteroid id
+        Two queries however many asteroids: latest CRI components and all approaches
+        """
+        if not rows:
+            return {}
+        
+        next_ids = [approach.id for _, approach in rows if approach is not None]
+        components = {}
+        if next_ids:
+            latest = select(
+                RiskScoringLog.close_approach_id,
+                func.max(RiskScoringLog.calculation_timestamp).label("calculated_at")
+            ).where(
+                RiskScoringLog.close_approach_id.in_(next_ids)
+            ).group_by(RiskScoringLog.close_approach_id).subquery()
             
-            if risk_log and risk_log.component_scores:
-                cri_components = CRIComponentsResponse(**risk_log.component_scores)
-        
-        # Get all approaches
-        all_approaches_data = db.query(CloseApproach).filter(
-            CloseApproach.asteroid_id == uuid
-        ).order_by(CloseApproach.closest_approach_date).all()
-        
-        all_approaches = [
-            CloseApproachResponse(
-                id=str(app.id),
-                closest_approach_date=app.closest_approach_date,
-                miss_distance_km=app.miss_distance_km,
-                approach_velocity_kmh=app.approach_velocity_kmh,
-                calculated_cri=app.calculated_cri,
-                is_next_72h_threat=is_next_72h_threat(
-                    app.closest_approach_date.isoformat(),
-                    app.calculated_cri or 0
-                ),
-                days_until_approach=calculate_days_until_approach(
-                    app.closest_approach_date.isoformat()
+            components = {
+                approach_id: scores
+                for approach_id, scores in db.query(
+                    RiskScoringLog.close_approach_id,
+                    RiskScoringLog.component_scores
+                ).join(
+                    latest,
+                    and_(
+                        RiskScoringLog.close_approach_id == latest.c.close_approach_id,
+                        RiskScoringLog.calculation_timestamp == latest.c.calculated_at
+                    )
                 )
+            }
+        
+        approaches = {}
+        for approach in db.query(CloseApproach).filter(
+            CloseApproach.asteroid_id.in_([asteroid.id for asteroid, _ in rows])
+        ).order_by(CloseApproach.asteroid_id, CloseApproach.closest_approach_date):
+            approaches.setdefault(approach.asteroid_id, []).append(approach)
+        
+        details = {}
+        for asteroid, next_approach in rows:
+            cri_score = next_approach.calculated_cri if next_approach else None
+            risk_level = get_risk_level(cri_score) if cri_score else None
+            component_scores = components.get(next_approach.id) if next_approach else None
+            
+            details[asteroid.id] = AsteroidDetailResponse(
+                id=str(asteroid.id),
+                neo_id=asteroid.neo_id,
+                name=asteroid.name,
+                url=asteroid.url,
+                diameter_km=asteroid.diameter_km,
+                diameter_min_km=asteroid.diameter_min_km,
+                diameter_max_km=asteroid.diameter_max_km,
+                absolute_magnitude=asteroid.absolute_magnitude,
+                is_hazardous=asteroid.is_hazardous,
+                is_sentry_object=asteroid.is_sentry_object,
+                next_approach=AsteroidService._approach_response(next_approach) if next_approach else None,
+                cri_score=cri_score,
+                risk_level=RiskLevelInfo(**risk_level) if risk_level else None,
+                cri_components=CRIComponentsResponse(**component_scores) if component_scores else None,
+                all_approaches=[
+                    AsteroidService._approach_response(approach)
+                    for approach in approaches.get(asteroid.id, [])
+                ],
+                watcher_count=asteroid.watcher_count or 0,
+                created_at=asteroid.created_at,
+                nasa_synced_at=asteroid.nasa_synced_at
             )
-            for app in all_approaches_data
-        ]
         
-        return AsteroidDetailResponse(
-            id=str(asteroid.id),
-            neo_id=asteroid.neo_id,
-            name=asteroid.name,
-            url=asteroid.url,
-            diameter_km=asteroid.diameter_km,
-            diameter_min_km=asteroid.diameter_min_km,
-            diameter_max_km=asteroid.diameter_max_km,
-            absolute_magnitude=asteroid.absolute_magnitude,
-            is_hazardous=asteroid.is_hazardous,
-            is_sentry_object=asteroid.is_sentry_object,
-            next_approach=CloseApproachResponse(
-                id=str(next_approach.id),
-                closest_approach_date=next_approach.closest_approach_date,
-                miss_distance_km=next_approach.miss_distance_km,
-                approach_velocity_kmh=next_approach.approach_velocity_kmh,
-                calculated_cri=next_approach.calculated_cri,
-                is_next_72h_threat=is_next_72h_threat(
-                    next_approach.closest_approach_date.isoformat(),
-                    next_approach.calculated_cri or 0
-                ),
-                days_until_approach=calculate_days_until_approach(
-                    next_approach.closest_approach_date.isoformat()
-                )
-            ) if next_approach else None,
-            cri_score=cri_score,
-            risk_level=RiskLevelInfo(**risk_level) if risk_level else None,
-            cri_components=cri_components,
-            all_approaches=all_approaches,
-            created_at=asteroid.created_at,
-            nasa_synced_at=asteroid.nasa_synced_at
+        return details
+    
+    @staticmethod
+    def _approach_response(approach: CloseApproach) -> CloseApproachResponse:
+        return CloseApproachResponse(
+            id=str(approach.id),
+            closest_approach_date=approach.closest_approach_date,
+            miss_distance_km=approach.miss_distance_km,
+            approach_velocity_kmh=approach.approach_velocity_kmh,
+            calculated_cri=approach.calculated_cri,
+            is_next_72h_threat=is_next_72h_threat(
+                approach.closest_approach_date.isoformat(),
+                approach.calculated_cri or 0
+            ),
+            days_until_approach=calculate_days_until_approach(
+                approach.closest_approach_date.isoformat()
+            )
         )
     
     @staticmethod
@@ -423,6 +554,107 @@ class AsteroidService:
             critical_count=critical_count
         )
     
+    @staticmethod
+    def query_approaches(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_cri: Optional[float] = None,
+        max_distance_km: Optional[float] = None,
+        hazardous_only: bool = False,
+        sort: str = "date_asc",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> ApproachWindowResponse:
+        """
+        Range query over close approaches with keyset pagination
+        Ordering by CRI or distance skips approaches without that value
+        """
+        if sort not in APPROACH_SORTS:
+            raise ValueError(f"Invalid sort '{sort}'. Use one of: {', '.join(APPROACH_SORTS)}")
+        
+        column_name, descending = APPROACH_SORTS[sort]
+        sort_column = getattr(CloseApproach, column_name)
+        
+        query = db.query(
+            CloseApproach.id,
+            CloseApproach.asteroid_id,
+            CloseApproach.closest_approach_date,
+            CloseApproach.miss_distance_km,
+            CloseApproach.miss_distance_au,
+            CloseApproach.approach_velocity_kmh,
+            CloseApproach.calculated_cri,
+            Asteroid.neo_id,
+            Asteroid.name,
+            Asteroid.is_hazardous,
+            Asteroid.diameter_km
+        ).join(Asteroid, Asteroid.id == CloseApproach.asteroid_id)
+        
+        filters = []
+        if start_date:
+            filters.append(CloseApproach.closest_approach_date >= start_date)
+        if end_date:
+            filters.append(CloseApproach.closest_approach_date < end_date)
+        if min_cri is not None:
+            filters.append(CloseApproach.calculated_cri >= min_cri)
+        if max_distance_km is not None:
+            filters.append(CloseApproach.miss_distance_km <= max_distance_km)
+        if hazardous_only:
+            filters.append(Asteroid.is_hazardous == True)
+        if column_name != "closest_approach_date":
+            filters.append(sort_column.isnot(None))
+        
+        position = decode_cursor(cursor)
+        if position:
+            last_value, last_id = position
+            try:
+                last_id = UUID(last_id)
+            except ValueError:
+                raise ValueError("Invalid pagination cursor")
+            keyset = tuple_(sort_column, CloseApproach.id)
+            filters.append(keyset < (last_value, last_id) if descending else keyset > (last_value, last_id))
+        
+        if filters:
+            query = query.filter(and_(*filters))
+        
+        if descending:
+            query = query.order_by(sort_column.desc(), CloseApproach.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), CloseApproach.id.asc())
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        items = [
+            ApproachWindowItem(
+                id=str(row.id),
+                asteroid_id=str(row.asteroid_id),
+                neo_id=row.neo_id,
+                asteroid_name=row.name,
+                is_hazardous=row.is_hazardous or False,
+                diameter_km=row.diameter_km,
+                closest_approach_date=row.closest_approach_date,
+                miss_distance_km=row.miss_distance_km,
+                miss_distance_au=row.miss_distance_au,
+                approach_velocity_kmh=row.approach_velocity_kmh,
+                calculated_cri=row.calculated_cri
+            )
+            for row in rows
+        ]
+        
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, column_name), last.id)
+        
+        return ApproachWindowResponse(
+            items=items,
+            page_size=limit,
+            next_cursor=next_cursor
+        )
+    
     @staticmethod
     def search_asteroids(db: Session, query: str, limit: int = 10) -> List[AsteroidDetailResponse]:
         """Full-text search asteroids"""
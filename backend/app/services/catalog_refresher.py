@@ -0,0 +1,82 @@
+"""
+Cross-worker refresh of per-process catalog views
+
+The in-memory risk histogram, top threats leaderboard, approach alert
+schedule, asteroid name index and chatbot stats follow this worker's own
+post-commit scoring events, so approaches scored by another worker or replica
+never reach them. This background task polls the shared data generation every
+few seconds: when another worker has moved it, the generation is adopted
+(which invalidates generation-keyed caches) and the views are reloaded from
+the database. The analytics and alert schedule are also reloaded on a longer
+timer as a backstop, which picks up watchlists edited on other workers.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import data_generation
+from app.services.alert_scheduler import alert_scheduler
+from app.services.analytics_service import AnalyticsService
+from app.services.chat_intents import ChatIntentService
+from app.services.chat_stats import chat_stats
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogRefresher:
+    """Background task that keeps per-process catalog views in step with other workers"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the refresher on the running event loop"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        AnalyticsService.rebuild(db)
+        alert_scheduler.rebuild(db)
+        alert_scheduler.wake()
+
+    @staticmethod
+    def apply_remote_changes(db: Session) -> None:
+        """Reload every view another worker's sync may have changed"""
+        AnalyticsService.rebuild(db)
+        alert_scheduler.rebuild(db)
+        alert_scheduler.wake()
+        ChatIntentService.rebuild_name_index(db)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_rebuild = loop.time()
+        while True:
+            await asyncio.sleep(settings.catalog_poll_seconds)
+            try:
+                async with AsyncSessionLocal() as db:
+                    if await db.run_sync(data_generation.sync):
+                        await db.run_sync(self.apply_remote_changes)
+                        chat_stats.wake()
+                        last_rebuild = loop.time()
+                    elif loop.time() - last_rebuild >= settings.analytics_rebuild_seconds:
+                        await db.run_sync(self.rebuild)
+                        last_rebuild = loop.time()
+            except Exception:
+                logger.exception("Catalog refresh failed")
+
+
+catalog_refresher = CatalogRefresher()
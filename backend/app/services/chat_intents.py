@@ -0,0 +1,122 @@
+"""
+Chat intent and entity extraction
+
+Classifies a chat message into a catalog question the service can answer
+straight from the database (an asteroid's facts, top threats, closest
+approaches, catalog counts) or an open-ended question for the LLM, and pulls
+out the asteroids it mentions using the in-memory name index. The index is
+seeded at startup and picks up new or renamed asteroids from post-commit
+scoring events.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import APPROACH_SCORED, ApproachScored, subscribe
+from app.models.models import Asteroid
+from app.utils.name_index import AsteroidNameIndex, normalize
+
+# Per-process index of asteroid names
+asteroid_name_index = AsteroidNameIndex()
+
+# Intents answered without the LLM
+ASTEROID_FACTS = "asteroid_facts"
+TOP_THREATS = "top_threats"
+CLOSEST_APPROACHES = "closest_approaches"
+CATALOG_COUNT = "catalog_count"
+# Everything else goes to the LLM
+OPEN_ENDED = "open_ended"
+
+# Questions about a named asteroid that its catalog record answers
+_FACT_PATTERN = re.compile(
+    r"\b(when|where|how big|how large|how fast|size|diameter|wide|big|large|speed|velocity|"
+    r"distance|how close|closest|close approach|next approach|approach|pass|passes|flyby|"
+    r"hazardous|dangerous|risk|cri|threat|sentry|tell me about|info|information|details|stats|"
+    r"what is|who is|magnitude)\b"
+)
+# Phrasing that asks for reasoning or opinion rather than a record
+_OPEN_PATTERN = re.compile(
+    r"\b(why|should|could|would|explain|compare|what if|worry|worried|imagine|happen|hit|"
+    r"impact|deflect|mission|history|discovered|how does|how do)\b"
+)
+_TOP_PATTERN = re.compile(
+    r"\b(top|biggest|greatest|riskiest|worst|most dangerous|most hazardous|highest risk|highest cri|"
+    r"main|major)\b.*\b(threats?|risks?|asteroids?|objects?|approaches|neos?)\b"
+    r"|\bthreats?\b.*\b(today|tonight|tomorrow|week|month|year|days?)\b"
+)
+_CLOSEST_PATTERN = re.compile(
+    r"\b(closest|nearest)\b.*\b(approach(es)?|asteroids?|objects?|flybys?|passes|neos?)\b"
+    r"|\bwhat( s| is) (passing|coming) (close|near|by)\b"
+)
+_COUNT_PATTERN = re.compile(r"\b(how many|number of|count of|total)\b")
+
+_WINDOWS = [
+    (re.compile(r"\b(next|within|in the next|coming) (\d{1,3}) days?\b"), None),
+    (re.compile(r"\b(today|tonight)\b"), 1),
+    (re.compile(r"\btomorrow\b"), 2),
+    (re.compile(r"\bweeks?\b"), 7),
+    (re.compile(r"\bmonths?\b"), 30),
+    (re.compile(r"\byears?\b"), 365),
+]
+
+
+@dataclass
+class ChatIntent:
+    """What a chat message asks for"""
+    kind: str
+    asteroids: List[Tuple[str, str]] = field(default_factory=list)  # (asteroid_id, name)
+    window_days: Optional[int] = None
+
+
+class ChatIntentService:
+    """Classify chat messages against the catalog"""
+
+    @staticmethod
+    def rebuild_name_index(db: Session) -> None:
+        """Load every asteroid name into the index"""
+        rows = db.query(Asteroid.id, Asteroid.name).yield_per(settings.export_batch_size)
+        asteroid_name_index.load((str(asteroid_id), name) for asteroid_id, name in rows if name)
+
+    @staticmethod
+    def apply_approach_scores(changes: List[ApproachScored]) -> None:
+        """Index asteroids created or renamed by a sync"""
+        asteroid_name_index.add_many(
+            (change.asteroid_id, change.asteroid_name) for change in changes if change.asteroid_name
+        )
+
+    @staticmethod
+    def window_days(text: str) -> Optional[int]:
+        """Look-ahead window named in the message, in days"""
+        for pattern, days in _WINDOWS:
+            match = pattern.search(text)
+            if match:
+                return days if days is not None else max(1, min(int(match.group(2)), 365))
+        return None
+
+    @staticmethod
+    def classify(message: str) -> ChatIntent:
+        """Intent, mentioned asteroids and look-ahead window of a message"""
+        text = normalize(message)
+        asteroids = asteroid_name_index.find(message)
+        window = ChatIntentService.window_days(text)
+
+        if _OPEN_PATTERN.search(text):
+            return ChatIntent(OPEN_ENDED, asteroids, window)
+        if asteroids:
+            # A bare name ("Apophis?") asks for its record too
+            if _FACT_PATTERN.search(text) or len(text.split()) <= 3:
+                return ChatIntent(ASTEROID_FACTS, asteroids, window)
+            return ChatIntent(OPEN_ENDED, asteroids, window)
+        if _TOP_PATTERN.search(text):
+            return ChatIntent(TOP_THREATS, asteroids, window)
+        if _CLOSEST_PATTERN.search(text):
+            return ChatIntent(CLOSEST_APPROACHES, asteroids, window)
+        if _COUNT_PATTERN.search(text) and re.search(r"\b(asteroids?|neos?|objects?|hazardous|phas?)\b", text):
+            return ChatIntent(CATALOG_COUNT, asteroids, window)
+        return ChatIntent(OPEN_ENDED, asteroids, window)
+
+
+subscribe(APPROACH_SCORED, ChatIntentService.apply_approach_scores)
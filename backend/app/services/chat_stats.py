@@ -0,0 +1,155 @@
+"""
+Chatbot catalog statistics
+
+The chatbot's system prompt and fallback answers quote catalog totals, the
+last NASA sync time and the current top threats. Those figures are kept in a
+per-process snapshot instead of being queried on every message: it is seeded
+at startup, rebuilt by a background task shortly after a sync commits on
+this worker or the catalog refresher sees one from another worker, and
+refreshed on a timer as a backstop.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import case, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import APPROACH_SCORED, ApproachScored, data_generation, subscribe
+from app.models.models import Asteroid, CloseApproach
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChatStats:
+    """Catalog figures quoted by the chatbot"""
+    total_asteroids: int
+    hazardous_count: int
+    last_sync_at: Optional[datetime]
+    top_threats: List[Tuple[str, float, datetime]] = field(default_factory=list)  # (name, CRI, next approach)
+    generation: int = 0
+    refreshed_at: Optional[datetime] = None
+
+    @property
+    def last_sync_label(self) -> str:
+        if self.last_sync_at is None:
+            return "Never"
+        last_sync_at = self.last_sync_at
+        if last_sync_at.tzinfo is None:
+            last_sync_at = last_sync_at.replace(tzinfo=timezone.utc)
+        return last_sync_at.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+
+class ChatStatsCache:
+    """Snapshot of ChatStats with a background refresher"""
+
+    def __init__(self):
+        self.snapshot: Optional[ChatStats] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def refresh(self, db: Session) -> ChatStats:
+        """
+        Rebuild the snapshot with one query: catalog totals, outer-joined to the top
+        threats so they read the same committed data as the totals on every worker
+        """
+        generation = data_generation.current
+        catalog = select(
+            func.count(Asteroid.id).label("total"),
+            func.coalesce(func.sum(case((Asteroid.is_hazardous == True, 1), else_=0)), 0).label("hazardous"),
+            func.max(Asteroid.nasa_synced_at).label("last_sync_at")
+        ).subquery()
+        # An asteroid's threat is the CRI of its next scored approach, as on the leaderboard
+        upcoming = select(
+            CloseApproach.asteroid_id,
+            CloseApproach.calculated_cri,
+            CloseApproach.closest_approach_date,
+            func.row_number().over(
+                partition_by=CloseApproach.asteroid_id,
+                order_by=(CloseApproach.closest_approach_date, CloseApproach.id)
+            ).label("position")
+        ).where(
+            CloseApproach.closest_approach_date > datetime.now(timezone.utc),
+            CloseApproach.calculated_cri.isnot(None)
+        ).subquery()
+        threats = select(
+            Asteroid.name, upcoming.c.calculated_cri, upcoming.c.closest_approach_date
+        ).join(
+            Asteroid, Asteroid.id == upcoming.c.asteroid_id
+        ).where(
+            upcoming.c.position == 1
+        ).order_by(
+            upcoming.c.calculated_cri.desc(), Asteroid.id.desc()
+        ).limit(settings.chat_stats_top_threats).subquery()
+        rows = db.execute(
+            select(catalog, threats).select_from(
+                catalog.outerjoin(threats, true())
+            ).order_by(threats.c.calculated_cri.desc())
+        ).all()
+        total, hazardous, last_sync_at = rows[0][:3]
+
+        self.snapshot = ChatStats(
+            total_asteroids=total or 0,
+            hazardous_count=hazardous or 0,
+            last_sync_at=last_sync_at,
+            top_threats=[(name, round(cri, 2), date) for *_, name, cri, date in rows if name is not None],
+            generation=generation,
+            refreshed_at=datetime.now(timezone.utc)
+        )
+        return self.snapshot
+
+    async def current(self, db: AsyncSession) -> ChatStats:
+        """The current snapshot, built on first use if startup did not seed it"""
+        if self.snapshot is None:
+            return await db.run_sync(self.refresh)
+        return self.snapshot
+
+    async def start(self) -> None:
+        """Start the refresher on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def apply_approach_scores(self, changes: List[ApproachScored]) -> None:
+        """A sync committed; rebuild on the next pass"""
+        self.wake()
+
+    def wake(self) -> None:
+        """Rebuild on the next pass, from any thread"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.chat_stats_refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.run_sync(self.refresh)
+            except Exception:
+                logger.exception("Chat stats refresh failed")
+
+
+chat_stats = ChatStatsCache()
+
+subscribe(APPROACH_SCORED, chat_stats.apply_approach_scores)
@@ -7,15 +7,46 @@ All rights reserved.
 Provides OpenAI GPT-3.5-turbo powered responses about asteroids and NEO monitoring.
 Repository: https://github.com/rohitb6/Cosmic_Watch
 """
-from typing import List, Optional
-from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import anyio
+import hashlib
 import httpx
 import json
-from sqlalchemy.orm import Session
+import logging
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.models.models import Asteroid
+from app.core.database import AsyncSessionLocal
+from app.core.events import data_generation
+from app.models.models import Asteroid, CloseApproach
 from app.schemas.schemas import AsteroidDetailResponse
+from app.services.chat_intents import (
+    ASTEROID_FACTS, CATALOG_COUNT, CLOSEST_APPROACHES, TOP_THREATS, ChatIntentService, asteroid_name_index
+)
+from app.services.chat_stats import chat_stats
+from app.services.conversation_store import conversation_store
+from app.services.upstream import openai_upstream, request_key
+from app.utils.cache import LRUCache
+from app.utils.name_index import normalize
+from app.utils.risk_calculator import get_risk_level
+from app.utils.tokens import message_tokens, prompt_tokens
+
+logger = logging.getLogger(__name__)
+
+# (normalized message, prompt context hash) -> (data generation, completion text)
+response_cache = LRUCache(
+    maxsize=settings.chat_response_cache_size,
+    ttl_seconds=settings.chat_response_cache_ttl_seconds
+)
+
+
+def _sse(event: str, data: dict) -> str:
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 class ChatMessage:
@@ -37,17 +68,25 @@ class ChatbotService:
     """Handle AI chatbot interactions for asteroid monitoring"""
     
     @staticmethod
-    def get_system_prompt(db: Session) -> str:
-        """Generate system prompt with current asteroid statistics"""
-        total_asteroids = db.query(Asteroid).count()
-        hazardous_count = db.query(Asteroid).filter(Asteroid.is_hazardous == True).count()
+    async def get_system_prompt(db: AsyncSession) -> str:
+        """Generate system prompt from the cached catalog statistics"""
+        stats = await chat_stats.current(db)
+        if stats.top_threats:
+            threats = "\n".join(
+                f"  - {name}: CRI {cri}, next approach {date.strftime('%Y-%m-%d')}"
+                for name, cri, date in stats.top_threats
+            )
+        else:
+            threats = "  - None scored"
         
         return f"""You are an expert AI assistant for Cosmic Watch, a Near-Earth Object (NEO) monitoring system.
 
 CURRENT STATUS:
-- Total Asteroids Monitored: {total_asteroids}
-- Potentially Hazardous Asteroids (PHAs): {hazardous_count}
-- Last NASA Sync: Today
+- Total Asteroids Monitored: {stats.total_asteroids}
+- Potentially Hazardous Asteroids (PHAs): {stats.hazardous_count}
+- Last NASA Sync: {stats.last_sync_label}
+- Top Threats by CRI:
+{threats}
 
 YOUR EXPERTISE:
 1. Asteroid and NEO information (names, sizes, orbital characteristics)
@@ -68,80 +107,338 @@ RESPONSE GUIDELINES:
 
 Always respond in the knowledge domain of asteroid monitoring and planetary defense."""
 
+    @staticmethod
+    async def build_messages(
+        db: AsyncSession,
+        message: str,
+        conversation_history: List[dict],
+        facts: Optional[str] = None,
+        summary: Optional[str] = None
+    ) -> List[dict]:
+        """
+        System prompt, retrieved catalog facts, the conversation summary, the turns it does not cover and the new message
+        Turns are added newest first while the estimated prompt stays within chat_prompt_token_budget
+        """
+        system_prompt = await ChatbotService.get_system_prompt(db)
+        
+        messages = [
+            {"role": "system", "content": system_prompt}
+        ]
+        if facts:
+            messages.append({"role": "system", "content": f"CATALOG FACTS FOR THIS QUESTION:\n{facts}"})
+        if summary:
+            messages.append({"role": "system", "content": f"CONVERSATION SO FAR (SUMMARY):\n{summary}"})
+        user_message = {"role": "user", "content": message}
+        
+        # Fill what is left of the budget with the unsummarized turns; the summarizer
+        # keeps these few, and any cut here would be missing from the summary too
+        used = prompt_tokens(messages) + message_tokens(user_message)
+        recent = []
+        for turn in reversed(conversation_history):
+            cost = message_tokens(turn)
+            if used + cost > settings.chat_prompt_token_budget:
+                break
+            recent.append({"role": turn["role"], "content": turn["content"]})
+            used += cost
+        messages.extend(reversed(recent))
+        
+        messages.append(user_message)
+        logger.debug("Chat prompt: %d messages, ~%d tokens", len(messages), used)
+        return messages
+    
+    @staticmethod
+    async def summarize(summary: Optional[str], conversation_messages: List[dict]) -> Optional[str]:
+        """
+        Fold messages into a conversation's rolling summary with one completion call
+        Returns None when no completion API is configured or the call fails
+        """
+        if not settings.openai_api_key or not conversation_messages:
+            return None
+        
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in conversation_messages)
+        prompt = (
+            f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}\n\n"
+            "Rewrite the summary so it also covers the new messages. Keep asteroid names, dates, "
+            "figures and the user's stated interests; drop pleasantries. Reply with the summary only."
+        )
+        messages = [
+            {"role": "system", "content": "You maintain concise running summaries of asteroid-monitoring chat conversations."},
+            {"role": "user", "content": prompt}
+        ]
+        try:
+            status_code, data = await ChatbotService._complete(ChatbotService._completion_request(
+                messages, max_tokens=settings.chat_summary_max_tokens, temperature=0.2
+            ))
+            if status_code != 200:
+                logger.warning("Conversation summary request returned %d", status_code)
+                return None
+            return data["choices"][0]["message"]["content"].strip() or None
+        except (httpx.HTTPError, ValueError, KeyError):
+            logger.exception("Conversation summary request failed")
+            return None
+    
+    @staticmethod
+    def _completion_request(
+        messages: List[dict],
+        stream: bool = False,
+        max_tokens: int = 500,
+        temperature: float = 0.7
+    ) -> dict:
+        """Keyword arguments for an OpenAI-compatible chat completion call"""
+        return {
+            "url": f"{settings.openai_base_url.rstrip('/')}/chat/completions",
+            "headers": {
+                "Authorization": f"Bearer {settings.openai_api_key}",
+                "Content-Type": "application/json"
+            },
+            "json": {
+                "model": settings.openai_model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "top_p": 0.9,
+                "stream": stream
+            },
+            "timeout": settings.openai_timeout_seconds
+        }
+    
     @staticmethod
     async def get_ai_response(
-        db: Session,
+        db: AsyncSession,
         message: str,
-        conversation_history: List[dict]
+        conversation_history: List[dict],
+        summary: Optional[str] = None
     ) -> str:
         """
         Get AI response using OpenAI API
-        Uses chat history for context-aware conversations
+        Uses the conversation summary and recent history for context-aware conversations
         """
         
+        # Catalog questions are answered from the database
+        answer, facts = await ChatbotService.answer_locally(db, message)
+        if answer:
+            return answer
+        
         # If no API key, return helpful default response
         if not settings.openai_api_key:
-            return ChatbotService.get_fallback_response(message, db)
+            return await ChatbotService.get_fallback_response(message, db)
         
         try:
             # Prepare system prompt with current data
-            system_prompt = ChatbotService.get_system_prompt(db)
+            messages = await ChatbotService.build_messages(db, message, conversation_history, facts, summary)
             
-            # Prepare conversation messages
-            messages = [
-                {"role": "system", "content": system_prompt}
-            ]
+            # Identical questions asked with the same context reuse the completion
+            key = ChatbotService._response_cache_key(messages)
+            cached = ChatbotService._cached_response(key)
+            if cached is not None:
+                return cached
+            generation = data_generation.current
             
-            # Add conversation history
-            messages.extend(conversation_history[-6:])  # Last 3 exchanges for context
+            # Call OpenAI API
+            status_code, data = await ChatbotService._complete(ChatbotService._completion_request(messages))
             
-            # Add current user message
-            messages.append({"role": "user", "content": message})
+            if status_code == 200:
+                reply = data["choices"][0]["message"]["content"]
+                response_cache.set(key, (generation, reply))
+                return reply
+            else:
+                return await ChatbotService.get_fallback_response(message, db)
+                    
+        except Exception as e:
+            return await ChatbotService.get_fallback_response(message, db)
+    
+    @staticmethod
+    async def stream_ai_response(
+        db: AsyncSession,
+        message: str,
+        conversation_history: List[dict],
+        summary: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the reply as content deltas from an upstream stream=true completion
+        Falls back to the canned answer, as one delta, when the upstream fails before any content
+        """
+        answer, facts = await ChatbotService.answer_locally(db, message)
+        if answer:
+            yield answer
+            return
+        if not settings.openai_api_key:
+            yield await ChatbotService.get_fallback_response(message, db)
+            return
+        
+        started = False
+        try:
+            messages = await ChatbotService.build_messages(db, message, conversation_history, facts, summary)
+            key = ChatbotService._response_cache_key(messages)
+            cached = ChatbotService._cached_response(key)
+            if cached is not None:
+                yield cached
+                return
+            generation = data_generation.current
             
-            # Call OpenAI API
+            reply = []
+            # A stream holds an upstream slot until it ends or the client goes away
+            async with openai_upstream.limit(), httpx.AsyncClient() as client:
+                async with client.stream("POST", **ChatbotService._completion_request(messages, stream=True)) as response:
+                    if response.status_code != 200:
+                        raise httpx.HTTPStatusError(
+                            f"Upstream returned {response.status_code}", request=response.request, response=response
+                        )
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        choices = json.loads(data).get("choices") or [{}]
+                        delta = (choices[0].get("delta") or {}).get("content")
+                        if delta:
+                            started = True
+                            reply.append(delta)
+                            yield delta
+            # Only a reply that streamed to the end is reused
+            if reply:
+                response_cache.set(key, (generation, "".join(reply)))
+        except (httpx.HTTPError, ValueError, KeyError):
+            # A reply cut off midway is kept as is; nothing was sent yet, so fall back
+            if started:
+                raise
+            yield await ChatbotService.get_fallback_response(message, db)
+    
+    @staticmethod
+    async def _complete(request: dict) -> Tuple[int, Optional[dict]]:
+        """
+        POST a non-streaming completion; identical concurrent requests share one upstream call
+        Returns the status code and, on 200, the decoded body
+        """
+        async def _post() -> Tuple[int, Optional[dict]]:
             async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {settings.openai_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": settings.openai_model,
-                        "messages": messages,
-                        "temperature": 0.7,
-                        "max_tokens": 500,
-                        "top_p": 0.9
-                    },
-                    timeout=30.0
+                response = await client.post(**request)
+                return response.status_code, response.json() if response.status_code == 200 else None
+        
+        return await openai_upstream.call(request_key("/chat/completions", request["json"]), _post)
+    
+    @staticmethod
+    def _response_cache_key(messages: List[dict]) -> Tuple[str, str]:
+        """
+        The normalized question plus a hash of everything else the completion depends on:
+        model, system prompt with its catalog figures, retrieved facts and history
+        """
+        context = json.dumps(
+            [settings.openai_model, [(m["role"], m["content"]) for m in messages[:-1]]],
+            ensure_ascii=False
+        )
+        return normalize(messages[-1]["content"]), hashlib.sha256(context.encode()).hexdigest()
+    
+    @staticmethod
+    def _cached_response(key: Tuple[str, str]) -> Optional[str]:
+        """A cached completion, unless catalog data changed since it was produced"""
+        cached = response_cache.get(key)
+        if cached is None:
+            return None
+        generation, reply = cached
+        if generation != data_generation.current:
+            response_cache.delete(key)
+            return None
+        return reply
+    
+    @staticmethod
+    def cache_stats() -> dict:
+        """Hit rates of the completion cache and the conversation hot tier, and completion API coalescing"""
+        return {
+            "response_cache": response_cache.stats(),
+            "conversation_cache": conversation_store.stats(),
+            "openai_upstream": openai_upstream.stats(),
+            "data_generation": data_generation.current
+        }
+    
+    @staticmethod
+    async def stream_chat(
+        request: Request,
+        user_id: str,
+        conversation_id: str,
+        message: str,
+        conversation_history: List[dict],
+        summary: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        SSE body: start, one delta per upstream chunk, then done (or error)
+        The exchange is stored once the reply is assembled, including a partial
+        reply when the client disconnects or the upstream breaks off
+        """
+        reply = []
+        saved = False
+        try:
+            yield _sse("start", {"conversation_id": conversation_id})
+            
+            error = None
+            async with AsyncSessionLocal() as db:
+                deltas = ChatbotService.stream_ai_response(db, message, conversation_history, summary)
+                try:
+                    async for delta in deltas:
+                        reply.append(delta)
+                        yield _sse("delta", {"content": delta})
+                        if await request.is_disconnected():
+                            return
+                except (httpx.HTTPError, ValueError, KeyError):
+                    logger.exception("Chat completion stream broke off")
+                    error = "The reply was interrupted"
+                finally:
+                    await deltas.aclose()
+            
+            saved = True
+            await ChatbotService._save_exchange(user_id, conversation_id, message, "".join(reply))
+            if error:
+                yield _sse("error", {"detail": error, "conversation_id": conversation_id})
+            else:
+                yield _sse("done", {
+                    "conversation_id": conversation_id,
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                })
+        finally:
+            if not saved:
+                # Client went away; finish the write even though the request is being cancelled
+                with anyio.CancelScope(shield=True):
+                    await ChatbotService._save_exchange(user_id, conversation_id, message, "".join(reply))
+    
+    @staticmethod
+    async def _save_exchange(user_id: str, conversation_id: str, message: str, reply: str) -> None:
+        """Store a user message and the assembled reply; nothing is stored if no reply was produced"""
+        if not reply:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.run_sync(
+                    conversation_store.append,
+                    conversation_id,
+                    user_id,
+                    [("user", message), ("assistant", reply)]
                 )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return data["choices"][0]["message"]["content"]
-                else:
-                    return ChatbotService.get_fallback_response(message, db)
-                    
-        except Exception as e:
-            return ChatbotService.get_fallback_response(message, db)
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to store streamed chat reply")
     
     @staticmethod
-    def get_fallback_response(message: str, db: Session) -> str:
+    async def get_fallback_response(message: str, db: AsyncSession) -> str:
         """
         Provide intelligent responses without OpenAI
         Uses pattern matching on user queries
         """
         msg_lower = message.lower()
+        stats = await chat_stats.current(db)
         
         # Asteroid status queries
         if any(word in msg_lower for word in ["how many", "total", "count", "asteroids"]):
-            total = db.query(Asteroid).count()
-            hazardous = db.query(Asteroid).filter(Asteroid.is_hazardous == True).count()
-            return f"We are currently monitoring {total} asteroids, including {hazardous} potentially hazardous ones. This data is updated daily from NASA's NeoWs API."
+            return f"We are currently monitoring {stats.total_asteroids} asteroids, including {stats.hazardous_count} potentially hazardous ones. The catalog was last synced from NASA's NeoWs API at {stats.last_sync_label}."
         
         # Risk/hazard queries
         if any(word in msg_lower for word in ["risk", "danger", "hazard", "threat"]):
-            return "Risk assessment in Cosmic Watch uses our proprietary Cosmic Risk Index (CRI), which combines: asteroid diameter (30%), velocity (25%), miss distance (25%), and hazard status (20%). A score of 81+ indicates CRITICAL risk level requiring immediate attention."
+            if stats.top_threats:
+                name, cri, date = stats.top_threats[0]
+                top = f" The highest-risk upcoming approach right now is {name} (CRI {cri}) on {date.strftime('%Y-%m-%d')}."
+            else:
+                top = ""
+            return "Risk assessment in Cosmic Watch uses our proprietary Cosmic Risk Index (CRI), which combines: asteroid diameter (30%), velocity (25%), miss distance (25%), and hazard status (20%). A score of 81+ indicates CRITICAL risk level requiring immediate attention." + top
         
         # How to use queries
         if any(word in msg_lower for word in ["how do i", "how to", "use", "help"]):
@@ -160,26 +457,140 @@ Always respond in the knowledge domain of asteroid monitoring and planetary defe
             return "Planetary defense strategies include: early detection (5-10 years advance warning), kinetic impactors for smaller objects, and gravity tractor assists. Our monitoring system provides the early warning essential for effective mitigation."
         
         # Default helpful response
-        total = db.query(Asteroid).count()
-        return f"I'm your Cosmic Watch AI assistant! I can help you understand the {total} asteroids we're monitoring. Ask me about specific asteroids, risk assessment, how to use our platform, or planetary defense strategies. What interests you?"
+        return f"I'm your Cosmic Watch AI assistant! I can help you understand the {stats.total_asteroids} asteroids we're monitoring. Ask me about specific asteroids, risk assessment, how to use our platform, or planetary defense strategies. What interests you?"
+    
+    @staticmethod
+    async def answer_locally(db: AsyncSession, message: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Answer factual catalog questions straight from the database
+        Returns (answer, None) when the catalog answers the question, otherwise
+        (None, facts) with compact facts about any asteroids it mentions for the LLM
+        """
+        intent = ChatIntentService.classify(message)
+        
+        if intent.kind == ASTEROID_FACTS:
+            blocks = [await ChatbotService.search_asteroid_info(db, name) for _, name in intent.asteroids]
+            blocks = [block for block in blocks if block]
+            if blocks:
+                return "Here is what our catalog has:\n" + "".join(blocks), None
+        
+        if intent.kind == TOP_THREATS:
+            return await ChatbotService._top_threats_answer(db, intent.window_days), None
+        
+        if intent.kind == CLOSEST_APPROACHES:
+            return await ChatbotService._closest_approaches_answer(db, intent.window_days), None
+        
+        if intent.kind == CATALOG_COUNT:
+            stats = await chat_stats.current(db)
+            return (
+                f"We are currently monitoring {stats.total_asteroids} asteroids, including "
+                f"{stats.hazardous_count} potentially hazardous ones. Last NASA sync: {stats.last_sync_label}."
+            ), None
+        
+        facts = [await ChatbotService.search_asteroid_info(db, name) for _, name in intent.asteroids]
+        facts = "".join(block for block in facts if block).strip()
+        return None, facts or None
     
     @staticmethod
-    def search_asteroid_info(db: Session, query: str) -> Optional[str]:
+    async def _top_threats_answer(db: AsyncSession, window_days: Optional[int]) -> str:
+        """Highest-CRI upcoming approaches, from the stats snapshot unless a window is asked for"""
+        limit = settings.chat_local_answer_limit
+        if window_days is None:
+            stats = await chat_stats.current(db)
+            threats = stats.top_threats[:limit]
+            heading = "Top threats by CRI of their next close approach:"
+        else:
+            now = datetime.now(timezone.utc)
+            rows = (await db.execute(
+                select(Asteroid.name, CloseApproach.calculated_cri, CloseApproach.closest_approach_date).join(
+                    Asteroid, Asteroid.id == CloseApproach.asteroid_id
+                ).where(
+                    CloseApproach.closest_approach_date > now,
+                    CloseApproach.closest_approach_date <= now + timedelta(days=window_days),
+                    CloseApproach.calculated_cri.isnot(None)
+                ).order_by(CloseApproach.calculated_cri.desc()).limit(limit)
+            )).all()
+            threats = [(name, round(cri, 2), date) for name, cri, date in rows]
+            heading = f"Top threats by CRI in the next {ChatbotService._days(window_days)}:"
+        
+        if not threats:
+            return "No scored close approaches fall in that window."
+        lines = [
+            f"{rank}. {name} - CRI {cri} ({get_risk_level(cri)['level']}), approach {date.strftime('%Y-%m-%d %H:%M UTC')}"
+            for rank, (name, cri, date) in enumerate(threats, start=1)
+        ]
+        return heading + "\n" + "\n".join(lines)
+    
+    @staticmethod
+    async def _closest_approaches_answer(db: AsyncSession, window_days: Optional[int]) -> str:
+        """Upcoming approaches by miss distance within the window"""
+        window_days = window_days or settings.chat_closest_default_days
+        now = datetime.now(timezone.utc)
+        rows = (await db.execute(
+            select(
+                Asteroid.name,
+                CloseApproach.miss_distance_km,
+                CloseApproach.miss_distance_lunar,
+                CloseApproach.closest_approach_date
+            ).join(
+                Asteroid, Asteroid.id == CloseApproach.asteroid_id
+            ).where(
+                CloseApproach.closest_approach_date > now,
+                CloseApproach.closest_approach_date <= now + timedelta(days=window_days),
+                CloseApproach.miss_distance_km.isnot(None)
+            ).order_by(CloseApproach.miss_distance_km).limit(settings.chat_local_answer_limit)
+        )).all()
+        
+        if not rows:
+            return f"No close approaches are recorded for the next {ChatbotService._days(window_days)}."
+        lines = [
+            f"{rank}. {name} - {distance_km:,.0f} km"
+            + (f" ({lunar:.1f} LD)" if lunar else "")
+            + f" on {date.strftime('%Y-%m-%d %H:%M UTC')}"
+            for rank, (name, distance_km, lunar, date) in enumerate(rows, start=1)
+        ]
+        return f"Closest approaches in the next {ChatbotService._days(window_days)}:\n" + "\n".join(lines)
+    
+    @staticmethod
+    def _days(count: int) -> str:
+        return "day" if count == 1 else f"{count} days"
+    
+    @staticmethod
+    async def search_asteroid_info(db: AsyncSession, query: str) -> Optional[str]:
         """
         Search for asteroid info in database
         Returns formatted asteroid information if found
         """
-        query_lower = query.lower()
-        
-        # Search by name
-        asteroid = db.query(Asteroid).filter(
-            Asteroid.name.ilike(f"%{query_lower}%")
-        ).first()
+        # Names the index resolves load by primary key; anything else falls back to a name match
+        resolved = asteroid_name_index.resolve(query)
+        if resolved:
+            asteroid = await db.get(Asteroid, UUID(resolved[0]))
+        else:
+            asteroid = (await db.execute(
+                select(Asteroid).where(Asteroid.name.ilike(f"%{query.lower()}%")).limit(1)
+            )).scalars().first()
         
         if asteroid:
+            # Next approach from idx_approach_asteroid_date
+            approach = (await db.execute(
+                select(CloseApproach).where(
+                    CloseApproach.asteroid_id == asteroid.id,
+                    CloseApproach.closest_approach_date > datetime.now(timezone.utc)
+                ).order_by(CloseApproach.closest_approach_date).limit(1)
+            )).scalars().first()
+            
             info = f"\n**{asteroid.name}** (NEO ID: {asteroid.neo_id})\n"
             info += f"Diameter: {asteroid.diameter_km:.2f} km\n" if asteroid.diameter_km else ""
             info += f"Hazardous: {'Yes ⚠️' if asteroid.is_hazardous else 'No ✓'}\n"
+            if approach:
+                info += f"Next Close Approach: {approach.closest_approach_date.strftime('%Y-%m-%d %H:%M UTC')}"
+                info += f" at {approach.miss_distance_km:,.0f} km" if approach.miss_distance_km else ""
+                info += f", {approach.approach_velocity_kmh:,.0f} km/h" if approach.approach_velocity_kmh else ""
+                info += "\n"
+                if approach.calculated_cri is not None:
+                    info += f"CRI: {approach.calculated_cri:.1f} ({get_risk_level(approach.calculated_cri)['level']})\n"
+            else:
+                info += "Next Close Approach: none on record\n"
             info += f"Last NASA Sync: {asteroid.nasa_synced_at.strftime('%Y-%m-%d %H:%M UTC') if asteroid.nasa_synced_at else 'Not synced'}\n"
             return info
         
@@ -0,0 +1,345 @@
+"""
+Chat conversation store
+
+Conversations and their messages are persisted in the database, so they
+survive restarts and are shared by every worker behind a load balancer. Each
+worker keeps recently used conversations in a size-bounded LRU hot tier; a
+primary-key lookup of the conversation's last_seq tells whether the cached
+copy is current, and only newer messages are read when it is not. Messages
+per conversation and conversations per user are capped, and idle
+conversations expire after chat_conversation_ttl_days. Each conversation
+also carries a rolling summary of its older messages for prompt building.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import (
+    CONVERSATION_APPENDED, CONVERSATION_SAVED, ConversationAppended, emit_after_commit, subscribe
+)
+from app.models.models import Conversation, ConversationMessage
+from app.utils.cache import LRUCache
+
+
+@dataclass
+class StoredConversation:
+    """Snapshot of a conversation and its retained messages"""
+    id: str
+    user_id: str
+    created_at: datetime
+    last_message_at: datetime
+    last_seq: int
+    messages: List[dict] = field(default_factory=list)  # {"role", "content", "timestamp"}
+    summary: Optional[str] = None  # Rolling summary of messages up to summary_seq
+    summary_seq: int = 0
+
+    def messages_after(self, seq: int) -> List[dict]:
+        """Retained messages numbered above seq; the list ends at last_seq"""
+        first_seq = self.last_seq - len(self.messages) + 1
+        return self.messages[max(0, seq + 1 - first_seq):]
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _parse_id(conversation_id: str) -> UUID:
+    try:
+        return UUID(conversation_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid conversation ID")
+
+
+class ConversationStore:
+    """Database-backed conversation store with a per-worker LRU hot tier"""
+
+    def __init__(self):
+        self._hot = LRUCache(
+            maxsize=settings.chat_hot_cache_size,
+            ttl_seconds=settings.chat_hot_cache_ttl_seconds
+        )
+
+    # ---- reads ----
+
+    def get(self, db: Session, conversation_id: str, user_id: str) -> Optional[StoredConversation]:
+        """
+        Load a conversation owned by user_id, or None if it does not exist or has expired
+        Raises PermissionError when another user owns it
+        """
+        row = db.query(Conversation).filter(Conversation.id == _parse_id(conversation_id)).first()
+        if row is None:
+            self._hot.delete(conversation_id)
+            return None
+        if str(row.user_id) != user_id:
+            raise PermissionError("You don't have access to this conversation")
+        if self._expired(row.last_message_at):
+            # Left for purge_expired; a new message starts the conversation over
+            self._hot.delete(conversation_id)
+            return None
+
+        key = str(row.id)
+        cached = self._hot.get(key)
+        if cached is not None and cached.last_seq == row.last_seq:
+            # Summaries are written without new messages; take the row's current one
+            cached.summary, cached.summary_seq = row.summary, row.summary_seq
+            return cached
+
+        # Only messages newer than the cached copy are read
+        after = cached.last_seq if cached is not None and cached.last_seq < row.last_seq else 0
+        messages = list(cached.messages) if after else []
+        messages.extend(
+            {"role": role, "content": content, "timestamp": created_at}
+            for role, content, created_at in db.query(
+                ConversationMessage.role,
+                ConversationMessage.content,
+                ConversationMessage.created_at
+            ).filter(
+                ConversationMessage.conversation_id == row.id,
+                ConversationMessage.seq > after
+            ).order_by(ConversationMessage.seq)
+        )
+
+        conversation = StoredConversation(
+            id=key,
+            user_id=user_id,
+            created_at=row.created_at,
+            last_message_at=row.last_message_at,
+            last_seq=row.last_seq,
+            messages=messages[-settings.chat_max_messages_per_conversation:],
+            summary=row.summary,
+            summary_seq=row.summary_seq
+        )
+        self._hot.set(key, conversation)
+        return conversation
+
+    def list_for_user(self, db: Session, user_id: str, limit: Optional[int] = None) -> List[dict]:
+        """A user's live conversations, most recent first, from idx_conversation_user_last"""
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            raise ValueError("Invalid user ID")
+
+        rows = db.query(
+            Conversation.id,
+            Conversation.preview,
+            Conversation.message_count,
+            Conversation.created_at,
+            Conversation.last_message_at
+        ).filter(
+            Conversation.user_id == user_uuid,
+            Conversation.last_message_at >= self._cutoff()
+        ).order_by(
+            Conversation.last_message_at.desc()
+        ).limit(limit or settings.chat_max_conversations_per_user).all()
+
+        return [
+            {
+                "conversation_id": str(row.id),
+                "created_at": row.created_at,
+                "last_message_at": row.last_message_at,
+                "message_count": row.message_count,
+                "preview": row.preview or ""
+            }
+            for row in rows
+        ]
+
+    # ---- writes ----
+
+    def append(
+        self,
+        db: Session,
+        conversation_id: Optional[str],
+        user_id: str,
+        messages: List[Tuple[str, str]]
+    ) -> StoredConversation:
+        """
+        Append (role, content) messages, creating the conversation if needed
+        Sequence numbers are reserved with one UPDATE ... RETURNING, so concurrent
+        writers never collide; the caller commits and the hot tier updates after commit
+        """
+        if conversation_id:
+            conversation_uuid = _parse_id(conversation_id)
+        else:
+            conversation_uuid = uuid4()
+        user_uuid = UUID(user_id)
+        now = datetime.now(timezone.utc)
+        count = len(messages)
+        cap = settings.chat_max_messages_per_conversation
+
+        existing = db.query(
+            Conversation.user_id, Conversation.last_message_at
+        ).filter(Conversation.id == conversation_uuid).first()
+        if existing is not None and existing.user_id != user_uuid:
+            raise PermissionError("You don't have access to this conversation")
+        if existing is not None and self._expired(existing.last_message_at):
+            self._delete_ids(db, [conversation_uuid])
+            existing = None
+        if existing is None:
+            self._make_room(db, user_uuid)
+            db.add(Conversation(id=conversation_uuid, user_id=user_uuid, last_message_at=now))
+            db.flush()
+
+        preview = next((content for role, content in messages if role == "user"), None)
+        last_seq, created_at = db.execute(
+            update(Conversation).where(
+                Conversation.id == conversation_uuid
+            ).values(
+                last_seq=Conversation.last_seq + count,
+                message_count=case(
+                    (Conversation.message_count + count > cap, cap),
+                    else_=Conversation.message_count + count
+                ),
+                last_message_at=now,
+                preview=func.coalesce(Conversation.preview, preview[:100] if preview else None)
+            ).returning(
+                Conversation.last_seq, Conversation.created_at
+            ).execution_options(synchronize_session=False)
+        ).one()
+
+        first_seq = last_seq - count + 1
+        db.execute(ConversationMessage.__table__.insert(), [
+            {
+                "conversation_id": conversation_uuid,
+                "seq": first_seq + offset,
+                "role": role,
+                "content": content,
+                "created_at": now,
+            }
+            for offset, (role, content) in enumerate(messages)
+        ])
+        if last_seq > cap:
+            db.execute(
+                delete(ConversationMessage).where(
+                    ConversationMessage.conversation_id == conversation_uuid,
+                    ConversationMessage.seq <= last_seq - cap
+                )
+            )
+
+        key = str(conversation_uuid)
+        cached = self._hot.get(key)
+        history = cached.messages if cached is not None and cached.last_seq == first_seq - 1 else None
+        conversation = StoredConversation(
+            id=key,
+            user_id=user_id,
+            created_at=created_at or now,
+            last_message_at=now,
+            last_seq=last_seq,
+            messages=[],
+            summary=cached.summary if history is not None else None,
+            summary_seq=cached.summary_seq if history is not None else 0
+        )
+        emit_after_commit(db, CONVERSATION_APPENDED, ConversationAppended(key, user_id, last_seq))
+        if history is not None or first_seq == 1:
+            conversation.messages = ((history or []) + [
+                {"role": role, "content": content, "timestamp": now} for role, content in messages
+            ])[-cap:]
+            emit_after_commit(db, CONVERSATION_SAVED, conversation)
+        else:
+            # The hot copy is behind; the next read refreshes it from the database
+            self._hot.delete(key)
+        return conversation
+
+    def save_summary(self, db: Session, conversation_id: str, summary: str, summary_seq: int) -> bool:
+        """
+        Store a rolling summary covering messages up to summary_seq; the caller commits
+        A summary older than the stored one is discarded
+        """
+        result = db.execute(
+            update(Conversation).where(
+                Conversation.id == _parse_id(conversation_id),
+                Conversation.summary_seq < summary_seq
+            ).values(
+                summary=summary,
+                summary_seq=summary_seq
+            ).execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+    def delete(self, db: Session, conversation_id: str, user_id: str) -> bool:
+        """Delete a conversation and its messages; the caller commits"""
+        conversation_uuid = _parse_id(conversation_id)
+        owner = db.query(Conversation.user_id).filter(Conversation.id == conversation_uuid).scalar()
+        if owner is None:
+            raise ValueError("Conversation not found")
+        if str(owner) != user_id:
+            raise PermissionError("You don't have access to this conversation")
+
+        self._delete_ids(db, [conversation_uuid])
+        return True
+
+    def purge_expired(self, db: Session, chunk_size: Optional[int] = None) -> int:
+        """
+        Delete conversations idle longer than the TTL, committing one chunk at a time
+        Returns count of conversations deleted
+        """
+        chunk_size = chunk_size or settings.chat_purge_chunk_size
+        cutoff = self._cutoff()
+
+        purged = 0
+        while True:
+            conversation_ids = db.execute(
+                select(Conversation.id).where(
+                    Conversation.last_message_at < cutoff
+                ).order_by(Conversation.last_message_at).limit(chunk_size)
+            ).scalars().all()
+            if not conversation_ids:
+                break
+
+            self._delete_ids(db, conversation_ids)
+            db.commit()
+            purged += len(conversation_ids)
+            if len(conversation_ids) < chunk_size:
+                break
+
+        return purged
+
+    def _make_room(self, db: Session, user_uuid: UUID) -> None:
+        """Evict the user's least recently active conversations so a new one fits under the cap"""
+        evicted = db.execute(
+            select(Conversation.id).where(
+                Conversation.user_id == user_uuid
+            ).order_by(
+                Conversation.last_message_at.desc()
+            ).offset(settings.chat_max_conversations_per_user - 1)
+        ).scalars().all()
+        if evicted:
+            self._delete_ids(db, evicted)
+
+    def _delete_ids(self, db: Session, conversation_ids: List[UUID]) -> None:
+        # Messages are removed explicitly so SQLite without foreign keys stays clean
+        db.execute(
+            delete(ConversationMessage).where(ConversationMessage.conversation_id.in_(conversation_ids))
+        )
+        db.execute(delete(Conversation).where(Conversation.id.in_(conversation_ids)))
+        for conversation_id in conversation_ids:
+            self._hot.delete(str(conversation_id))
+
+    # ---- hot tier ----
+
+    def apply_saved(self, conversations: List[StoredConversation]) -> None:
+        """Cache committed conversations unless a newer copy is already cached"""
+        for conversation in conversations:
+            cached = self._hot.get(conversation.id)
+            if cached is None or cached.last_seq <= conversation.last_seq:
+                self._hot.set(conversation.id, conversation)
+
+    def stats(self) -> dict:
+        return self._hot.stats()
+
+    @staticmethod
+    def _cutoff() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(days=settings.chat_conversation_ttl_days)
+
+    @staticmethod
+    def _expired(last_message_at: datetime) -> bool:
+        return _as_utc(last_message_at) < ConversationStore._cutoff()
+
+
+conversation_store = ConversationStore()
+
+subscribe(CONVERSATION_SAVED, conversation_store.apply_saved)
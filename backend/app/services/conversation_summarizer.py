@@ -0,0 +1,101 @@
+"""
+Rolling conversation summaries
+
+Chat prompts send a conversation's summary plus every message it does not
+cover yet. After each committed exchange this background task folds messages
+that have left the recent window into the stored summary with one completion
+call, so prompt size stays bounded however long the conversation grows. Requests never
+wait on it; one that arrives before a summary is updated simply sends the
+previous summary.
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import CONVERSATION_APPENDED, ConversationAppended, subscribe
+from app.services.chatbot_service import ChatbotService
+from app.services.conversation_store import conversation_store
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSummarizer:
+    """Background task that keeps conversation summaries current"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # Conversation id -> owner, for conversations appended to since the last pass
+        self._pending: Dict[str, str] = {}
+        self._pending_lock = threading.Lock()
+
+    async def start(self) -> None:
+        """Start the summarizer on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def apply_appended(self, changes: List[ConversationAppended]) -> None:
+        """Queue conversations that gained messages; summaries are only written with a completion API"""
+        if not settings.openai_api_key:
+            return
+        with self._pending_lock:
+            for change in changes:
+                self._pending[change.conversation_id] = change.user_id
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            for conversation_id, user_id in pending.items():
+                try:
+                    await self.summarize(conversation_id, user_id)
+                except Exception:
+                    logger.exception("Summarizing conversation %s failed", conversation_id)
+
+    async def summarize(self, conversation_id: str, user_id: str) -> bool:
+        """
+        Fold messages older than the recent window into the conversation's summary
+        Returns whether a new summary was stored
+        """
+        async with AsyncSessionLocal() as db:
+            conversation = await db.run_sync(conversation_store.get, conversation_id, user_id)
+            if conversation is None:
+                return False
+
+            unsummarized = conversation.messages_after(conversation.summary_seq)
+            fold = unsummarized[:-settings.chat_recent_max_messages]
+            if len(fold) < settings.chat_summary_min_messages:
+                return False
+
+            summary = await ChatbotService.summarize(conversation.summary, fold)
+            if summary is None:
+                return False
+
+            summary_seq = conversation.last_seq - (len(unsummarized) - len(fold))
+            saved = await db.run_sync(conversation_store.save_summary, conversation_id, summary, summary_seq)
+            await db.commit()
+            return saved
+
+
+conversation_summarizer = ConversationSummarizer()
+
+subscribe(CONVERSATION_APPENDED, conversation_summarizer.apply_appended)
@@ -0,0 +1,298 @@
+"""
+Bulk export service
+
+Streams asteroid, close approach and watchlist rows through a server-side
+cursor so exports of any size run in constant memory.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, exists, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Asteroid, CloseApproach, Watchlist
+
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+EXPORT_DATASETS = ("approaches", "asteroids")
+
+# (column name, SQL column, arrow type name)
+APPROACH_COLUMNS = [
+    ("approach_id", CloseApproach.id, "string"),
+    ("asteroid_id", Asteroid.id, "string"),
+    ("neo_id", Asteroid.neo_id, "string"),
+    ("name", Asteroid.name, "string"),
+    ("diameter_km", Asteroid.diameter_km, "float64"),
+    ("is_hazardous", Asteroid.is_hazardous, "bool"),
+    ("is_sentry_object", Asteroid.is_sentry_object, "bool"),
+    ("closest_approach_date", CloseApproach.closest_approach_date, "timestamp"),
+    ("miss_distance_km", CloseApproach.miss_distance_km, "float64"),
+    ("miss_distance_au", CloseApproach.miss_distance_au, "float64"),
+    ("miss_distance_lunar", CloseApproach.miss_distance_lunar, "float64"),
+    ("approach_velocity_kmh", CloseApproach.approach_velocity_kmh, "float64"),
+    ("approach_velocity_kms", CloseApproach.approach_velocity_kms, "float64"),
+    ("orbiting_body", CloseApproach.orbiting_body, "string"),
+    ("calculated_cri", CloseApproach.calculated_cri, "float64"),
+]
+
+ASTEROID_COLUMNS = [
+    ("asteroid_id", Asteroid.id, "string"),
+    ("neo_id", Asteroid.neo_id, "string"),
+    ("name", Asteroid.name, "string"),
+    ("url", Asteroid.url, "string"),
+    ("diameter_km", Asteroid.diameter_km, "float64"),
+    ("diameter_min_km", Asteroid.diameter_min_km, "float64"),
+    ("diameter_max_km", Asteroid.diameter_max_km, "float64"),
+    ("absolute_magnitude", Asteroid.absolute_magnitude, "float64"),
+    ("is_hazardous", Asteroid.is_hazardous, "bool"),
+    ("is_sentry_object", Asteroid.is_sentry_object, "bool"),
+    ("nasa_synced_at", Asteroid.nasa_synced_at, "timestamp"),
+]
+
+# Same columns the watchlist import accepts, so an export can be re-imported
+WATCHLIST_COLUMNS = [
+    ("neo_id", Asteroid.neo_id, "string"),
+    ("name", Asteroid.name, "string"),
+    ("alert_threshold_distance_km", Watchlist.alert_threshold_distance_km, "float64"),
+    ("alert_threshold_cri", Watchlist.alert_threshold_cri, "float64"),
+    ("custom_notes", Watchlist.custom_notes, "string"),
+    ("created_at", Watchlist.created_at, "timestamp"),
+]
+
+
+def _json_value(value):
+    """Convert DB values to JSON/CSV friendly primitives"""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    """Handle streaming bulk exports"""
+
+    @staticmethod
+    def validate_request(fmt: str, dataset: str) -> None:
+        """Validate export format and dataset, raising ValueError if unsupported"""
+        ExportService.validate_format(fmt)
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Unsupported dataset '{dataset}'. Use one of: {', '.join(EXPORT_DATASETS)}")
+
+    @staticmethod
+    def validate_format(fmt: str) -> None:
+        """Validate an export format, raising ValueError if unsupported"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValueError("Parquet export requires the 'pyarrow' package")
+
+    @staticmethod
+    def get_media_type(fmt: str, compress: bool) -> str:
+        """Response media type for an export"""
+        if compress and fmt != "parquet":
+            return "application/gzip"
+        return EXPORT_FORMATS[fmt][0]
+
+    @staticmethod
+    def get_filename(dataset: str, fmt: str, compress: bool) -> str:
+        """Download filename for an export"""
+        filename = f"cosmic_watch_{dataset}.{EXPORT_FORMATS[fmt][1]}"
+        if compress and fmt != "parquet":
+            filename += ".gz"
+        return filename
+
+    @staticmethod
+    def build_export_query(
+        dataset: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        hazardous_only: bool = False,
+        min_cri: Optional[float] = None,
+        max_distance_km: Optional[float] = None
+    ):
+        """
+        Build the export SELECT for a dataset
+        Approach filters on the asteroids dataset keep asteroids having at least one matching approach
+        """
+        approach_filters = []
+        if start_date:
+            approach_filters.append(CloseApproach.closest_approach_date >= start_date)
+        if end_date:
+            approach_filters.append(CloseApproach.closest_approach_date < end_date)
+        if min_cri is not None:
+            approach_filters.append(CloseApproach.calculated_cri >= min_cri)
+        if max_distance_km is not None:
+            approach_filters.append(CloseApproach.miss_distance_km <= max_distance_km)
+
+        if dataset == "approaches":
+            columns = APPROACH_COLUMNS
+            stmt = select(*[col for _, col, _ in columns]).select_from(CloseApproach).join(
+                Asteroid, Asteroid.id == CloseApproach.asteroid_id
+            )
+            if approach_filters:
+                stmt = stmt.where(and_(*approach_filters))
+            stmt = stmt.order_by(CloseApproach.closest_approach_date, CloseApproach.id)
+        else:
+            columns = ASTEROID_COLUMNS
+            stmt = select(*[col for _, col, _ in columns])
+            if approach_filters:
+                stmt = stmt.where(
+                    exists().where(and_(CloseApproach.asteroid_id == Asteroid.id, *approach_filters))
+                )
+            stmt = stmt.order_by(Asteroid.neo_id)
+
+        if hazardous_only:
+            stmt = stmt.where(Asteroid.is_hazardous == True)
+
+        return stmt, columns
+
+    @staticmethod
+    def build_watchlist_query(user_id: UUID):
+        """Build the export SELECT for one user's watchlist, oldest entry first"""
+        columns = WATCHLIST_COLUMNS
+        stmt = select(*[col for _, col, _ in columns]).select_from(Watchlist).join(
+            Asteroid, Asteroid.id == Watchlist.asteroid_id
+        ).where(
+            Watchlist.user_id == user_id
+        ).order_by(Watchlist.created_at, Watchlist.id)
+        return stmt, columns
+
+    @staticmethod
+    def iter_batches(db: Session, stmt, batch_size: Optional[int] = None) -> Iterator[list]:
+        """Iterate result rows in batches using a server-side cursor"""
+        batch_size = batch_size or settings.export_batch_size
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+
+    @staticmethod
+    def stream_export(
+        db: Session,
+        stmt,
+        columns: list,
+        fmt: str,
+        compress: bool = False
+    ) -> Iterator[bytes]:
+        """Encode the query result into export chunks, optionally gzipped"""
+        names = [name for name, _, _ in columns]
+        batches = ExportService.iter_batches(db, stmt)
+
+        if fmt == "parquet":
+            yield from ExportService._encode_parquet(batches, columns, compress)
+            return
+
+        encoder = ExportService._encode_csv if fmt == "csv" else ExportService._encode_ndjson
+        chunks = encoder(batches, names)
+
+        if not compress:
+            yield from chunks
+            return
+
+        # wbits=31 writes a gzip container instead of a raw zlib stream
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @staticmethod
+    def _encode_ndjson(batches: Iterator[list], names: List[str]) -> Iterator[bytes]:
+        """One JSON object per line"""
+        for batch in batches:
+            lines = [
+                json.dumps({name: _json_value(value) for name, value in zip(names, row)})
+                for row in batch
+            ]
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _encode_csv(batches: Iterator[list], names: List[str]) -> Iterator[bytes]:
+        """CSV with a header row"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for batch in batches:
+            writer.writerows([_json_value(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _encode_parquet(batches: Iterator[list], columns: list, compress: bool) -> Iterator[bytes]:
+        """One Parquet row group per batch, flushed as soon as it is written"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_types = {
+            "string": pa.string(),
+            "float64": pa.float64(),
+            "bool": pa.bool_(),
+            "timestamp": pa.timestamp("us", tz="UTC"),
+        }
+        schema = pa.schema([(name, arrow_types[type_name]) for name, _, type_name in columns])
+        string_columns = {i for i, (_, _, type_name) in enumerate(columns) if type_name == "string"}
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="gzip" if compress else "snappy")
+        try:
+            for batch in batches:
+                arrays = []
+                for i, field in enumerate(schema):
+                    values = [row[i] for row in batch]
+                    if i in string_columns:
+                        values = [str(v) if v is not None else None for v in values]
+                    arrays.append(pa.array(values, type=field.type))
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back in chunks"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
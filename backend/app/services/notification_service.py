@@ -0,0 +1,349 @@
+"""
+Alert notification delivery
+
+New alerts are written to a transactional outbox alongside the alert rows,
+one row per configured channel, due at the time the user's
+notification_frequency allows (immediately, next UTC midnight or next
+Monday). A background worker claims due rows, folds each user's rows per
+channel into a single digest, and delivers it over SMTP with capped
+concurrency and exponential backoff on failure.
+"""
+import asyncio
+import logging
+import smtplib
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import NOTIFICATIONS_QUEUED, emit_after_commit, subscribe
+from app.models.models import Alert, Asteroid, NotificationOutbox, User
+
+logger = logging.getLogger(__name__)
+
+REALTIME_FREQUENCIES = {"real-time", "realtime", "instant"}
+DISABLED_FREQUENCIES = {"never", "none", "off"}
+
+
+class NotificationService:
+    """Queue alert notifications in the outbox"""
+
+    @staticmethod
+    def deliver_at(frequency: Optional[str], triggered_at: datetime) -> Optional[datetime]:
+        """When an alert triggered at triggered_at is due under a notification frequency"""
+        frequency = (frequency or "daily").lower()
+        if frequency in DISABLED_FREQUENCIES:
+            return None
+        if frequency in REALTIME_FREQUENCIES:
+            return triggered_at
+        midnight = triggered_at.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        if frequency == "weekly":
+            return midnight + timedelta(days=7 - midnight.weekday())
+        return midnight + timedelta(days=1)
+
+    @staticmethod
+    def channels_for(user_email: Optional[str]) -> List[str]:
+        channels = []
+        if settings.smtp_host and user_email:
+            channels.append("email")
+        return channels
+
+    @staticmethod
+    def enqueue_alerts(db: Session, alerts: List[dict]) -> int:
+        """
+        Write outbox rows for newly inserted alert rows in the caller's transaction
+        Returns count of rows queued; the caller commits
+        """
+        if not alerts:
+            return 0
+
+        users = {
+            user_id: (email, preferences)
+            for user_id, email, preferences in db.query(User.id, User.email, User.preferences).filter(
+                User.id.in_({alert["user_id"] for alert in alerts})
+            )
+        }
+
+        rows = []
+        for alert in alerts:
+            email, preferences = users.get(alert["user_id"], (None, None))
+            due_at = NotificationService.deliver_at(
+                (preferences or {}).get("notification_frequency"), alert["triggered_at"]
+            )
+            if due_at is None:
+                continue
+            for channel in NotificationService.channels_for(email):
+                rows.append({
+                    "id": uuid4(),
+                    "user_id": alert["user_id"],
+                    "alert_id": alert["id"],
+                    "channel": channel,
+                    "status": "pending",
+                    "attempts": 0,
+                    "next_attempt_at": due_at,
+                })
+
+        for offset in range(0, len(rows), 1000):
+            db.execute(NotificationOutbox.__table__.insert(), rows[offset:offset + 1000])
+        if rows:
+            emit_after_commit(db, NOTIFICATIONS_QUEUED, min(row["next_attempt_at"] for row in rows))
+
+        return len(rows)
+
+
+class NotificationWorker:
+    """Background task that drains the notification outbox"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._started_at = time.monotonic()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._last_pass: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(settings.notification_max_concurrency)
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def apply_notifications_queued(self, due_times: List[datetime]) -> None:
+        """Wake the worker when something was queued for delivery"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def metrics(self) -> dict:
+        """Delivery counters and throughput since the worker started"""
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            **self._counters,
+            "uptime_seconds": round(uptime, 1),
+            "alerts_per_second": round(self._counters["alerts_delivered"] / uptime, 4),
+            "last_pass": dict(self._last_pass),
+        }
+
+    # ---- worker loop ----
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            claimed = 0
+            try:
+                claimed = await self._process()
+            except Exception:
+                logger.exception("Notification pass failed")
+
+            if claimed >= settings.notification_batch_size:
+                # More may be due right now
+                continue
+
+            timeout = settings.notification_max_sleep_seconds
+            try:
+                async with AsyncSessionLocal() as db:
+                    next_due = await db.run_sync(NotificationWorker._next_due)
+                if next_due is not None:
+                    if next_due.tzinfo is None:
+                        next_due = next_due.replace(tzinfo=timezone.utc)
+                    delay = (next_due - datetime.now(timezone.utc)).total_seconds()
+                    timeout = min(timeout, max(delay, 0))
+            except Exception:
+                logger.exception("Notification schedule lookup failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self) -> int:
+        """Claim due rows, deliver one digest per user and channel, record outcomes"""
+        started = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            claimed, alerts, recipients = await db.run_sync(NotificationWorker._claim_due)
+            await db.commit()
+        if not claimed:
+            return 0
+
+        groups: Dict[Tuple[UUID, str], List[Tuple[UUID, UUID]]] = defaultdict(list)
+        for outbox_id, user_id, alert_id, channel in claimed:
+            groups[(user_id, channel)].append((outbox_id, alert_id))
+
+        results = await asyncio.gather(*[
+            self._deliver_group(user_id, channel, rows, alerts, recipients)
+            for (user_id, channel), rows in groups.items()
+        ])
+
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(NotificationWorker._record_results, results)
+            await db.commit()
+
+        self._counters["passes"] += 1
+        self._last_pass = {
+            "claimed": len(claimed),
+            "digests": len(groups),
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        return len(claimed)
+
+    async def _deliver_group(
+        self,
+        user_id: UUID,
+        channel: str,
+        rows: List[Tuple[UUID, UUID]],
+        alerts: Dict[UUID, dict],
+        recipients: Dict[UUID, dict]
+    ) -> Tuple[str, str, List[Tuple[UUID, UUID]], Optional[str]]:
+        """Deliver one digest; returns (outcome, channel, rows, error)"""
+        digest = [alerts[alert_id] for _, alert_id in rows if alert_id in alerts]
+        if not digest or channel != "email":
+            # Alerts were deleted before delivery, or the channel is no longer offered
+            return "cancelled", channel, rows, None
+
+        recipient = recipients.get(user_id, {})
+        async with self._semaphore:
+            try:
+                await asyncio.to_thread(NotificationWorker._send_email, recipient["email"], digest)
+            except Exception as e:
+                self._counters[f"{channel}_failures"] += 1
+                return "failed", channel, rows, f"{type(e).__name__}: {e}"
+
+        self._counters[f"{channel}_digests"] += 1
+        self._counters["alerts_delivered"] += len(digest)
+        return "sent", channel, rows, None
+
+    @staticmethod
+    def _send_email(to_address: str, digest: List[dict]) -> None:
+        message = EmailMessage()
+        message["From"] = settings.smtp_from
+        message["To"] = to_address
+        message["Subject"] = (
+            f"Cosmic Watch: {len(digest)} new asteroid alert{'s' if len(digest) != 1 else ''}"
+        )
+        message.set_content("\n".join(
+            f"- {alert['asteroid_name']}: {alert['triggered_reason']} (CRI {alert['cri_score_at_trigger']:.1f})"
+            for alert in digest
+        ))
+
+        with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=30) as smtp:
+            if settings.smtp_use_tls:
+                smtp.starttls()
+            if settings.smtp_username:
+                smtp.login(settings.smtp_username, settings.smtp_password)
+            smtp.send_message(message)
+
+    # ---- database steps (run via run_sync) ----
+
+    @staticmethod
+    def _next_due(db: Session) -> Optional[datetime]:
+        return db.query(func.min(NotificationOutbox.next_attempt_at)).filter(
+            NotificationOutbox.status == "pending"
+        ).scalar()
+
+    @staticmethod
+    def _claim_due(db: Session):
+        """
+        Lease a batch of due rows so other workers skip them, and load what delivery needs
+        Returns (claimed rows, alert payloads by id, recipients by user id)
+        """
+        now = datetime.now(timezone.utc)
+        rows = db.query(
+            NotificationOutbox.id,
+            NotificationOutbox.user_id,
+            NotificationOutbox.alert_id,
+            NotificationOutbox.channel
+        ).filter(
+            and_(
+                NotificationOutbox.status == "pending",
+                NotificationOutbox.next_attempt_at <= now
+            )
+        ).order_by(
+            NotificationOutbox.next_attempt_at
+        ).limit(
+            settings.notification_batch_size
+        ).with_for_update(skip_locked=True).all()
+        if not rows:
+            return [], {}, {}
+
+        db.execute(
+            update(NotificationOutbox).where(
+                NotificationOutbox.id.in_([row.id for row in rows])
+            ).values(
+                next_attempt_at=now + timedelta(seconds=settings.notification_lease_seconds)
+            )
+        )
+
+        alerts = {
+            alert.id: {
+                "id": str(alert.id),
+                "asteroid_id": str(alert.asteroid_id),
+                "asteroid_name": name,
+                "alert_type": alert.alert_type,
+                "triggered_reason": alert.triggered_reason,
+                "cri_score_at_trigger": alert.cri_score_at_trigger or 0,
+                "distance_at_trigger_km": alert.distance_at_trigger_km,
+                "triggered_at": alert.triggered_at.isoformat() if alert.triggered_at else None,
+            }
+            for alert, name in db.query(Alert, Asteroid.name).join(
+                Asteroid, Asteroid.id == Alert.asteroid_id
+            ).filter(Alert.id.in_({row.alert_id for row in rows}))
+        }
+        recipients = {
+            user_id: {"email": email, "preferences": preferences or {}}
+            for user_id, email, preferences in db.query(User.id, User.email, User.preferences).filter(
+                User.id.in_({row.user_id for row in rows})
+            )
+        }
+
+        return [tuple(row) for row in rows], alerts, recipients
+
+    @staticmethod
+    def _record_results(db: Session, results) -> None:
+        """Settle claimed rows: mark sent or cancelled, or schedule a retry with backoff"""
+        now = datetime.now(timezone.utc)
+        for outcome, channel, rows, error in results:
+            outbox_ids = [outbox_id for outbox_id, _ in rows]
+            if outcome in ("sent", "cancelled"):
+                db.execute(
+                    update(NotificationOutbox).where(
+                        NotificationOutbox.id.in_(outbox_ids)
+                    ).values(status=outcome, sent_at=now if outcome == "sent" else None)
+                )
+                if outcome == "sent":
+                    db.execute(
+                        update(Alert).where(
+                            Alert.id.in_([alert_id for _, alert_id in rows])
+                        ).values(is_notified=True, notification_method=channel)
+                    )
+                continue
+
+            for outbox in db.query(NotificationOutbox).filter(NotificationOutbox.id.in_(outbox_ids)):
+                outbox.attempts += 1
+                outbox.last_error = error
+                if outbox.attempts >= settings.notification_max_attempts:
+                    outbox.status = "failed"
+                else:
+                    delay = settings.notification_retry_base_seconds * 2 ** (outbox.attempts - 1)
+                    outbox.next_attempt_at = now + timedelta(seconds=delay)
+
+
+notification_worker = NotificationWorker()
+
+subscribe(NOTIFICATIONS_QUEUED, notification_worker.apply_notifications_queued)
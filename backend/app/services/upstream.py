@@ -0,0 +1,101 @@
+"""
+Upstream request coalescing and concurrency limits
+
+Every call to NASA or the completion API goes through the Upstream for that
+service. Concurrent calls with the same key (endpoint plus parameters) share
+one in-flight request and all receive its result or error, and at most
+max_concurrency requests per upstream run at once; the rest wait their turn
+instead of fanning out. State is kept per event loop, since the semaphore
+and in-flight tasks can only be awaited on the loop that created them.
+"""
+import asyncio
+import json
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable
+
+from app.core.config import settings
+
+
+def request_key(endpoint: str, params: Any) -> str:
+    """Single-flight key of an upstream call; parameters compare by value"""
+    return f"{endpoint} {json.dumps(params, sort_keys=True, default=str)}"
+
+
+class _LoopState:
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.flights: Dict[Hashable, asyncio.Task] = {}
+
+
+class Upstream:
+    """Single-flight and bounded concurrency for one upstream service"""
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.coalesced = 0
+        self.queued = 0
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._states.get(loop)
+            if state is None:
+                state = self._states[loop] = _LoopState(self.max_concurrency)
+            return state
+
+    @asynccontextmanager
+    async def limit(self) -> AsyncIterator[None]:
+        """Hold one of the upstream's request slots, waiting for a free one"""
+        semaphore = self._state().semaphore
+        if semaphore.locked():
+            self.queued += 1
+        async with semaphore:
+            yield
+
+    async def call(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn under the concurrency limit, or join the identical call already in flight
+        The request runs as its own task, so a caller that gives up does not cancel it for the others
+        """
+        state = self._state()
+        task = state.flights.get(key)
+        if task is None:
+            self.requests += 1
+            task = asyncio.ensure_future(self._run(fn))
+            state.flights[key] = task
+            task.add_done_callback(lambda done: Upstream._finish(state, key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _finish(state: _LoopState, key: Hashable, task: asyncio.Task) -> None:
+        state.flights.pop(key, None)
+        # Mark the outcome as seen even if every caller has gone
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        async with self.limit():
+            return await fn()
+
+    def stats(self) -> dict:
+        """Request, coalescing and queueing counters"""
+        in_flight = sum(len(state.flights) for state in list(self._states.values()))
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "queued": self.queued,
+            "in_flight": in_flight,
+        }
+
+
+nasa_upstream = Upstream("nasa", settings.nasa_max_concurrency)
+openai_upstream = Upstream("openai", settings.openai_max_concurrency)
@@ -0,0 +1,316 @@
+"""
+Watch rule service
+
+Watch rules match asteroids by criteria ("every hazardous object > 0.3 km
+within 0.05 AU") instead of by id. Each rule compiles to a predicate over
+indexed close approach and asteroid columns. After a sync, every active rule
+is evaluated against the synced approaches in one UNION ALL statement, and
+matches feed the regular alert pipeline as WATCH_RULE alerts. A rule's
+current matches are cached under its criteria until the shared catalog data
+generation changes (or a TTL passes), so a sync or a rule edit on any worker
+invalidates them everywhere.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import ApproachScored, data_generation
+from app.models.models import Asteroid, CloseApproach, WatchRule
+from app.schemas.schemas import (
+    AlertTypeEnum, WatchRuleMatch, WatchRuleMatchesResponse, WatchRuleRequest, WatchRuleResponse
+)
+from app.services.alert_service import AlertService
+from app.utils.cache import LRUCache
+
+# Kilometres per astronomical unit; AU limits compile to the indexed km column
+AU_KM = 149597870.7
+
+# (rule id, criteria) -> (data generation, matches, total count)
+rule_match_cache = LRUCache(
+    maxsize=settings.watch_rule_cache_size,
+    ttl_seconds=settings.watch_rule_cache_ttl_seconds
+)
+
+# Criteria columns, in the order of a rule's compiled signature
+RULE_CRITERIA = [
+    WatchRule.hazardous_only,
+    WatchRule.sentry_only,
+    WatchRule.min_diameter_km,
+    WatchRule.max_distance_km,
+    WatchRule.max_distance_au,
+    WatchRule.min_cri,
+    WatchRule.within_days,
+]
+
+
+class WatchRuleService:
+    """Handle criteria-based watch rules"""
+
+    @staticmethod
+    def _rule_response(rule: WatchRule) -> WatchRuleResponse:
+        return WatchRuleResponse(
+            id=str(rule.id),
+            name=rule.name,
+            hazardous_only=rule.hazardous_only,
+            sentry_only=rule.sentry_only,
+            min_diameter_km=rule.min_diameter_km,
+            max_distance_km=rule.max_distance_km,
+            max_distance_au=rule.max_distance_au,
+            min_cri=rule.min_cri,
+            within_days=rule.within_days,
+            is_active=rule.is_active,
+            created_at=rule.created_at,
+            updated_at=rule.updated_at
+        )
+
+    @staticmethod
+    def _get_rule(db: Session, user_id: str, rule_id: str) -> WatchRule:
+        try:
+            user_uuid = UUID(user_id)
+            rule_uuid = UUID(rule_id)
+        except ValueError:
+            raise ValueError("Invalid user or rule ID")
+
+        rule = db.query(WatchRule).filter(
+            WatchRule.id == rule_uuid,
+            WatchRule.user_id == user_uuid
+        ).first()
+        if not rule:
+            raise ValueError("Watch rule not found")
+        return rule
+
+    @staticmethod
+    def list_rules(db: Session, user_id: str) -> List[WatchRuleResponse]:
+        """All watch rules of a user, oldest first"""
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            raise ValueError("Invalid user ID")
+
+        rules = db.query(WatchRule).filter(
+            WatchRule.user_id == user_uuid
+        ).order_by(WatchRule.created_at, WatchRule.id).all()
+        return [WatchRuleService._rule_response(rule) for rule in rules]
+
+    @staticmethod
+    def create_rule(db: Session, user_id: str, request: WatchRuleRequest) -> WatchRuleResponse:
+        """Create a watch rule; it is evaluated from the next sync on"""
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            raise ValueError("Invalid user ID")
+
+        count = db.query(func.count(WatchRule.id)).filter(WatchRule.user_id == user_uuid).scalar()
+        if count >= settings.watch_rule_max_per_user:
+            raise ValueError(f"A user can have at most {settings.watch_rule_max_per_user} watch rules")
+
+        rule = WatchRule(user_id=user_uuid, **request.model_dump())
+        db.add(rule)
+        db.commit()
+        db.refresh(rule)
+        return WatchRuleService._rule_response(rule)
+
+    @staticmethod
+    def update_rule(db: Session, user_id: str, rule_id: str, request: WatchRuleRequest) -> WatchRuleResponse:
+        """Replace a watch rule's name and criteria"""
+        rule = WatchRuleService._get_rule(db, user_id, rule_id)
+        previous = WatchRuleService._cache_key(rule)
+        for field, value in request.model_dump().items():
+            setattr(rule, field, value)
+        rule.updated_at = datetime.now(timezone.utc)
+        db.commit()
+        db.refresh(rule)
+
+        rule_match_cache.delete(previous)
+        return WatchRuleService._rule_response(rule)
+
+    @staticmethod
+    def delete_rule(db: Session, user_id: str, rule_id: str) -> bool:
+        """Delete a watch rule; alerts it already raised are kept"""
+        rule = WatchRuleService._get_rule(db, user_id, rule_id)
+        key = WatchRuleService._cache_key(rule)
+        db.delete(rule)
+        db.commit()
+
+        rule_match_cache.delete(key)
+        return True
+
+    @staticmethod
+    def _cache_key(rule: WatchRule) -> Tuple:
+        """
+        Match cache key; the rule is read from the database on every lookup, so an
+        edit made on another worker misses the stale entry instead of serving it
+        """
+        return str(rule.id), WatchRuleService.criteria(rule)
+
+    # ---- compilation ----
+
+    @staticmethod
+    def criteria(rule) -> Tuple:
+        """
+        A rule's normalized criteria; rules with equal criteria share one compiled predicate
+        The AU limit folds into the km limit so both use idx_approach_distance_id
+        """
+        max_distance_km = rule.max_distance_km
+        if rule.max_distance_au is not None:
+            au_km = rule.max_distance_au * AU_KM
+            max_distance_km = au_km if max_distance_km is None else min(max_distance_km, au_km)
+        return (
+            bool(rule.hazardous_only),
+            bool(rule.sentry_only),
+            rule.min_diameter_km,
+            max_distance_km,
+            rule.min_cri,
+            rule.within_days,
+        )
+
+    @staticmethod
+    def compile_predicate(criteria: Tuple, now: datetime) -> list:
+        """WHERE conditions over close_approaches joined to asteroids for one set of criteria"""
+        hazardous_only, sentry_only, min_diameter_km, max_distance_km, min_cri, within_days = criteria
+
+        conditions = [CloseApproach.closest_approach_date > now]
+        if within_days is not None:
+            conditions.append(CloseApproach.closest_approach_date <= now + timedelta(days=within_days))
+        if hazardous_only:
+            conditions.append(Asteroid.is_hazardous == True)
+        if sentry_only:
+            conditions.append(Asteroid.is_sentry_object == True)
+        if min_diameter_km is not None:
+            conditions.append(Asteroid.diameter_km >= min_diameter_km)
+        if max_distance_km is not None:
+            conditions.append(CloseApproach.miss_distance_km <= max_distance_km)
+        if min_cri is not None:
+            conditions.append(CloseApproach.calculated_cri >= min_cri)
+        return conditions
+
+    # ---- evaluation ----
+
+    @staticmethod
+    def evaluate_rules(
+        db: Session,
+        changes: List[ApproachScored],
+        approach_chunk_size: int = 500,
+        branch_chunk_size: int = 50
+    ) -> Dict[str, int]:
+        """
+        Match every active rule against the synced approaches and raise WATCH_RULE alerts
+        Distinct criteria become UNION ALL branches over one CTE of the synced ids; the caller commits
+        """
+        approach_ids = list({UUID(change.approach_id) for change in changes})
+        if not approach_ids:
+            return {"rules": 0, "triggered": 0}
+
+        rules = db.query(WatchRule.id, WatchRule.user_id, WatchRule.name, *RULE_CRITERIA).filter(
+            WatchRule.is_active == True
+        ).all()
+        if not rules:
+            return {"rules": 0, "triggered": 0}
+
+        groups: Dict[Tuple, list] = {}
+        for rule in rules:
+            groups.setdefault(WatchRuleService.criteria(rule), []).append(rule)
+        signatures = list(groups)
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        seen = set()
+        for offset in range(0, len(approach_ids), approach_chunk_size):
+            synced = select(CloseApproach.id).where(
+                CloseApproach.id.in_(approach_ids[offset:offset + approach_chunk_size])
+            ).cte("synced_approaches")
+
+            for start in range(0, len(signatures), branch_chunk_size):
+                branches = [
+                    select(
+                        literal(index).label("rule_group"),
+                        CloseApproach.id,
+                        CloseApproach.asteroid_id,
+                        CloseApproach.miss_distance_km,
+                        CloseApproach.calculated_cri
+                    ).join(
+                        synced, synced.c.id == CloseApproach.id
+                    ).join(
+                        Asteroid, Asteroid.id == CloseApproach.asteroid_id
+                    ).where(
+                        *WatchRuleService.compile_predicate(signatures[index], now)
+                    )
+                    for index in range(start, min(start + branch_chunk_size, len(signatures)))
+                ]
+                stmt = union_all(*branches) if len(branches) > 1 else branches[0]
+
+                for rule_group, approach_id, asteroid_id, distance_km, cri in db.execute(stmt):
+                    for rule in groups[signatures[rule_group]]:
+                        # One WATCH_RULE alert per user and approach, whichever rule matched first
+                        if (rule.user_id, approach_id) in seen:
+                            continue
+                        seen.add((rule.user_id, approach_id))
+                        rows.append(AlertService.build_alert_row(
+                            rule.user_id, asteroid_id, approach_id, AlertTypeEnum.WATCH_RULE,
+                            f"Matches watch rule '{rule.name}'", cri, distance_km, now
+                        ))
+
+        inserted = AlertService.bulk_create_alerts(db, rows)
+        return {"rules": len(rules), "triggered": len(inserted)}
+
+    @staticmethod
+    def get_rule_matches(db: Session, user_id: str, rule_id: str) -> WatchRuleMatchesResponse:
+        """Upcoming approaches matching a rule, cached until the next data generation"""
+        rule = WatchRuleService._get_rule(db, user_id, rule_id)
+        key = WatchRuleService._cache_key(rule)
+        generation = data_generation.current
+
+        cached = rule_match_cache.get(key)
+        if cached is None or cached[0] != generation:
+            now = datetime.now(timezone.utc)
+            conditions = WatchRuleService.compile_predicate(WatchRuleService.criteria(rule), now)
+            base = select(CloseApproach.id).join(
+                Asteroid, Asteroid.id == CloseApproach.asteroid_id
+            ).where(*conditions)
+
+            total_count = db.scalar(select(func.count()).select_from(base.subquery()))
+            rows = db.query(CloseApproach, Asteroid).join(
+                Asteroid, Asteroid.id == CloseApproach.asteroid_id
+            ).filter(
+                *conditions
+            ).order_by(
+                CloseApproach.closest_approach_date, CloseApproach.id
+            ).limit(settings.watch_rule_match_limit).all()
+
+            matches = [
+                WatchRuleMatch(
+                    asteroid_id=str(asteroid.id),
+                    neo_id=asteroid.neo_id,
+                    name=asteroid.name,
+                    is_hazardous=bool(asteroid.is_hazardous),
+                    diameter_km=asteroid.diameter_km,
+                    approach_id=str(approach.id),
+                    closest_approach_date=approach.closest_approach_date,
+                    miss_distance_km=approach.miss_distance_km,
+                    miss_distance_au=approach.miss_distance_au,
+                    cri_score=approach.calculated_cri
+                )
+                for approach, asteroid in rows
+            ]
+            cached = (generation, matches, total_count)
+            rule_match_cache.set(key, cached)
+
+        _, matches, total_count = cached
+        # Approaches that passed since the matches were cached drop out
+        now = datetime.now(timezone.utc)
+        current = [m for m in matches if WatchRuleService._as_utc(m.closest_approach_date) > now]
+
+        return WatchRuleMatchesResponse(
+            rule_id=str(rule.id),
+            matches=current,
+            total_count=total_count - (len(matches) - len(current)),
+            data_generation=generation
+        )
+
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -1,22 +1,88 @@
 """
 Watchlist management service
 """
+import asyncio
+import csv
+import io
+import json
+import httpx
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select, update
 from datetime import datetime, timezone
-from typing import List
-from uuid import UUID
+from typing import Dict, List, Tuple
+from uuid import UUID, uuid4
 
-from app.models.models import Watchlist, User, Asteroid
+from app.core.config import settings
+from app.core.database import get_upsert_insert
+from app.core.events import WATCHLIST_CHANGED, ApproachScored, WatchlistChanged, emit_after_commit
+from app.models.models import Watchlist, User, Asteroid, CloseApproach
 from app.schemas.schemas import (
-    WatchlistAddRequest, WatchlistUpdateRequest, WatchlistItemResponse, WatchlistResponse
+    WatchlistAddRequest, WatchlistUpdateRequest, WatchlistItemResponse, WatchlistResponse,
+    WatchlistImportItem, WatchlistImportFailure, WatchlistImportResponse
 )
+from app.services.alert_service import AlertService
 from app.services.asteroid_service import AsteroidService
+from app.services.watch_rule_service import WatchRuleService
+
+# Watchlist sort options -> ORDER BY columns; missing approaches sort last
+WATCHLIST_SORTS = {
+    "added_desc": [Watchlist.created_at.desc()],
+    "added_asc": [Watchlist.created_at.asc()],
+    "risk_desc": [CloseApproach.calculated_cri.is_(None), CloseApproach.calculated_cri.desc()],
+    "risk_asc": [CloseApproach.calculated_cri.is_(None), CloseApproach.calculated_cri.asc()],
+    "date_asc": [CloseApproach.closest_approach_date.is_(None), CloseApproach.closest_approach_date.asc()],
+    "date_desc": [CloseApproach.closest_approach_date.is_(None), CloseApproach.closest_approach_date.desc()],
+}
 
 
 class WatchlistService:
     """Handle user watchlists"""
     
+    @staticmethod
+    def _change_event(action: str, item: Watchlist) -> WatchlistChanged:
+        """Post-commit event describing a watchlist change"""
+        return WatchlistChanged(
+            action=action,
+            user_id=str(item.user_id),
+            asteroid_id=str(item.asteroid_id),
+            watchlist_id=str(item.id),
+            alert_threshold_distance_km=item.alert_threshold_distance_km,
+            alert_threshold_cri=item.alert_threshold_cri
+        )
+    
+    @staticmethod
+    def _adjust_watcher_counts(db: Session, asteroid_ids: List[UUID], delta: int) -> None:
+        """Atomically shift asteroids' denormalized watcher counts inside the caller's transaction"""
+        if not asteroid_ids:
+            return
+        db.execute(
+            update(Asteroid).where(
+                Asteroid.id.in_(asteroid_ids)
+            ).values(
+                watcher_count=Asteroid.watcher_count + delta
+            ).execution_options(synchronize_session=False)
+        )
+    
+    @staticmethod
+    def reconcile_watcher_counts(db: Session) -> int:
+        """
+        Recount every asteroid's watchers in one UPDATE, touching only rows that drifted
+        Returns the number of corrected asteroids; the caller commits
+        """
+        actual = select(func.count(Watchlist.id)).where(
+            Watchlist.asteroid_id == Asteroid.id
+        ).scalar_subquery()
+        result = db.execute(
+            update(Asteroid).where(
+                Asteroid.watcher_count != actual
+            ).values(
+                watcher_count=actual
+            ).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
     @staticmethod
     def add_to_watchlist(
         db: Session,
@@ -60,6 +126,9 @@ class WatchlistService:
         )
         
         db.add(watchlist_item)
+        db.flush()
+        WatchlistService._adjust_watcher_counts(db, [asteroid_uuid], 1)
+        emit_after_commit(db, WATCHLIST_CHANGED, WatchlistService._change_event("added", watchlist_item))
         db.commit()
         db.refresh(watchlist_item)
         
@@ -74,6 +143,179 @@ class WatchlistService:
             created_at=watchlist_item.created_at
         )
     
+    @staticmethod
+    def parse_import(body: bytes, content_type: str) -> List[WatchlistImportItem]:
+        """
+        Parse a watchlist import body: CSV when the content type says so, JSON otherwise
+        JSON is a list (or {"items": [...]}) of entry objects or bare neo_id strings
+        """
+        try:
+            text = body.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError("Import body must be UTF-8 encoded")
+        
+        if "csv" in (content_type or "").lower():
+            reader = csv.DictReader(io.StringIO(text))
+            if not reader.fieldnames or "neo_id" not in reader.fieldnames:
+                raise ValueError("CSV import requires a neo_id column")
+            # Blank cells mean "no threshold"
+            rows = [{key: value for key, value in row.items() if value not in (None, "")} for row in reader]
+        else:
+            try:
+                payload = json.loads(text)
+            except json.JSONDecodeError:
+                raise ValueError("Import body must be a JSON array, or CSV sent as text/csv")
+            if isinstance(payload, dict):
+                payload = payload.get("items")
+            if not isinstance(payload, list):
+                raise ValueError('JSON import must be a list of entries or {"items": [...]}')
+            rows = [{"neo_id": str(row)} if isinstance(row, (str, int)) else row for row in payload]
+        
+        if not rows:
+            raise ValueError("Import contains no entries")
+        if len(rows) > settings.watchlist_import_max_items:
+            raise ValueError(f"Import is limited to {settings.watchlist_import_max_items} entries")
+        
+        items = []
+        for number, row in enumerate(rows, start=1):
+            try:
+                items.append(WatchlistImportItem.model_validate(row))
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"]) or "entry"
+                raise ValueError(f"Invalid entry {number} ({field}): {error['msg']}")
+        return items
+    
+    @staticmethod
+    async def import_watchlist(
+        db: AsyncSession,
+        user_id: str,
+        items: List[WatchlistImportItem]
+    ) -> WatchlistImportResponse:
+        """
+        Bulk add asteroids by neo_id
+        Known ids resolve with one IN query, unknown ones are fetched from NASA
+        concurrently, and all upserts and inserts commit in one transaction
+        """
+        try:
+            user_uuid = UUID(user_id)
+        except ValueError:
+            raise ValueError("Invalid user ID")
+        
+        # A repeated neo_id keeps its last entry
+        entries = {item.neo_id.strip(): item for item in items}
+        known = await db.run_sync(WatchlistService._resolve_neo_ids, list(entries))
+        
+        unknown = [neo_id for neo_id in entries if neo_id not in known]
+        fetched, failed = await WatchlistService._fetch_from_nasa(unknown)
+        
+        try:
+            imported, skipped, changes = await db.run_sync(
+                WatchlistService._apply_import, user_uuid, entries, known, fetched
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        
+        # Newly fetched approaches are checked against thresholds and watch rules
+        if changes:
+            await db.run_sync(AlertService.evaluate_scored_approaches, changes)
+            await db.run_sync(WatchRuleService.evaluate_rules, changes)
+            await db.commit()
+        
+        return WatchlistImportResponse(
+            imported=imported,
+            skipped=skipped,
+            fetched_from_nasa=len(fetched),
+            failed=failed
+        )
+    
+    @staticmethod
+    def _resolve_neo_ids(db: Session, neo_ids: List[str]) -> Dict[str, UUID]:
+        """Map neo_ids already in the database to asteroid ids with one IN query"""
+        rows = db.query(Asteroid.neo_id, Asteroid.id).filter(Asteroid.neo_id.in_(neo_ids)).all()
+        return {neo_id: asteroid_id for neo_id, asteroid_id in rows}
+    
+    @staticmethod
+    async def _fetch_from_nasa(neo_ids: List[str]) -> Tuple[Dict[str, dict], List[WatchlistImportFailure]]:
+        """Look up unknown neo_ids concurrently; the NASA upstream limit queues what does not fit"""
+        if not neo_ids:
+            return {}, []
+        
+        async def _fetch(neo_id: str):
+            try:
+                return neo_id, await AsteroidService.fetch_asteroid_from_nasa(neo_id), None
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code in (400, 404):
+                    return neo_id, None, "Unknown neo_id"
+                return neo_id, None, f"NASA lookup failed with status {e.response.status_code}"
+            except httpx.HTTPError as e:
+                return neo_id, None, f"NASA lookup failed: {e}"
+        
+        results = await asyncio.gather(*(_fetch(neo_id) for neo_id in neo_ids))
+        
+        fetched = {neo_id: data for neo_id, data, error in results if error is None}
+        failed = [
+            WatchlistImportFailure(neo_id=neo_id, error=error)
+            for neo_id, _, error in results if error is not None
+        ]
+        return fetched, failed
+    
+    @staticmethod
+    def _apply_import(
+        db: Session,
+        user_uuid: UUID,
+        entries: Dict[str, WatchlistImportItem],
+        known: Dict[str, UUID],
+        fetched: Dict[str, dict]
+    ) -> Tuple[int, int, List[ApproachScored]]:
+        """
+        Upsert fetched asteroids and insert watchlist rows, skipping ones already watched
+        Returns (imported, skipped, scoring changes); the caller commits
+        """
+        if db.query(User.id).filter(User.id == user_uuid).first() is None:
+            raise ValueError("User not found")
+        
+        asteroid_ids = dict(known)
+        changes = []
+        for neo_id, data in fetched.items():
+            asteroid, scored = AsteroidService._upsert_asteroid(db, data)
+            asteroid_ids[neo_id] = asteroid.id
+            changes.extend(scored)
+        
+        rows = []
+        seen = set()
+        for neo_id, item in entries.items():
+            asteroid_id = asteroid_ids.get(neo_id)
+            if asteroid_id is None or asteroid_id in seen:
+                continue
+            seen.add(asteroid_id)
+            rows.append({
+                "id": uuid4(),
+                "user_id": user_uuid,
+                "asteroid_id": asteroid_id,
+                "alert_threshold_distance_km": item.alert_threshold_distance_km,
+                "alert_threshold_cri": item.alert_threshold_cri,
+                "custom_notes": item.custom_notes,
+            })
+        if not rows:
+            return 0, 0, changes
+        
+        stmt = get_upsert_insert(db)(Watchlist).values(rows).on_conflict_do_nothing().returning(
+            Watchlist.id,
+            Watchlist.user_id,
+            Watchlist.asteroid_id,
+            Watchlist.alert_threshold_distance_km,
+            Watchlist.alert_threshold_cri
+        )
+        inserted = db.execute(stmt).all()
+        WatchlistService._adjust_watcher_counts(db, [item.asteroid_id for item in inserted], 1)
+        for item in inserted:
+            emit_after_commit(db, WATCHLIST_CHANGED, WatchlistService._change_event("added", item))
+        
+        return len(inserted), len(rows) - len(inserted), changes
+    
     @staticmethod
     def remove_from_watchlist(db: Session, user_id: str, asteroid_id: str) -> bool:
         """Remove asteroid from watchlist"""
@@ -93,42 +335,107 @@ class WatchlistService:
         if not watchlist_item:
             raise ValueError("Not in watchlist")
         
+        emit_after_commit(db, WATCHLIST_CHANGED, WatchlistService._change_event("removed", watchlist_item))
         db.delete(watchlist_item)
+        db.flush()
+        WatchlistService._adjust_watcher_counts(db, [asteroid_uuid], -1)
         db.commit()
         
         return True
     
     @staticmethod
-    def get_user_watchlist(db: Session, user_id: str) -> WatchlistResponse:
-        """Get all asteroids in user watchlist"""
+    def get_user_watchlist(
+        db: Session,
+        user_id: str,
+        page: int = 1,
+        limit: int = 50,
+        sort: str = "added_desc"
+    ) -> WatchlistResponse:
+        """
+        Get a page of the user's watchlist with a fixed number of queries:
+        a count, one page query joining each asteroid's next approach, and the bulk detail lookups
+        """
         try:
             user_uuid = UUID(user_id)
         except ValueError:
             raise ValueError("Invalid user ID")
         
-        items = db.query(Watchlist).filter(Watchlist.user_id == user_uuid).all()
+        if sort not in WATCHLIST_SORTS:
+            raise ValueError(f"Invalid sort; use one of {', '.join(WATCHLIST_SORTS)}")
+        
+        total_count = db.query(func.count(Watchlist.id)).filter(Watchlist.user_id == user_uuid).scalar()
+        
+        next_dates = select(
+            CloseApproach.asteroid_id,
+            func.min(CloseApproach.closest_approach_date).label("next_date")
+        ).where(
+            and_(
+                CloseApproach.closest_approach_date > datetime.now(timezone.utc),
+                CloseApproach.asteroid_id.in_(
+                    select(Watchlist.asteroid_id).where(Watchlist.user_id == user_uuid)
+                )
+            )
+        ).group_by(CloseApproach.asteroid_id).subquery()
+        
+        rows = db.query(Watchlist, Asteroid, CloseApproach).outerjoin(
+            Asteroid, Asteroid.id == Watchlist.asteroid_id
+        ).outerjoin(
+            next_dates, next_dates.c.asteroid_id == Watchlist.asteroid_id
+        ).outerjoin(
+            CloseApproach,
+            and_(
+                CloseApproach.asteroid_id == next_dates.c.asteroid_id,
+                CloseApproach.closest_approach_date == next_dates.c.next_date
+            )
+        ).filter(
+            Watchlist.user_id == user_uuid
+        ).order_by(
+            *WATCHLIST_SORTS[sort], Watchlist.id
+        ).offset((page - 1) * limit).limit(limit).all()
+        
+        pairs = [(asteroid, approach) for _, asteroid, approach in rows if asteroid is not None]
+        details = {}
+        detail_errors = {}
+        # Each attempt runs in a savepoint: a failed statement aborts the whole
+        # transaction on PostgreSQL, and the retries still need the session
+        try:
+            with db.begin_nested():
+                details = AsteroidService.build_asteroid_details(db, pairs)
+        except Exception:
+            # Rebuild one by one so a single bad asteroid only fails its own item
+            for asteroid, approach in pairs:
+                try:
+                    with db.begin_nested():
+                        details.update(AsteroidService.build_asteroid_details(db, [(asteroid, approach)]))
+                except Exception as e:
+                    detail_errors[asteroid.id] = f"Failed to load asteroid details: {e}"
         
         response_items = []
-        for item in items:
-            try:
-                asteroid_detail = AsteroidService.get_asteroid_detail(db, str(item.asteroid_id))
-                response_items.append(
-                    WatchlistItemResponse(
-                        id=str(item.id),
-                        asteroid=asteroid_detail,
-                        alert_threshold_distance_km=item.alert_threshold_distance_km,
-                        alert_threshold_cri=item.alert_threshold_cri,
-                        custom_notes=item.custom_notes,
-                        created_at=item.created_at
-                    )
+        for item, asteroid, _ in rows:
+            if asteroid is None:
+                error = "Asteroid not found"
+            elif asteroid.id not in details:
+                error = detail_errors.get(asteroid.id, "Failed to load asteroid details")
+            else:
+                error = None
+            response_items.append(
+                WatchlistItemResponse(
+                    id=str(item.id),
+                    asteroid=details.get(item.asteroid_id),
+                    alert_threshold_distance_km=item.alert_threshold_distance_km,
+                    alert_threshold_cri=item.alert_threshold_cri,
+                    custom_notes=item.custom_notes,
+                    created_at=item.created_at,
+                    error=error
                 )
-            except:
-                # Skip asteroids with issues
-                pass
+            )
         
         return WatchlistResponse(
             items=response_items,
-            total_count=len(response_items)
+            total_count=total_count,
+            page=page,
+            page_size=limit,
+            total_pages=max(1, (total_count + limit - 1) // limit)
         )
     
     @staticmethod
@@ -166,6 +473,7 @@ class WatchlistService:
         
         watchlist_item.updated_at = datetime.now(timezone.utc)
         
+        emit_after_commit(db, WATCHLIST_CHANGED, WatchlistService._change_event("updated", watchlist_item))
         db.commit()
         db.refresh(watchlist_item)
         
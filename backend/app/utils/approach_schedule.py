@@ -0,0 +1,142 @@
+"""
+Priority-queue schedule of time-based approach alerts
+
+Every upcoming close approach of a watched asteroid is pushed once per lead
+time (72h, 24h) keyed by the instant it crosses that lead, so the next alert
+due is always the heap root and the scheduler can sleep exactly until then.
+Re-dated approaches are pushed again and their stale entries skipped on pop.
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (alert type, lead time before the approach), loosest first
+APPROACH_LEADS = [
+    ("APPROACH_72H", timedelta(hours=72)),
+    ("APPROACH_24H", timedelta(hours=24)),
+]
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite returns naive datetimes; treat them as UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def crossed_lead(date: datetime, now: datetime) -> Optional[str]:
+    """Alert type of the tightest lead an upcoming approach has already crossed"""
+    date = _as_utc(date)
+    if date <= now:
+        return None
+    for alert_type, lead in reversed(APPROACH_LEADS):
+        if date - lead <= now:
+            return alert_type
+    return None
+
+
+class ApproachSchedule:
+    """Thread-safe min-heap of (fire_at, approach) for watched asteroids"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        # approach_id -> (asteroid_id, date) of scheduled approaches
+        self._approaches: Dict[str, Tuple[str, datetime]] = {}
+        # min-heap of (fire_at, approach_id, alert_type, date); stale entries dropped lazily,
+        # and an alert_type of None expires the approach once it has passed
+        self._heap: List[Tuple[datetime, str, str, datetime]] = []
+        # asteroid_id -> number of watchers
+        self._watched: Dict[str, int] = {}
+
+    def load(
+        self,
+        watched: Iterable[Tuple[str, int]],
+        approaches: Iterable[Tuple[str, str, datetime]]
+    ) -> None:
+        """Replace state from (asteroid_id, watchers) and (approach_id, asteroid_id, date) rows"""
+        with self._lock:
+            self.reset()
+            self._watched = {asteroid_id: count for asteroid_id, count in watched if count}
+            now = datetime.now(timezone.utc)
+            for approach_id, asteroid_id, date in approaches:
+                self._upsert(approach_id, asteroid_id, _as_utc(date), now)
+
+    def watch(self, asteroid_id: str) -> bool:
+        """Count a new watcher; returns True if the asteroid was not watched before"""
+        with self._lock:
+            self._watched[asteroid_id] = self._watched.get(asteroid_id, 0) + 1
+            return self._watched[asteroid_id] == 1
+
+    def unwatch(self, asteroid_id: str) -> None:
+        """Drop a watcher; approaches of unwatched asteroids are skipped when due"""
+        with self._lock:
+            remaining = self._watched.get(asteroid_id, 0) - 1
+            if remaining > 0:
+                self._watched[asteroid_id] = remaining
+            else:
+                self._watched.pop(asteroid_id, None)
+
+    def is_watched(self, asteroid_id: str) -> bool:
+        with self._lock:
+            return asteroid_id in self._watched
+
+    def upsert_many(self, approaches: Iterable[Tuple[str, str, datetime]]) -> Optional[datetime]:
+        """
+        Schedule (approach_id, asteroid_id, date) rows of watched asteroids
+        Returns the new earliest fire time if it moved earlier, else None
+        """
+        with self._lock:
+            before = self._heap[0][0] if self._heap else None
+            now = datetime.now(timezone.utc)
+            for approach_id, asteroid_id, date in approaches:
+                if asteroid_id in self._watched:
+                    self._upsert(approach_id, asteroid_id, _as_utc(date), now)
+            after = self._heap[0][0] if self._heap else None
+            if after is not None and (before is None or after < before):
+                return after
+            return None
+
+    def next_fire_at(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[Tuple[str, str, str, datetime]]:
+        """Remove and return (approach_id, asteroid_id, alert_type, date) entries due by now"""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, approach_id, alert_type, date = heapq.heappop(self._heap)
+                current = self._approaches.get(approach_id)
+                if current is None or current[1] != date:
+                    continue
+                if alert_type is None:
+                    # Approach has passed; forget it
+                    del self._approaches[approach_id]
+                    continue
+                asteroid_id = current[0]
+                if asteroid_id in self._watched and date > now:
+                    due.append((approach_id, asteroid_id, alert_type, date))
+        return due
+
+    def __len__(self) -> int:
+        return len(self._approaches)
+
+    # ---- internals (caller holds the lock) ----
+
+    def _upsert(self, approach_id: str, asteroid_id: str, date: datetime, now: datetime) -> None:
+        if date <= now:
+            self._approaches.pop(approach_id, None)
+            return
+        previous = self._approaches.get(approach_id)
+        if previous is not None and previous[1] == date:
+            return
+        self._approaches[approach_id] = (asteroid_id, date)
+        for index, (alert_type, lead) in enumerate(APPROACH_LEADS):
+            # Skip a looser lead once a tighter one has also been crossed
+            tighter = APPROACH_LEADS[index + 1][1] if index + 1 < len(APPROACH_LEADS) else None
+            if tighter is not None and date - tighter <= now:
+                continue
+            heapq.heappush(self._heap, (date - lead, approach_id, alert_type, date))
+        heapq.heappush(self._heap, (date, approach_id, None, date))
@@ -0,0 +1,118 @@
+"""
+In-memory asteroid name index
+
+Maps normalized name phrases to asteroid ids so entity mentions in free text
+("when is Apophis closest?", "tell me about 2004 MN4") resolve without a
+LIKE scan. Each asteroid is indexed under its full name, its proper name,
+its provisional designation and its distinctive name words; a phrase shared
+by several asteroids is ambiguous and only resolves through a longer phrase.
+"""
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Name words too common to identify an asteroid on their own
+STOP_WORDS = {"the", "and", "asteroid", "test", "nasa", "minor", "planet", "comet"}
+
+# Longest phrase, in words, tried when scanning text
+MAX_PHRASE_WORDS = 4
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_PARENTHESIZED = re.compile(r"\(([^)]*)\)")
+
+
+def normalize(text: str) -> str:
+    """Lowercase words separated by single spaces"""
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def name_keys(name: str) -> Set[str]:
+    """Every phrase an asteroid name is indexed under"""
+    keys = set()
+    full = normalize(name)
+    if full:
+        keys.add(full)
+    # "99942 Apophis (2004 MN4)": proper name outside, designation inside the parentheses
+    outside = normalize(_PARENTHESIZED.sub(" ", name))
+    designations = [normalize(part) for part in _PARENTHESIZED.findall(name)]
+    for phrase in [outside, *designations]:
+        # A bare number is too easily confused with counts and dates in a question
+        if phrase and not phrase.isdigit():
+            keys.add(phrase)
+    for word in outside.split():
+        if len(word) >= 3 and word.isalpha() and word not in STOP_WORDS:
+            keys.add(word)
+    return keys
+
+
+class AsteroidNameIndex:
+    """Thread-safe phrase -> asteroid id index"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, Set[str]] = {}
+        self._names: Dict[str, str] = {}
+
+    def load(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """Replace the index from (asteroid_id, name) rows"""
+        with self._lock:
+            self._ids = {}
+            self._names = {}
+            for asteroid_id, name in rows:
+                self._add(asteroid_id, name)
+
+    def add_many(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """Index new or renamed asteroids"""
+        with self._lock:
+            for asteroid_id, name in rows:
+                if self._names.get(asteroid_id) != name:
+                    self._add(asteroid_id, name)
+
+    def _add(self, asteroid_id: str, name: str) -> None:
+        previous = self._names.get(asteroid_id)
+        if previous is not None:
+            for key in name_keys(previous):
+                ids = self._ids.get(key)
+                if ids is not None:
+                    ids.discard(asteroid_id)
+                    if not ids:
+                        del self._ids[key]
+        self._names[asteroid_id] = name
+        for key in name_keys(name):
+            self._ids.setdefault(key, set()).add(asteroid_id)
+
+    def resolve(self, phrase: str) -> Optional[Tuple[str, str]]:
+        """(asteroid_id, name) for a phrase that names exactly one asteroid"""
+        with self._lock:
+            ids = self._ids.get(normalize(phrase))
+            if not ids or len(ids) != 1:
+                return None
+            asteroid_id = next(iter(ids))
+            return asteroid_id, self._names[asteroid_id]
+
+    def find(self, text: str, limit: int = 3) -> List[Tuple[str, str]]:
+        """
+        Asteroids mentioned in text, longest phrases first, in order of mention
+        Returns up to limit (asteroid_id, name) pairs
+        """
+        words = normalize(text).split()
+        used = [False] * len(words)
+        found: List[Tuple[int, str]] = []
+        with self._lock:
+            for size in range(min(MAX_PHRASE_WORDS, len(words)), 0, -1):
+                for start in range(len(words) - size + 1):
+                    if any(used[start:start + size]):
+                        continue
+                    ids = self._ids.get(" ".join(words[start:start + size]))
+                    if not ids or len(ids) != 1:
+                        continue
+                    asteroid_id = next(iter(ids))
+                    if any(asteroid_id == seen for _, seen in found):
+                        continue
+                    found.append((start, asteroid_id))
+                    used[start:start + size] = [True] * size
+            found.sort()
+            return [(asteroid_id, self._names[asteroid_id]) for _, asteroid_id in found[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -0,0 +1,37 @@
+"""
+Keyset (cursor) pagination helpers
+
+A cursor is an opaque token holding the sort value and id of the last row
+of a page; the next page starts strictly after that (value, id) pair.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    """Encode the last row's (sort value, id) into an opaque cursor"""
+    is_datetime = isinstance(sort_value, datetime)
+    payload = {
+        "v": sort_value.isoformat() if is_datetime else sort_value,
+        "dt": is_datetime,
+        "id": str(row_id),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, str]]:
+    """Decode a cursor back into (sort value, id); raises ValueError if malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["v"]
+        if payload.get("dt"):
+            value = datetime.fromisoformat(value)
+        return value, payload["id"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
@@ -0,0 +1,107 @@
+"""
+Incrementally maintained CRI distribution
+
+Risk-level buckets are plain counters. Median and other quantiles come from a
+fixed-resolution histogram over the 0-100 CRI range (0.1 wide bins), which is
+a mergeable quantile sketch that also supports removals, so re-scored
+approaches can move between bins. Quantiles are exact to within half a bin.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Lower bounds of the risk-level bands used by get_risk_level()
+BUCKET_BOUNDS = [(0, 20), (21, 40), (41, 60), (61, 80), (81, 100)]
+
+SKETCH_RESOLUTION = 10  # bins per CRI point
+SKETCH_BINS = 100 * SKETCH_RESOLUTION + 1
+MAX_EXAMPLES = 3
+
+
+def bucket_index(cri: float) -> int:
+    """Index of the risk-level bucket holding a CRI score"""
+    for i in range(len(BUCKET_BOUNDS) - 1, 0, -1):
+        if cri >= BUCKET_BOUNDS[i][0]:
+            return i
+    return 0
+
+
+def sketch_bin(cri: float) -> int:
+    """Sketch bin holding a CRI score"""
+    return min(SKETCH_BINS - 1, max(0, int(cri * SKETCH_RESOLUTION)))
+
+
+class RiskHistogram:
+    """Thread-safe CRI histogram with bucket counters and a quantile sketch"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.bins = [0] * SKETCH_BINS
+        self.bucket_counts = [0] * len(BUCKET_BOUNDS)
+        self.examples: List["OrderedDict[str, str]"] = [OrderedDict() for _ in BUCKET_BOUNDS]
+        self.total = 0
+        self.total_cri = 0.0
+
+    def load(
+        self,
+        bins: Iterable[Tuple[int, int, float]],
+        examples: Dict[int, List[Tuple[str, str]]]
+    ) -> None:
+        """Replace state from (sketch bin, count, CRI sum) aggregates and bucket examples"""
+        with self._lock:
+            self.reset()
+            for index, count, cri_sum in bins:
+                index = min(SKETCH_BINS - 1, max(0, int(index)))
+                self.bins[index] += count
+                self.bucket_counts[bucket_index(index / SKETCH_RESOLUTION)] += count
+                self.total += count
+                self.total_cri += cri_sum or 0.0
+            for bucket, items in examples.items():
+                for key, name in items[:MAX_EXAMPLES]:
+                    self.examples[bucket][key] = name
+
+    def update(self, key: str, name: Optional[str], old_cri: Optional[float], new_cri: Optional[float]) -> None:
+        """Move one scored item from its old CRI (None if new) to its new CRI (None if removed)"""
+        with self._lock:
+            if old_cri is not None:
+                self.bins[sketch_bin(old_cri)] -= 1
+                bucket = bucket_index(old_cri)
+                self.bucket_counts[bucket] -= 1
+                self.examples[bucket].pop(key, None)
+                self.total -= 1
+                self.total_cri -= old_cri
+            if new_cri is not None:
+                self.bins[sketch_bin(new_cri)] += 1
+                bucket = bucket_index(new_cri)
+                self.bucket_counts[bucket] += 1
+                if name and len(self.examples[bucket]) < MAX_EXAMPLES:
+                    self.examples[bucket][key] = name
+                self.total += 1
+                self.total_cri += new_cri
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile (0-1) of the CRI distribution"""
+        with self._lock:
+            if self.total <= 0:
+                return 0.0
+            target = q * (self.total - 1)
+            seen = 0
+            for index, count in enumerate(self.bins):
+                seen += count
+                if count and seen > target:
+                    # Report the bin centre, clamped to the CRI range
+                    return min(100.0, (index + 0.5) / SKETCH_RESOLUTION)
+            return 100.0
+
+    def snapshot(self) -> dict:
+        """Consistent copy of the counters"""
+        with self._lock:
+            return {
+                "total": self.total,
+                "average": self.total_cri / self.total if self.total > 0 else 0.0,
+                "bucket_counts": list(self.bucket_counts),
+                "examples": [list(names.values()) for names in self.examples],
+            }
@@ -0,0 +1,26 @@
+"""
+Prompt token estimates
+
+Chat prompts are sized against a token budget before they are sent. The
+estimate follows the usual rule of thumb for English text with GPT
+tokenizers, about four characters per token, plus the fixed per-message
+overhead of the chat format, and errs on the high side.
+"""
+from typing import Iterable
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and delimiters around each chat message
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a piece of text"""
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def message_tokens(message: dict) -> int:
+    """Approximate tokens a chat message adds to a prompt"""
+    return estimate_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def prompt_tokens(messages: Iterable[dict]) -> int:
+    return sum(message_tokens(message) for message in messages)
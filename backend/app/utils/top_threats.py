@@ -0,0 +1,187 @@
+"""
+Heap-maintained top threats leaderboard
+
+Each asteroid's threat is the CRI of its next upcoming close approach.
+Per-asteroid min-heaps of future approaches give the next approach, and a
+global schedule heap rolls asteroids forward once their next approach has
+passed. The leaderboard is a bounded min-heap of the best asteroids (max_k
+plus slack) with lazy deletion: every member outranks every asteroid left
+out, so a change costs O(log K), and all asteroids are only rescanned once
+enough members have dropped out that fewer than max_k remain.
+"""
+import heapq
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (cri, asteroid_id, date, approach_id); the first two fields rank entries
+Entry = Tuple[float, str, datetime, str]
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite returns naive datetimes; treat them as UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class TopThreatsTracker:
+    """Thread-safe top-K of asteroids by next-approach CRI"""
+
+    def __init__(self, max_k: int = 100, slack: Optional[int] = None):
+        self.max_k = max_k
+        # Extra members absorb drop-outs before a rescan is needed
+        self.capacity = max_k + (max_k if slack is None else slack)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        # approach_id -> (asteroid_id, date, cri), future approaches only
+        self._approaches: Dict[str, Tuple[str, datetime, float]] = {}
+        # asteroid_id -> min-heap of (date, approach_id); stale entries dropped lazily
+        self._future: Dict[str, List[Tuple[datetime, str]]] = {}
+        # asteroid_id -> (date, approach_id, cri) of its current next approach
+        self._next: Dict[str, Tuple[datetime, str, float]] = {}
+        # min-heap of (date, asteroid_id, approach_id) for roll-forward, one live entry per asteroid
+        self._schedule: List[Tuple[datetime, str, str]] = []
+        self._names: Dict[str, str] = {}
+        # Bounded leaderboard: min-heap of entries; those not in _members are stale
+        self._heap: List[Entry] = []
+        self._members: Dict[str, Entry] = {}
+        # Rank of the best asteroid outside the leaderboard (an upper bound); None if all are members
+        self._floor: Optional[Tuple[float, str]] = None
+        self._top: Optional[List[Entry]] = []
+        self.calculated_at = datetime.now(timezone.utc)
+
+    def load(self, rows: Iterable[Tuple[str, str, str, datetime, Optional[float]]]) -> None:
+        """Replace state from (approach_id, asteroid_id, name, date, cri) rows of future approaches"""
+        with self._lock:
+            self.reset()
+            now = datetime.now(timezone.utc)
+            for approach_id, asteroid_id, name, date, cri in rows:
+                self._upsert(approach_id, asteroid_id, name, _as_utc(date), cri, now)
+            for asteroid_id in list(self._future):
+                self._refresh_next(asteroid_id, now)
+            self._settle()
+
+    def update_many(self, changes: Iterable[Tuple[str, str, str, datetime, Optional[float]]]) -> None:
+        """Apply (approach_id, asteroid_id, name, date, cri) changes from ingestion"""
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            touched = set()
+            for approach_id, asteroid_id, name, date, cri in changes:
+                self._upsert(approach_id, asteroid_id, name, _as_utc(date), cri, now)
+                touched.add(asteroid_id)
+            for asteroid_id in touched:
+                self._refresh_next(asteroid_id, now)
+            self._settle()
+
+    def top(self, k: int) -> Tuple[List[Tuple[float, str, str, datetime]], datetime]:
+        """Top k as (cri, asteroid_id, name, next_approach_date), plus when the list was computed"""
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            if self._schedule and self._schedule[0][0] <= now:
+                self._roll_forward(now)
+            if self._top is None:
+                self._top = sorted(self._members.values(), reverse=True)[:self.max_k]
+            return (
+                [(cri, asteroid_id, self._names.get(asteroid_id, ""), date) for cri, asteroid_id, date, _ in self._top[:k]],
+                self.calculated_at
+            )
+
+    # ---- internals (caller holds the lock) ----
+
+    def _upsert(self, approach_id, asteroid_id, name, date, cri, now) -> None:
+        if name:
+            self._names[asteroid_id] = name
+        if date <= now or cri is None:
+            self._approaches.pop(approach_id, None)
+            return
+        previous = self._approaches.get(approach_id)
+        self._approaches[approach_id] = (asteroid_id, date, cri)
+        if previous is None or previous[1] != date:
+            heapq.heappush(self._future.setdefault(asteroid_id, []), (date, approach_id))
+
+    def _refresh_next(self, asteroid_id: str, now: datetime) -> None:
+        """Recompute an asteroid's next approach and move it on the leaderboard if it changed"""
+        heap = self._future.get(asteroid_id, [])
+        while heap:
+            date, approach_id = heap[0]
+            current = self._approaches.get(approach_id)
+            if current and current[1] == date and date > now:
+                break
+            heapq.heappop(heap)
+            if current and current[1] <= now:
+                del self._approaches[approach_id]
+
+        previous = self._next.get(asteroid_id)
+        if not heap:
+            self._future.pop(asteroid_id, None)
+            if self._next.pop(asteroid_id, None) is not None:
+                self._place(asteroid_id, None)
+            return
+
+        date, approach_id = heap[0]
+        entry = (date, approach_id, self._approaches[approach_id][2])
+        if entry == previous:
+            return
+        self._next[asteroid_id] = entry
+        # A CRI-only change keeps the asteroid's slot in the schedule
+        if previous is None or previous[:2] != entry[:2]:
+            heapq.heappush(self._schedule, (date, asteroid_id, approach_id))
+        self._place(asteroid_id, entry)
+
+    def _place(self, asteroid_id: str, entry: Optional[Tuple[datetime, str, float]]) -> None:
+        """Update an asteroid's leaderboard membership after its next approach changed"""
+        if self._members.pop(asteroid_id, None) is not None:
+            self._changed()
+        if entry is None:
+            return
+        date, approach_id, cri = entry
+        if self._floor is not None and (cri, asteroid_id) < self._floor:
+            # Something outside may outrank it; it stays out until the next rescan
+            return
+        item = (cri, asteroid_id, date, approach_id)
+        self._members[asteroid_id] = item
+        heapq.heappush(self._heap, item)
+        if len(self._members) > self.capacity:
+            evicted = self._pop_lowest()
+            self._floor = evicted[:2] if self._floor is None else max(self._floor, evicted[:2])
+        self._changed()
+
+    def _pop_lowest(self) -> Entry:
+        while True:
+            item = heapq.heappop(self._heap)
+            if self._members.get(item[1]) == item:
+                del self._members[item[1]]
+                return item
+
+    def _settle(self) -> None:
+        """Rescan once too few members are left to answer top(max_k), and drop stale heap entries"""
+        if len(self._members) < self.max_k and len(self._next) > len(self._members):
+            ranked = heapq.nlargest(
+                self.capacity + 1,
+                ((cri, asteroid_id, date, approach_id) for asteroid_id, (date, approach_id, cri) in self._next.items())
+            )
+            self._members = {item[1]: item for item in ranked[:self.capacity]}
+            self._heap = list(self._members.values())
+            heapq.heapify(self._heap)
+            self._floor = ranked[self.capacity][:2] if len(ranked) > self.capacity else None
+            self._changed()
+        elif len(self._heap) > 2 * self.capacity:
+            self._heap = list(self._members.values())
+            heapq.heapify(self._heap)
+        if len(self._schedule) > 2 * len(self._next) + self.capacity:
+            self._schedule = [(date, asteroid_id, approach_id) for asteroid_id, (date, approach_id, _) in self._next.items()]
+            heapq.heapify(self._schedule)
+
+    def _changed(self) -> None:
+        self._top = None
+        self.calculated_at = datetime.now(timezone.utc)
+
+    def _roll_forward(self, now: datetime) -> None:
+        """Advance asteroids whose next approach has passed"""
+        while self._schedule and self._schedule[0][0] <= now:
+            date, asteroid_id, approach_id = heapq.heappop(self._schedule)
+            current = self._next.get(asteroid_id)
+            if current and current[1] == approach_id:
+                self._refresh_next(asteroid_id, now)
+        self._settle()
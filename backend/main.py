@@ -19,8 +19,8 @@ from fastapi.responses import JSONResponse
 from datetime import datetime
 
 from app.core.config import settings
-from app.core.database import init_db, Base, engine, SessionLocal
-from app.routes import auth, asteroids, watchlist, alerts, chat
+from app.core.database import init_db, Base, engine, async_engine, SessionLocal
+from app.routes import auth, asteroids, watchlist, watch_rules, alerts, chat, analytics
 
 # Initialize database tables
 init_db()
@@ -86,8 +86,69 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(asteroids.router)
 app.include_router(watchlist.router)
+app.include_router(watch_rules.router)
 app.include_router(alerts.router)
 app.include_router(chat.router)
+app.include_router(analytics.router)
+
+# ============ LIFECYCLE ============
+
+@app.on_event("startup")
+def startup():
+    """Seed in-memory analytics, the approach alert schedule and chatbot lookups"""
+    from app.services.analytics_service import AnalyticsService
+    from app.services.alert_scheduler import alert_scheduler
+    from app.services.chat_stats import chat_stats
+    from app.services.chat_intents import ChatIntentService
+    from app.core.events import data_generation
+    
+    db = SessionLocal()
+    try:
+        # Before anything that records the generation it was built at
+        data_generation.sync(db)
+        AnalyticsService.rebuild(db)
+        alert_scheduler.rebuild(db)
+        chat_stats.refresh(db)
+        ChatIntentService.rebuild_name_index(db)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start the approach alert scheduler, the alert stream publisher, the notification worker, the catalog refresher and the chat helpers"""
+    from app.services.alert_scheduler import alert_scheduler
+    from app.services.alert_stream import alert_stream_hub
+    from app.services.notification_service import notification_worker
+    from app.services.catalog_refresher import catalog_refresher
+    from app.services.chat_stats import chat_stats
+    from app.services.conversation_summarizer import conversation_summarizer
+    
+    await alert_scheduler.start()
+    await alert_stream_hub.start()
+    await notification_worker.start()
+    await catalog_refresher.start()
+    await chat_stats.start()
+    await conversation_summarizer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks and release pooled async DB connections"""
+    from app.services.alert_scheduler import alert_scheduler
+    from app.services.alert_stream import alert_stream_hub
+    from app.services.notification_service import notification_worker
+    from app.services.catalog_refresher import catalog_refresher
+    from app.services.chat_stats import chat_stats
+    from app.services.conversation_summarizer import conversation_summarizer
+    
+    await conversation_summarizer.stop()
+    await chat_stats.stop()
+    await catalog_refresher.stop()
+    await notification_worker.stop()
+    await alert_stream_hub.stop()
+    await alert_scheduler.stop()
+    await async_engine.dispose()
 
 # ============ HEALTH CHECK ============
 
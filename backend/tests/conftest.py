@@ -0,0 +1,118 @@
+"""
+Shared fixtures for the backend tests
+
+The app reads its settings when it is first imported, so the environment is
+prepared here before anything from the app is loaded: a throwaway SQLite
+database unless DATABASE_URL is already set (CI runs against PostgreSQL), and
+a stub OpenAI-compatible completion server that the chatbot is pointed at.
+"""
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import pytest
+
+
+class StubCompletions:
+    """
+    What the stub completion server answers with; tests adjust it per case
+    The reply is streamed as one chunk per entry of `words`
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.status = 200
+        self.words: List[str] = ["Apophis ", "passes ", "close ", "in ", "2029."]
+        self.requests: List[dict] = []
+
+
+stub_completions = StubCompletions()
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        stub_completions.requests.append(body)
+        if self.path != "/v1/chat/completions" or stub_completions.status != 200:
+            self._send_json(stub_completions.status if self.path == "/v1/chat/completions" else 404, {"error": "stub"})
+            return
+        if not body.get("stream"):
+            self._send_json(200, {"choices": [{"message": {"content": "".join(stub_completions.words)}}]})
+            return
+
+        # No Content-Length: the stream ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunks = [{"choices": [{"delta": {"role": "assistant"}}]}]
+        chunks += [{"choices": [{"delta": {"content": word}}]} for word in stub_completions.words]
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_stub_server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+_stub_server.daemon_threads = True
+threading.Thread(target=_stub_server.serve_forever, daemon=True).start()
+
+os.environ["OPENAI_API_KEY"] = "test-key"
+os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{_stub_server.server_address[1]}/v1"
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/cosmic_watch_test.db"
+
+    # The models use PostgreSQL UUID columns; store them as hex strings on SQLite
+    from sqlalchemy.dialects.postgresql import UUID
+    from sqlalchemy.ext.compiler import compiles
+
+    @compiles(UUID, "sqlite")
+    def _compile_uuid_sqlite(type_, compiler, **kw):
+        return "CHAR(32)"
+
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # The trusted host middleware rejects the default "testserver" host
+    with TestClient(app, base_url="http://localhost") as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    response = client.post("/auth/login", json={"email": "demo@cosmicwatch.io", "password": "Demo@12345"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def completions():
+    """The stub completion server, reset around each test"""
+    from app.services.chatbot_service import response_cache
+
+    stub_completions.reset()
+    response_cache.clear()
+    yield stub_completions
+    stub_completions.reset()
@@ -0,0 +1,72 @@
+"""
+Threshold alert evaluation after a sync
+"""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.core.database import SessionLocal
+from app.core.events import ApproachScored
+from app.models.models import Alert, Asteroid, CloseApproach, User
+from app.schemas.schemas import WatchlistAddRequest
+from app.services.alert_service import AlertService
+from app.services.watchlist_service import WatchlistService
+
+
+def scored(approach: CloseApproach, name: str) -> ApproachScored:
+    return ApproachScored(
+        approach_id=str(approach.id),
+        asteroid_id=str(approach.asteroid_id),
+        asteroid_name=name,
+        closest_approach_date=approach.closest_approach_date,
+        miss_distance_km=approach.miss_distance_km,
+        old_cri=None,
+        new_cri=approach.calculated_cri
+    )
+
+
+def new_asteroid(db) -> CloseApproach:
+    asteroid = Asteroid(neo_id=uuid4().hex[:12], name=f"Test {uuid4().hex[:6]}")
+    db.add(asteroid)
+    db.flush()
+    approach = CloseApproach(
+        asteroid_id=asteroid.id,
+        closest_approach_date=datetime.now(timezone.utc) + timedelta(days=5),
+        miss_distance_km=2e6,
+        calculated_cri=70.0
+    )
+    db.add(approach)
+    db.commit()
+    return approach
+
+
+def test_scored_approaches_alert_watchers_over_threshold(client):
+    db = SessionLocal()
+    try:
+        user = User(email=f"{uuid4().hex[:12]}@example.com", username=uuid4().hex[:12], password_hash="unused")
+        db.add(user)
+        db.commit()
+        watched = new_asteroid(db)
+        WatchlistService.add_to_watchlist(
+            db, str(user.id), WatchlistAddRequest(asteroid_id=str(watched.asteroid_id), alert_threshold_cri=50.0)
+        )
+
+        result = AlertService.evaluate_scored_approaches(db, [scored(watched, "watched")])
+        db.commit()
+
+        assert result == {"evaluated": 1, "triggered": 1}
+        alert = db.query(Alert).filter(Alert.user_id == user.id).one()
+        assert alert.close_approach_id == watched.id
+    finally:
+        db.close()
+
+
+def test_unwatched_asteroids_are_skipped(client):
+    db = SessionLocal()
+    try:
+        unwatched = new_asteroid(db)
+
+        result = AlertService.evaluate_scored_approaches(db, [scored(unwatched, "unwatched")])
+
+        assert result == {"evaluated": 0, "triggered": 0}
+    finally:
+        db.close()
@@ -0,0 +1,81 @@
+"""
+Analytics caches and in-memory views
+"""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.models.models import Asteroid, CloseApproach, User, Watchlist
+from app.services.analytics_service import AnalyticsService, risk_histogram
+from app.utils.risk_histogram import sketch_bin
+
+
+def test_activity_summary_follows_the_shared_user_version(client):
+    db = SessionLocal()
+    try:
+        user = User(email=f"{uuid4().hex[:12]}@example.com", username=uuid4().hex[:12], password_hash="unused")
+        db.add(user)
+        db.commit()
+        user_id = str(user.id)
+        assert AnalyticsService.get_user_activity(db, user_id).total_watchlist_items == 0
+
+        # Another worker adds to the watchlist: no event reaches this process,
+        # only the version it bumped in the database
+        db.add(Watchlist(user_id=user.id, asteroid_id=db.query(Asteroid.id).first()[0]))
+        db.execute(update(User).where(User.id == user.id).values(activity_version=User.activity_version + 1))
+        db.commit()
+
+        assert AnalyticsService.get_user_activity(db, user_id).total_watchlist_items == 1
+    finally:
+        db.close()
+
+
+def test_activity_version_moves_with_watchlist_changes(client, auth_headers):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == "demo@cosmicwatch.io").one()
+        before = user.activity_version
+        asteroid_id = db.query(Asteroid.id).order_by(Asteroid.name.desc()).first()[0]
+    finally:
+        db.close()
+
+    response = client.post("/watchlist", json={"asteroid_id": str(asteroid_id)}, headers=auth_headers)
+    assert response.status_code in (200, 201)
+
+    db = SessionLocal()
+    try:
+        assert db.query(User.activity_version).filter(User.email == "demo@cosmicwatch.io").scalar() > before
+    finally:
+        db.close()
+
+
+def test_rebuilt_distribution_matches_incremental_updates_at_band_edges(client):
+    db = SessionLocal()
+    try:
+        AnalyticsService.rebuild_risk_distribution(db)
+        asteroid = Asteroid(neo_id=uuid4().hex[:12], name=f"Edge {uuid4().hex[:6]}")
+        db.add(asteroid)
+        db.flush()
+        approaches = [
+            CloseApproach(
+                asteroid_id=asteroid.id,
+                closest_approach_date=datetime.now(timezone.utc) + timedelta(days=days),
+                miss_distance_km=3e6,
+                calculated_cri=cri
+            )
+            for days, cri in ((10, 20.96), (11, 40.99), (12, 60.95))
+        ]
+        db.add_all(approaches)
+        db.commit()
+        for approach in approaches:
+            risk_histogram.update(str(approach.id), asteroid.name, None, approach.calculated_cri)
+        incremental = (list(risk_histogram.bins), risk_histogram.snapshot()["bucket_counts"])
+        assert sketch_bin(20.96) == 209
+
+        AnalyticsService.rebuild_risk_distribution(db)
+
+        assert (list(risk_histogram.bins), risk_histogram.snapshot()["bucket_counts"]) == incremental
+    finally:
+        db.close()
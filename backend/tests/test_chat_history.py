@@ -0,0 +1,31 @@
+"""
+Conversation context sent with chat completions
+"""
+
+
+def send(client, auth_headers, message: str, conversation_id=None) -> str:
+    response = client.post(
+        "/chat/message",
+        json={"message": message, "conversation_id": conversation_id},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    return response.json()["conversation_id"]
+
+
+def test_prompt_keeps_messages_not_yet_summarized(client, auth_headers, completions):
+    questions = [f"Explain orbital resonance, part {part}" for part in range(1, 6)]
+    conversation_id = send(client, auth_headers, questions[0])
+    for question in questions[1:4]:
+        send(client, auth_headers, question, conversation_id)
+
+    # Eight earlier messages: two beyond the recent window, too few to summarize yet
+    send(client, auth_headers, questions[4], conversation_id)
+
+    (prompt,) = [
+        request["messages"] for request in completions.requests
+        if request["messages"][-1]["content"] == questions[4]
+    ]
+    assert not any("SUMMARY" in message["content"] for message in prompt if message["role"] == "system")
+    assert [message["content"] for message in prompt if message["role"] == "user"] == questions
+    assert sum(message["role"] == "assistant" for message in prompt) == 4
@@ -0,0 +1,130 @@
+"""
+Streaming chat endpoint against the stub completion server
+"""
+import json
+from typing import List, Tuple
+from uuid import uuid4
+
+from app.core.database import SessionLocal
+from app.models.models import User
+from app.services.chatbot_service import ChatbotService
+
+
+def parse_events(body: str) -> List[Tuple[str, dict]]:
+    """(event, data) pairs of an SSE body"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def stream(client, auth_headers, message: str) -> List[Tuple[str, dict]]:
+    response = client.post("/chat/message/stream", json={"message": message}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return parse_events(response.text)
+
+
+def saved_messages(client, auth_headers, conversation_id: str) -> List[Tuple[str, str]]:
+    response = client.get(f"/chat/conversations/{conversation_id}", headers=auth_headers)
+    assert response.status_code == 200
+    return [(message["role"], message["content"]) for message in response.json()["messages"]]
+
+
+def demo_user_id() -> str:
+    db = SessionLocal()
+    try:
+        return str(db.query(User).filter(User.email == "demo@cosmicwatch.io").one().id)
+    finally:
+        db.close()
+
+
+class DisconnectingRequest:
+    """Stands in for the HTTP request; the client is gone once `after` deltas were sent"""
+
+    def __init__(self, after: int):
+        self.after = after
+        self.checks = 0
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks >= self.after
+
+
+def test_stream_relays_upstream_deltas(client, auth_headers, completions):
+    events = stream(client, auth_headers, "Explain why orbital resonance matters")
+
+    assert [name for name, _ in events] == ["start"] + ["delta"] * len(completions.words) + ["done"]
+    assert [data["content"] for name, data in events if name == "delta"] == completions.words
+    assert events[-1][1]["conversation_id"] == events[0][1]["conversation_id"]
+
+    request = completions.requests[-1]
+    assert request["stream"] is True
+    assert request["messages"][-1] == {"role": "user", "content": "Explain why orbital resonance matters"}
+
+
+def test_stream_saves_assembled_reply(client, auth_headers, completions):
+    events = stream(client, auth_headers, "Explain how orbits are determined")
+    conversation_id = events[0][1]["conversation_id"]
+
+    assert saved_messages(client, auth_headers, conversation_id) == [
+        ("user", "Explain how orbits are determined"),
+        ("assistant", "".join(completions.words))
+    ]
+
+
+def test_stream_falls_back_when_upstream_fails(client, auth_headers, completions):
+    completions.status = 500
+
+    events = stream(client, auth_headers, "Explain how planetary defense works")
+
+    assert [name for name, _ in events] == ["start", "delta", "done"]
+    reply = events[1][1]["content"]
+    assert reply.startswith("Planetary defense strategies include")
+    assert saved_messages(client, auth_headers, events[0][1]["conversation_id"]) == [
+        ("user", "Explain how planetary defense works"),
+        ("assistant", reply)
+    ]
+
+
+def test_stream_saves_partial_reply_on_disconnect(client, auth_headers, completions):
+    completions.words = [f"word{i} " for i in range(10)]
+    conversation_id = str(uuid4())
+    message = "Explain why comets have tails"
+
+    async def consume() -> List[str]:
+        body = ChatbotService.stream_chat(DisconnectingRequest(after=3), demo_user_id(), conversation_id, message, [])
+        return [chunk async for chunk in body]
+
+    # Run on the app's event loop, where its async engine lives
+    events = parse_events("".join(client.portal.call(consume)))
+
+    assert [name for name, _ in events] == ["start", "delta", "delta", "delta"]
+    assert saved_messages(client, auth_headers, conversation_id) == [
+        ("user", message),
+        ("assistant", "word0 word1 word2 ")
+    ]
+
+
+def test_stream_saves_partial_reply_when_cancelled(client, auth_headers, completions):
+    completions.words = [f"word{i} " for i in range(10)]
+    conversation_id = str(uuid4())
+    message = "Explain why meteors glow"
+
+    async def consume() -> None:
+        body = ChatbotService.stream_chat(DisconnectingRequest(after=100), demo_user_id(), conversation_id, message, [])
+        received = 0
+        async for chunk in body:
+            received += chunk.startswith("event: delta")
+            if received == 2:
+                break
+        # What the server does when the response task is torn down mid-stream
+        await body.aclose()
+
+    client.portal.call(consume)
+
+    assert saved_messages(client, auth_headers, conversation_id) == [
+        ("user", message),
+        ("assistant", "word0 word1 ")
+    ]
@@ -0,0 +1,266 @@
+"""
+Alert notification delivery against a local SMTP server
+"""
+import asyncio
+import socket
+from datetime import datetime, timedelta, timezone
+from email import message_from_bytes, policy
+from typing import List
+from uuid import UUID, uuid4
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import Alert, CloseApproach, NotificationOutbox, User
+from app.schemas.schemas import AlertTypeEnum
+from app.services.alert_service import AlertService
+from app.services.notification_service import NotificationService, NotificationWorker, notification_worker
+
+
+class RecordingHandler:
+    """SMTP handler that keeps every message, optionally rejecting or holding them"""
+
+    def __init__(self):
+        self.messages = []
+        self.reject = False
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.reject:
+                return "451 Try again later"
+            self.messages.append((envelope.rcpt_tos, message_from_bytes(envelope.content, policy=policy.default)))
+            return "250 OK"
+        finally:
+            self.in_flight -= 1
+
+    def sent_to(self, address: str):
+        return [message for recipients, message in self.messages if address in recipients]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def idle_app_worker(client):
+    """Keep the app's own worker from claiming the rows these tests deliver"""
+    client.portal.call(notification_worker.stop)
+    yield
+    client.portal.call(notification_worker.start)
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setattr(settings, "smtp_host", "127.0.0.1")
+    monkeypatch.setattr(settings, "smtp_port", controller.port)
+    monkeypatch.setattr(settings, "smtp_use_tls", False)
+    monkeypatch.setattr(settings, "smtp_username", "")
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def deliver(client):
+    """Run one worker pass on the app's event loop"""
+    worker = NotificationWorker()
+
+    def run() -> int:
+        worker._semaphore = asyncio.Semaphore(settings.notification_max_concurrency)
+        return client.portal.call(worker._process)
+
+    return run
+
+
+def create_user(frequency: str) -> User:
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"{uuid4().hex[:12]}@example.com",
+            username=uuid4().hex[:12],
+            password_hash="unused",
+            preferences={"notification_frequency": frequency}
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def raise_alerts(user: User, count: int) -> List[dict]:
+    db = SessionLocal()
+    try:
+        approaches = db.query(CloseApproach).limit(count).all()
+        assert len(approaches) == count
+        inserted = AlertService.bulk_create_alerts(db, [
+            AlertService.build_alert_row(
+                user.id, approach.asteroid_id, approach.id, AlertTypeEnum.RISK_SCORE,
+                "CRI above your threshold", 55.0, approach.miss_distance_km
+            )
+            for approach in approaches
+        ])
+        db.commit()
+        return inserted
+    finally:
+        db.close()
+
+
+def outbox_rows(user_id: UUID) -> List[NotificationOutbox]:
+    db = SessionLocal()
+    try:
+        rows = db.query(NotificationOutbox).filter(NotificationOutbox.user_id == user_id).all()
+        for row in rows:
+            db.expunge(row)
+        return rows
+    finally:
+        db.close()
+
+
+def make_due(user_id: UUID) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(NotificationOutbox).where(
+                NotificationOutbox.user_id == user_id,
+                NotificationOutbox.status == "pending"
+            ).values(next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def test_deliver_at_follows_notification_frequency():
+    triggered_at = datetime(2026, 1, 7, 15, 30, tzinfo=timezone.utc)  # a Wednesday
+
+    assert NotificationService.deliver_at("real-time", triggered_at) == triggered_at
+    assert NotificationService.deliver_at("daily", triggered_at) == datetime(2026, 1, 8, tzinfo=timezone.utc)
+    assert NotificationService.deliver_at(None, triggered_at) == datetime(2026, 1, 8, tzinfo=timezone.utc)
+    assert NotificationService.deliver_at("weekly", triggered_at) == datetime(2026, 1, 12, tzinfo=timezone.utc)
+    assert NotificationService.deliver_at("never", triggered_at) is None
+
+
+def test_realtime_alerts_are_sent_as_one_digest(smtp, deliver):
+    user = create_user("real-time")
+    alerts = raise_alerts(user, 3)
+
+    deliver()
+
+    messages = smtp.sent_to(user.email)
+    assert len(messages) == 1
+    assert messages[0]["Subject"] == "Cosmic Watch: 3 new asteroid alerts"
+    assert messages[0].get_content().count("CRI above your threshold") == 3
+    assert {row.status for row in outbox_rows(user.id)} == {"sent"}
+
+    db = SessionLocal()
+    try:
+        notified = db.query(Alert.is_notified, Alert.notification_method).filter(
+            Alert.id.in_([alert["id"] for alert in alerts])
+        ).all()
+    finally:
+        db.close()
+    assert set(notified) == {(True, "email")}
+
+
+def test_daily_alerts_wait_for_the_digest(smtp, deliver):
+    user = create_user("daily")
+    raise_alerts(user, 2)
+
+    rows = outbox_rows(user.id)
+    midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    assert len(rows) == 2
+    assert {as_utc(row.next_attempt_at) for row in rows} == {midnight}
+
+    deliver()
+    assert smtp.sent_to(user.email) == []
+
+    make_due(user.id)
+    deliver()
+    messages = smtp.sent_to(user.email)
+    assert len(messages) == 1
+    assert messages[0]["Subject"] == "Cosmic Watch: 2 new asteroid alerts"
+
+
+def test_disabled_notifications_queue_nothing(smtp):
+    user = create_user("never")
+    raise_alerts(user, 2)
+
+    assert outbox_rows(user.id) == []
+
+
+def test_failed_delivery_backs_off_then_gives_up(smtp, deliver, monkeypatch):
+    monkeypatch.setattr(settings, "notification_retry_base_seconds", 30)
+    monkeypatch.setattr(settings, "notification_max_attempts", 3)
+    user = create_user("real-time")
+    raise_alerts(user, 1)
+    smtp.reject = True
+
+    for attempt, delay in ((1, 30), (2, 60)):
+        before = datetime.now(timezone.utc)
+        deliver()
+        (row,) = outbox_rows(user.id)
+        assert row.status == "pending"
+        assert row.attempts == attempt
+        assert "451" in row.last_error
+        expected = before + timedelta(seconds=delay)
+        assert expected - timedelta(seconds=1) <= as_utc(row.next_attempt_at) <= expected + timedelta(seconds=5)
+        # Not due again until the backoff has passed
+        deliver()
+        assert outbox_rows(user.id)[0].attempts == attempt
+        make_due(user.id)
+
+    deliver()
+    (row,) = outbox_rows(user.id)
+    assert row.status == "failed"
+    assert row.attempts == 3
+    assert smtp.sent_to(user.email) == []
+
+
+def test_retry_succeeds_once_the_server_recovers(smtp, deliver):
+    user = create_user("real-time")
+    raise_alerts(user, 1)
+    smtp.reject = True
+    deliver()
+    assert outbox_rows(user.id)[0].status == "pending"
+
+    smtp.reject = False
+    make_due(user.id)
+    deliver()
+
+    (row,) = outbox_rows(user.id)
+    assert row.status == "sent"
+    assert row.attempts == 1
+    assert len(smtp.sent_to(user.email)) == 1
+
+
+def test_concurrent_deliveries_are_capped(smtp, deliver, monkeypatch):
+    monkeypatch.setattr(settings, "notification_max_concurrency", 2)
+    users = [create_user("real-time") for _ in range(5)]
+    for user in users:
+        raise_alerts(user, 1)
+    smtp.delay = 0.2
+
+    deliver()
+
+    assert all(len(smtp.sent_to(user.email)) == 1 for user in users)
+    assert smtp.max_in_flight == 2